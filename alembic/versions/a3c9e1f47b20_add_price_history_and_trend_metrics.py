@@ -0,0 +1,52 @@
+"""Add price history table and numeric trend metrics
+
+Revision ID: a3c9e1f47b20
+Revises: 1d587ca9726c
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f47b20'
+down_revision: Union[str, None] = '1d587ca9726c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TREND_COLUMNS = (
+    'return_1d_pct',
+    'return_7d_pct',
+    'return_30d_pct',
+    'volatility_30d_pct',
+    'max_drawdown_30d_pct',
+)
+
+
+def upgrade() -> None:
+    op.create_table('crypto_price_history',
+        sa.Column('crypto_symbol', sa.String(length=10), nullable=False),
+        sa.Column('observed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('price_usd', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('crypto_symbol', 'observed_at'),
+        schema='reporting_schema'
+    )
+    for column in TREND_COLUMNS:
+        op.add_column('crypto_metadata',
+            sa.Column(column, sa.Float()),
+            schema='reporting_schema'
+        )
+    op.add_column('crypto_metadata',
+        sa.Column('trend_updated_at', sa.DateTime(timezone=True)),
+        schema='reporting_schema'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('crypto_metadata', 'trend_updated_at', schema='reporting_schema')
+    for column in reversed(TREND_COLUMNS):
+        op.drop_column('crypto_metadata', column, schema='reporting_schema')
+    op.drop_table('crypto_price_history', schema='reporting_schema')
@@ -0,0 +1,68 @@
+"""Add coin_analytics and market_summary for the analytics endpoints
+
+Revision ID: a7d4c9e2f6b1
+Revises: f3b8d1e5a7c2
+Create Date: 2026-10-19 01:02:17.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d4c9e2f6b1'
+down_revision: Union[str, None] = 'f3b8d1e5a7c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Both tables start empty; the next refresh (or POST /api/v1/analytics/refresh) fills them
+    op.create_table('coin_analytics',
+        sa.Column('crypto_symbol', sa.String(length=10), nullable=False),
+        sa.Column('crypto_name', sa.String(length=255), nullable=False),
+        sa.Column('market_cap_rank', sa.Integer()),
+        sa.Column('previous_rank', sa.Integer()),
+        sa.Column('rank_change', sa.Integer()),
+        sa.Column('rank_changed_at', sa.DateTime(timezone=True)),
+        sa.Column('circulating_supply', sa.BigInteger()),
+        sa.Column('max_supply', sa.BigInteger()),
+        sa.Column('supply_ratio', sa.Float()),
+        sa.Column('return_1d_pct', sa.Float()),
+        sa.Column('return_7d_pct', sa.Float()),
+        sa.Column('volatility_30d_pct', sa.Float()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('crypto_symbol'),
+        schema='reporting_schema'
+    )
+    op.create_index('ix_coin_analytics_rank_change', 'coin_analytics', ['rank_change'],
+                    schema='reporting_schema')
+    op.create_table('market_summary',
+        sa.Column('scope', sa.String(length=16), nullable=False),
+        sa.Column('coin_count', sa.Integer(), nullable=False),
+        sa.Column('ranked_count', sa.Integer(), nullable=False),
+        sa.Column('capped_count', sa.Integer(), nullable=False),
+        sa.Column('supply_ratio_p10', sa.Float()),
+        sa.Column('supply_ratio_p25', sa.Float()),
+        sa.Column('supply_ratio_p50', sa.Float()),
+        sa.Column('supply_ratio_p75', sa.Float()),
+        sa.Column('supply_ratio_p90', sa.Float()),
+        sa.Column('supply_ratio_mean', sa.Float()),
+        sa.Column('advancers_1d', sa.Integer(), nullable=False),
+        sa.Column('decliners_1d', sa.Integer(), nullable=False),
+        sa.Column('return_1d_median', sa.Float()),
+        sa.Column('return_7d_median', sa.Float()),
+        sa.Column('return_7d_mean', sa.Float()),
+        sa.Column('volatility_30d_median', sa.Float()),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('scope'),
+        schema='reporting_schema'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('market_summary', schema='reporting_schema')
+    op.drop_index('ix_coin_analytics_rank_change', table_name='coin_analytics', schema='reporting_schema')
+    op.drop_table('coin_analytics', schema='reporting_schema')
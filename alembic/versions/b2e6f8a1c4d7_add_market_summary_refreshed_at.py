@@ -0,0 +1,28 @@
+"""Add market_summary.refreshed_at so rank movers default to the latest refresh
+
+Revision ID: b2e6f8a1c4d7
+Revises: a7d4c9e2f6b1
+Create Date: 2026-10-18 17:02:41.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e6f8a1c4d7'
+down_revision: Union[str, None] = 'a7d4c9e2f6b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Left empty until the next refresh; /movers returns nothing until then
+    op.add_column('market_summary', sa.Column('refreshed_at', sa.DateTime(timezone=True)),
+                  schema='reporting_schema')
+
+
+def downgrade() -> None:
+    op.drop_column('market_summary', 'refreshed_at', schema='reporting_schema')
@@ -0,0 +1,40 @@
+"""Add indexes backing keyset pagination and list filters
+
+Revision ID: b7d2f0c9e314
+Revises: a3c9e1f47b20
+Create Date: 2026-10-18 16:04:12.527731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f0c9e314'
+down_revision: Union[str, None] = 'a3c9e1f47b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_crypto_metadata_rank_symbol', 'crypto_metadata',
+        ['market_cap_rank', 'crypto_symbol'],
+        schema='reporting_schema'
+    )
+    op.create_index('ix_crypto_metadata_updated_at', 'crypto_metadata',
+        ['updated_at'],
+        schema='reporting_schema'
+    )
+    # varchar_pattern_ops lets LIKE 'abc%' use the index regardless of the database collation
+    op.create_index('ix_crypto_metadata_symbol_lower_prefix', 'crypto_metadata',
+        [sa.text('lower(crypto_symbol) varchar_pattern_ops')],
+        schema='reporting_schema'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_crypto_metadata_symbol_lower_prefix', table_name='crypto_metadata', schema='reporting_schema')
+    op.drop_index('ix_crypto_metadata_updated_at', table_name='crypto_metadata', schema='reporting_schema')
+    op.drop_index('ix_crypto_metadata_rank_symbol', table_name='crypto_metadata', schema='reporting_schema')
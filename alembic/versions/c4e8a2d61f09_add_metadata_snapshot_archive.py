@@ -0,0 +1,54 @@
+"""Add day-partitioned crypto_metadata_snapshot archive
+
+Revision ID: c4e8a2d61f09
+Revises: b7d2f0c9e314
+Create Date: 2026-10-18 16:31:07.114952
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2d61f09'
+down_revision: Union[str, None] = 'b7d2f0c9e314'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('crypto_metadata_snapshot',
+        sa.Column('crypto_symbol', sa.String(length=10), nullable=False),
+        sa.Column('snapshot_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('change_source', sa.String(length=32), nullable=False),
+        sa.Column('crypto_metadata_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('crypto_name', sa.String(length=255), nullable=False),
+        sa.Column('market_cap_rank', sa.Integer()),
+        sa.Column('circulating_supply', sa.BigInteger()),
+        sa.Column('max_supply', sa.BigInteger()),
+        sa.Column('listed_exchange', sa.String(length=255), nullable=False),
+        sa.Column('notes', sa.Text()),
+        sa.Column('trend_info', sa.String(length=255)),
+        sa.Column('recent_headline', sa.String(length=512)),
+        sa.Column('return_1d_pct', sa.Float()),
+        sa.Column('return_7d_pct', sa.Float()),
+        sa.Column('return_30d_pct', sa.Float()),
+        sa.Column('volatility_30d_pct', sa.Float()),
+        sa.Column('max_drawdown_30d_pct', sa.Float()),
+        sa.PrimaryKeyConstraint('crypto_symbol', 'snapshot_at'),
+        schema='reporting_schema',
+        postgresql_partition_by='RANGE (snapshot_at)'
+    )
+    # Catches rows outside the daily partitions, which the app creates ahead of time
+    op.execute(
+        'CREATE TABLE reporting_schema.crypto_metadata_snapshot_default '
+        'PARTITION OF reporting_schema.crypto_metadata_snapshot DEFAULT'
+    )
+
+
+def downgrade() -> None:
+    # Dropping the parent drops every partition with it
+    op.drop_table('crypto_metadata_snapshot', schema='reporting_schema')
@@ -0,0 +1,30 @@
+"""Rename market_summary.refreshed_at to ranks_moved_at
+
+It is now only stamped by refresh passes that move a rank, so a no-op pass
+no longer hides the latest moves.
+
+Revision ID: c8f1d3b5e920
+Revises: b2e6f8a1c4d7
+Create Date: 2026-10-18 17:21:06.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f1d3b5e920'
+down_revision: Union[str, None] = 'b2e6f8a1c4d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('market_summary', 'refreshed_at', new_column_name='ranks_moved_at',
+                    schema='reporting_schema')
+
+
+def downgrade() -> None:
+    op.alter_column('market_summary', 'ranks_moved_at', new_column_name='refreshed_at',
+                    schema='reporting_schema')
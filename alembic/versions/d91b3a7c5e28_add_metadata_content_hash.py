@@ -0,0 +1,30 @@
+"""Add content_hash to crypto_metadata for change detection
+
+Revision ID: d91b3a7c5e28
+Revises: c4e8a2d61f09
+Create Date: 2026-10-18 19:42:07.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91b3a7c5e28'
+down_revision: Union[str, None] = 'c4e8a2d61f09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Left NULL: the hash is computed in Python, so existing rows get one on their next refresh
+    op.add_column('crypto_metadata',
+        sa.Column('content_hash', sa.String(length=32)),
+        schema='reporting_schema'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('crypto_metadata', 'content_hash', schema='reporting_schema')
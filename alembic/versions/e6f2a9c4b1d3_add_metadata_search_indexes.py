@@ -0,0 +1,56 @@
+"""Add full-text and trigram search indexes to crypto_metadata
+
+Revision ID: e6f2a9c4b1d3
+Revises: d91b3a7c5e28
+Create Date: 2026-10-18 23:05:41.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f2a9c4b1d3'
+down_revision: Union[str, None] = 'd91b3a7c5e28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Name and symbol rank highest (matched verbatim), then the headline, then the notes (both
+# stemmed as English). Headlines are often URLs, so path separators are turned into spaces.
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(crypto_name, '') || ' ' || crypto_symbol), 'A') || "
+    "setweight(to_tsvector('english', translate(coalesce(recent_headline, ''), '/-_.', '    ')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(notes, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # A stored generated column: adding it rewrites the table, which computes the
+    # vector for every existing row, and Postgres maintains it on each write after that
+    op.add_column('crypto_metadata',
+        sa.Column('search_vector', postgresql.TSVECTOR(),
+                  sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)),
+        schema='reporting_schema'
+    )
+    op.create_index('ix_crypto_metadata_search_vector', 'crypto_metadata', ['search_vector'],
+                    postgresql_using='gin', schema='reporting_schema')
+    op.create_index('ix_crypto_metadata_name_trgm', 'crypto_metadata', ['crypto_name'],
+                    postgresql_using='gin', postgresql_ops={'crypto_name': 'gin_trgm_ops'},
+                    schema='reporting_schema')
+    op.create_index('ix_crypto_metadata_symbol_trgm', 'crypto_metadata', ['crypto_symbol'],
+                    postgresql_using='gin', postgresql_ops={'crypto_symbol': 'gin_trgm_ops'},
+                    schema='reporting_schema')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_crypto_metadata_symbol_trgm', table_name='crypto_metadata', schema='reporting_schema')
+    op.drop_index('ix_crypto_metadata_name_trgm', table_name='crypto_metadata', schema='reporting_schema')
+    op.drop_index('ix_crypto_metadata_search_vector', table_name='crypto_metadata', schema='reporting_schema')
+    op.drop_column('crypto_metadata', 'search_vector', schema='reporting_schema')
+    # pg_trgm is left installed; other objects in the database may use it
@@ -0,0 +1,45 @@
+"""Add refresh_queue for sharded refreshes
+
+Revision ID: f3b8d1e5a7c2
+Revises: e6f2a9c4b1d3
+Create Date: 2026-10-19 00:12:36.554019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d1e5a7c2'
+down_revision: Union[str, None] = 'e6f2a9c4b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('refresh_queue',
+        sa.Column('job_id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('run_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('coin_id', sa.String(length=100), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('claimed_by', sa.String(length=100)),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True)),
+        sa.Column('enqueued_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True)),
+        sa.Column('error', sa.Text()),
+        sa.PrimaryKeyConstraint('job_id'),
+        sa.UniqueConstraint('run_id', 'coin_id'),
+        schema='reporting_schema'
+    )
+    op.create_index('ix_refresh_queue_status_position', 'refresh_queue', ['status', 'position'],
+                    schema='reporting_schema')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_refresh_queue_status_position', table_name='refresh_queue', schema='reporting_schema')
+    op.drop_table('refresh_queue', schema='reporting_schema')
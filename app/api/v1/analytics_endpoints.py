@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import Dict, List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.api.v1.crypto_metadata_endpoints import get_db
+from app.services.analytics_service import AnalyticsService
+
+
+# --------------------------
+# Pydantic Schemas
+# --------------------------
+
+class RankMoverOut(BaseModel):
+    crypto_symbol: str
+    crypto_name: str
+    market_cap_rank: int | None = None
+    previous_rank: int | None = None
+    rank_change: int
+    rank_changed_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class SupplySaturationOut(BaseModel):
+    crypto_symbol: str
+    crypto_name: str
+    market_cap_rank: int | None = None
+    circulating_supply: int
+    max_supply: int
+    supply_ratio: float
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class MarketSummaryOut(BaseModel):
+    coin_count: int
+    ranked_count: int
+    capped_count: int
+    supply_ratio_p10: float | None = None
+    supply_ratio_p25: float | None = None
+    supply_ratio_p50: float | None = None
+    supply_ratio_p75: float | None = None
+    supply_ratio_p90: float | None = None
+    supply_ratio_mean: float | None = None
+    advancers_1d: int
+    decliners_1d: int
+    return_1d_median: float | None = None
+    return_7d_median: float | None = None
+    return_7d_mean: float | None = None
+    volatility_30d_median: float | None = None
+    computed_at: datetime
+    ranks_moved_at: datetime | None = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+# --------------------------
+# FastAPI Router
+# --------------------------
+router = APIRouter(
+    prefix="/api/v1/analytics",
+    tags=["Analytics"]
+)
+
+
+@router.get("/movers", response_model=List[RankMoverOut])
+def list_rank_movers(
+    direction: Literal["gainers", "losers"] = "gainers",
+    limit: int = Query(10, ge=1, le=100),
+    since: datetime | None = Query(None, description="Include moves recorded at or after this time (default: the latest refresh that moved ranks)"),
+    db: Session = Depends(get_db),
+):
+    """Largest market-cap-rank climbs or drops in the latest refresh that moved ranks, or since `since`."""
+    return AnalyticsService.get_movers(db, direction, limit, since)
+
+
+@router.get("/supply", response_model=List[SupplySaturationOut])
+def list_supply_saturation(
+    order: Literal["desc", "asc"] = "desc",
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Coins with a max supply, by the share of it already in circulation."""
+    return AnalyticsService.get_supply_saturation(db, order, limit)
+
+
+@router.get("/summary", response_model=MarketSummaryOut)
+def get_market_summary(db: Session = Depends(get_db)):
+    """Supply-saturation percentiles and return / breadth aggregates over the tracked coins."""
+    summary = AnalyticsService.get_summary(db)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Analytics have not been computed yet; run a refresh")
+    return summary
+
+
+@router.post("/refresh", response_model=Dict[str, int])
+def refresh_analytics(db: Session = Depends(get_db)):
+    """Bring the analytics tables up to date; ingestion calls this after each run."""
+    return AnalyticsService.refresh(db)
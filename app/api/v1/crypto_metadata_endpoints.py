@@ -1,10 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List
+from typing import List, Literal
 
-from app.db.session import SessionLocal
-from app.services.crypto_metadata_service import CryptoMetadataService
+from app.core.metrics import COIN_INDEX_READS
+from app.core.serialization import encode_response
+from app.db.session import AsyncSessionLocal, SessionLocal, get_async_engine
+from app.services import data_events
+from app.services.coin_index import IndexSnapshot
+from app.services.crypto_metadata_service import (
+    AsyncCryptoMetadataService,
+    CoalescedMetadataReads,
+    LISTABLE_FIELDS,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_RESULTS,
+    count_bulk_statuses,
+    metadata_select,
+)
+from app.services.export_service import EXPORT_FORMATS, stream_export
 from app.models.metadata_models import CryptoMetadata
 from pydantic import BaseModel, Field
 
@@ -20,6 +35,15 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Reads that miss the coin index: identical concurrent ones share a query
+metadata_reads = CoalescedMetadataReads(AsyncSessionLocal)
+
+
 # --------------------------
 # Pydantic Schemas
 # --------------------------
@@ -41,11 +65,57 @@ class CryptoMetadataCreate(BaseModel):
 class CryptoMetadataOut(CryptoMetadataCreate):
     crypto_metadata_id: UUID
 
+    # Read-only trend analytics (see /api/v1/price-history/metrics)
+    return_1d_pct: float | None = None
+    return_7d_pct: float | None = None
+    return_30d_pct: float | None = None
+    volatility_30d_pct: float | None = None
+    max_drawdown_30d_pct: float | None = None
+
     model_config = {
         "from_attributes": True  # Pydantic v2 replacement for orm_mode
     }
 
 
+class CryptoMetadataListItem(BaseModel):
+    """
+    A row of the list endpoint. Every field is optional because ?fields= can
+    project any subset; unrequested fields are left out of the JSON entirely.
+    """
+    crypto_metadata_id: UUID | None = None
+    crypto_name: str | None = None
+    crypto_symbol: str | None = None
+    market_cap_rank: int | None = None
+    circulating_supply: int | None = None
+    max_supply: int | None = None
+    listed_exchange: str | None = None
+    notes: str | None = None
+    trend_info: str | None = None
+    recent_headline: str | None = None
+    return_1d_pct: float | None = None
+    return_7d_pct: float | None = None
+    return_30d_pct: float | None = None
+    volatility_30d_pct: float | None = None
+    max_drawdown_30d_pct: float | None = None
+
+
+class CryptoMetadataSearchHit(CryptoMetadataListItem):
+    score: float
+
+
+class CryptoMetadataBulkItem(BaseModel):
+    crypto_symbol: str
+    crypto_metadata_id: UUID
+    status: Literal["created", "updated", "unchanged"]
+
+
+class CryptoMetadataBulkResult(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    items: List[CryptoMetadataBulkItem]
+
+
 # --------------------------
 # FastAPI Router
 # --------------------------
@@ -55,39 +125,193 @@ router = APIRouter(
 )
 
 
+def parse_fields(fields: str | None) -> list[str] | None:
+    """Split a comma-separated ?fields= value; None means every field."""
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()] or None
+
+
+def index_snapshot(request: Request) -> IndexSnapshot | None:
+    """
+    The app's in-memory coin index if it is up to date with every known write,
+    else None and the caller reads the database (see app/services/coin_index.py).
+    """
+    index = getattr(request.app.state, "coin_index", None)
+    snapshot = index.current() if index else None
+    COIN_INDEX_READS.labels("hit" if snapshot else "miss").inc()
+    return snapshot
+
+
 # --------------------------
 # CRUD Endpoints
 # --------------------------
 
 @router.post("/", response_model=CryptoMetadataOut, status_code=status.HTTP_201_CREATED)
-def create_crypto_metadata(payload: CryptoMetadataCreate, db: Session = Depends(get_db)):
-    return CryptoMetadataService.create_crypto_metadata(db, payload.dict())
+async def create_crypto_metadata(payload: CryptoMetadataCreate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncCryptoMetadataService.create_crypto_metadata(db, payload.dict())
+
+
+@router.post("/bulk", response_model=CryptoMetadataBulkResult)
+async def bulk_upsert_crypto_metadata(payload: List[CryptoMetadataCreate], db: AsyncSession = Depends(get_async_db)):
+    rows = [item.dict(exclude_unset=True) for item in payload]
+    items = await AsyncCryptoMetadataService.bulk_upsert_crypto_metadata(db, rows)
+    return {**count_bulk_statuses(items), "items": items}
+
+
+@router.get("/", response_model=List[CryptoMetadataListItem], response_model_exclude_unset=True)
+async def list_crypto_metadata(
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
+    min_rank: int | None = Query(None, ge=1),
+    max_rank: int | None = Query(None, ge=1),
+    symbol_prefix: str | None = Query(None, max_length=10),
+    updated_since: datetime | None = None,
+    fields: str | None = Query(None, description=f"Comma-separated subset of: {', '.join(LISTABLE_FIELDS)}"),
+):
+    """
+    Page through metadata ordered by market_cap_rank (unranked coins last).
+
+    When more rows exist, the cursor for the next page is returned in the
+    X-Next-Cursor header and as a Link: <...>; rel="next" URL. Rows come from the
+    in-memory coin index when it is current, otherwise from SQL (one query shared
+    by identical concurrent requests), and are
+    encoded with orjson (or MessagePack via Accept), skipping the ORM and the
+    response model. X-Data-Version tells which data version answered.
+    """
+    query = dict(
+        limit=limit,
+        cursor=cursor,
+        min_rank=min_rank,
+        max_rank=max_rank,
+        symbol_prefix=symbol_prefix,
+        updated_since=updated_since,
+        fields=parse_fields(fields),
+    )
+    snapshot = index_snapshot(request)
+    try:
+        if snapshot is not None:
+            rows, next_cursor = snapshot.page(**query)
+        else:
+            rows, next_cursor = await metadata_reads.list_crypto_metadata_page(**query)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    headers = {"X-Data-Version": str(snapshot.version if snapshot else data_events.current_version())}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return encode_response(request, rows, headers=headers)
 
 
-@router.get("/", response_model=List[CryptoMetadataOut])
-def list_crypto_metadata(db: Session = Depends(get_db)):
-    return CryptoMetadataService.get_all_crypto_metadata(db)
+@router.get("/export")
+async def export_crypto_metadata(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    min_rank: int | None = Query(None, ge=1),
+    max_rank: int | None = Query(None, ge=1),
+    symbol: List[str] | None = Query(None, description="Exact symbol; repeat for several"),
+    symbol_prefix: str | None = Query(None, max_length=10),
+    updated_since: datetime | None = None,
+    fields: str | None = Query(None, description=f"Comma-separated subset of: {', '.join(LISTABLE_FIELDS)}"),
+):
+    """
+    Stream every matching row as NDJSON or CSV, in market_cap_rank order.
+
+    Rows are read from a server-side cursor and written out batch by batch, so
+    memory use doesn't grow with the size of the export.
+    """
+    try:
+        stmt = metadata_select(
+            fields=parse_fields(fields),
+            min_rank=min_rank,
+            max_rank=max_rank,
+            symbol_prefix=symbol_prefix,
+            symbols=[s.upper() for s in symbol] if symbol else None,
+            updated_since=updated_since,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return StreamingResponse(
+        stream_export(stmt, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="crypto_metadata.{format}"'},
+    )
+
+
+@router.get("/export/columnar")
+async def export_columnar(
+    dataset: Literal["metadata", "snapshots", "price_history"] = "metadata",
+    format: Literal["parquet", "arrow"] = "parquet",
+    since: datetime | None = Query(None, description="Inclusive, on the dataset's time column (UTC if naive)"),
+    until: datetime | None = Query(None, description="Exclusive"),
+):
+    """
+    Stream a whole table, or a time range of it, as Parquet or an Arrow IPC stream.
+
+    Datasets: metadata (by updated_at), snapshots (by snapshot_at) and price_history
+    (by observed_at). Rows are read and encoded in batches, and the file loads
+    straight into pandas, polars or DuckDB, or back into a database with
+    `python -m app.services.columnar_service import`.
+    """
+    # pyarrow takes a while to import, so it is loaded with the first columnar export
+    from app.services.columnar_service import COLUMNAR_FORMATS, pa, stream_columnar
+
+    if pa is None:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Columnar export needs pyarrow installed")
+    return StreamingResponse(
+        stream_columnar(get_async_engine(), dataset, format, since, until),
+        media_type=COLUMNAR_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'},
+    )
+
+
+@router.get("/search", response_model=List[CryptoMetadataSearchHit], response_model_exclude_unset=True)
+async def search_crypto_metadata(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description='Words, "a phrase", or, -exclude'),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    fields: str | None = Query(None, description=f"Comma-separated subset of: {', '.join(LISTABLE_FIELDS)}"),
+):
+    """
+    Search coin names, symbols, notes and headlines, best match first.
+
+    Names and symbols also match on prefixes and near-misses ("bitc", "etherium")
+    through trigram similarity. Each hit carries a relevance `score`.
+    """
+    try:
+        rows = await metadata_reads.search_crypto_metadata(q, limit, parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return encode_response(request, rows, headers={"X-Data-Version": str(data_events.current_version())})
 
 
 @router.get("/{metadata_id}", response_model=CryptoMetadataOut)
-def get_crypto_metadata(metadata_id: UUID, db: Session = Depends(get_db)):
-    metadata = CryptoMetadataService.get_crypto_metadata_by_id(db, metadata_id)
+async def get_crypto_metadata(metadata_id: UUID, request: Request):
+    snapshot = index_snapshot(request)
+    if snapshot is not None:
+        record = snapshot.by_id.get(metadata_id)
+        metadata = record.as_dict() if record else None
+    else:
+        metadata = await metadata_reads.get_crypto_metadata_row(metadata_id)
     if not metadata:
         raise HTTPException(status_code=404, detail="Metadata not found")
-    return metadata
+    version = snapshot.version if snapshot else data_events.current_version()
+    return encode_response(request, metadata, headers={"X-Data-Version": str(version)})
 
 
 @router.put("/{metadata_id}", response_model=CryptoMetadataOut)
-def update_crypto_metadata(metadata_id: UUID, payload: CryptoMetadataCreate, db: Session = Depends(get_db)):
-    updated = CryptoMetadataService.update_crypto_metadata(db, metadata_id, payload.dict())
+async def update_crypto_metadata(metadata_id: UUID, payload: CryptoMetadataCreate, db: AsyncSession = Depends(get_async_db)):
+    updated = await AsyncCryptoMetadataService.update_crypto_metadata(db, metadata_id, payload.dict())
     if not updated:
         raise HTTPException(status_code=404, detail="Metadata not found")
     return updated
 
 
 @router.delete("/{metadata_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_crypto_metadata(metadata_id: UUID, db: Session = Depends(get_db)):
-    deleted = CryptoMetadataService.delete_crypto_metadata(db, metadata_id)
+async def delete_crypto_metadata(metadata_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    deleted = await AsyncCryptoMetadataService.delete_crypto_metadata(db, metadata_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Metadata not found")
     return None
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Annotated, Dict, List, Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.api.v1.crypto_metadata_endpoints import get_db
+from app.models.metadata_models import CryptoMetadata
+from app.services.export_service import EXPORT_FORMATS, stream_export
+from app.services.price_history_service import PriceHistoryService, WINDOW_DAYS, history_select
+
+
+# --------------------------
+# Pydantic Schemas
+# --------------------------
+
+# [epoch_ms, price] as CoinGecko's market_chart returns it; price may be null. Anything else
+# (wrong length, null or out-of-range timestamp) is rejected with a 422 before it reaches the service.
+EpochMillis = Annotated[int, Field(ge=0, le=253_402_300_799_999)]  # up to 9999-12-31
+PricePoint = tuple[EpochMillis, float | None]
+
+
+class PricePointOut(BaseModel):
+    observed_at: datetime
+    price_usd: float
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class TrendMetricsOut(BaseModel):
+    crypto_symbol: str
+    crypto_name: str
+    market_cap_rank: int | None = None
+    return_1d_pct: float | None = None
+    return_7d_pct: float | None = None
+    return_30d_pct: float | None = None
+    volatility_30d_pct: float | None = None
+    max_drawdown_30d_pct: float | None = None
+    trend_updated_at: datetime | None = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class PriceHistoryAppendResult(BaseModel):
+    appended: Dict[str, int]
+    metrics_updated: int
+
+
+# --------------------------
+# FastAPI Router
+# --------------------------
+router = APIRouter(
+    prefix="/api/v1/price-history",
+    tags=["PriceHistory"]
+)
+
+
+@router.get("/latest", response_model=Dict[str, datetime])
+def latest_price_timestamps(db: Session = Depends(get_db)):
+    return PriceHistoryService.get_last_timestamps(db)
+
+
+@router.post("/", response_model=PriceHistoryAppendResult)
+def append_price_history(series: Dict[str, List[PricePoint]], db: Session = Depends(get_db)):
+    appended = PriceHistoryService.append_prices(db, series)
+    metrics_updated = PriceHistoryService.refresh_trend_columns(db)
+    return {"appended": appended, "metrics_updated": metrics_updated}
+
+
+@router.get("/metrics", response_model=List[TrendMetricsOut])
+def list_trend_metrics(db: Session = Depends(get_db)):
+    return db.query(CryptoMetadata).order_by(CryptoMetadata.market_cap_rank).all()
+
+
+@router.get("/export")
+async def export_price_history(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    symbol: List[str] | None = Query(None, description="Repeat for several coins; all coins if omitted"),
+    since: datetime | None = None,
+    until: datetime | None = None,
+):
+    """Stream stored observations as NDJSON or CSV, ordered by symbol then time."""
+    stmt = history_select([s.upper() for s in symbol] if symbol else None, since, until)
+    return StreamingResponse(
+        stream_export(stmt, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="crypto_price_history.{format}"'},
+    )
+
+
+@router.get("/{symbol}", response_model=List[PricePointOut])
+def get_price_history(symbol: str, days: int = Query(WINDOW_DAYS, ge=1, le=365), db: Session = Depends(get_db)):
+    return PriceHistoryService.get_price_series(db, symbol.upper(), days)
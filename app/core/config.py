@@ -5,6 +5,8 @@ Centralised configuration module.
 • Automatically points to the .env file that sits two directories above
   this file (i.e., your project root), so you never hit the
   “SQLALCHEMY_DATABASE_URI missing” error again.
+• `settings` is parsed on first attribute access, not at import, so importing
+  a module (or running a script that never reads a setting) doesn't touch .env.
 """
 
 from functools import lru_cache
@@ -21,6 +23,47 @@ class Settings(BaseSettings):
     DEBUG: bool = True                        # toggles verbose logging
     SQLALCHEMY_DATABASE_URI: str              # ← loaded from .env
 
+    # ------------------------------------------------------------------ #
+    # Connection pooling (applies to both the sync and async engines)    #
+    # ------------------------------------------------------------------ #
+    DB_POOL_SIZE: int = 5                     # persistent connections per engine
+    DB_MAX_OVERFLOW: int = 10                 # extra connections under burst load
+    DB_POOL_RECYCLE: int = 1800               # seconds before a connection is replaced
+    DB_POOL_TIMEOUT: int = 30                 # seconds to wait for a free connection
+    DB_STATEMENT_CACHE_SIZE: int = 100        # asyncpg prepared statements; 0 behind PgBouncer
+    DB_WARMUP_CONNECTIONS: int = 2            # opened per engine at startup (capped at DB_POOL_SIZE); 0 = off
+
+    # ------------------------------------------------------------------ #
+    # Background refresh                                                 #
+    # ------------------------------------------------------------------ #
+    REFRESH_TOP_N: int = 10                   # coins pulled per refresh
+    REFRESH_CONCURRENCY: int = 4              # coins fetched in parallel
+    REFRESH_INTERVAL_SECONDS: int = 0         # periodic refresh; 0 = off
+    REFRESH_MODE: str = "snapshot"            # snapshot / detail / queue (see app/scripts/ingestion.py)
+    REFRESH_QUEUE_LEASE_SECONDS: int = 300    # queue mode: claim lifetime before a coin is retried elsewhere
+    REFRESH_QUEUE_MAX_ATTEMPTS: int = 3       # queue mode: claims per coin before it is marked failed
+
+    # ------------------------------------------------------------------ #
+    # Dashboard                                                          #
+    # ------------------------------------------------------------------ #
+    DASHBOARD_GZIP: bool = True               # keep a gzip copy of the rendered page
+
+    # ------------------------------------------------------------------ #
+    # Live dashboard updates (GET /events, server-sent events)           #
+    # ------------------------------------------------------------------ #
+    PUSH_HEARTBEAT_SECONDS: int = 15          # keep-alive comment on idle streams
+    PUSH_CLIENT_QUEUE_SIZE: int = 100         # undelivered events per client before it must resync
+    PUSH_PG_NOTIFY: bool = True               # hear other processes' writes via LISTEN/NOTIFY; the coin index needs it on Postgres
+    PUSH_PG_CHANNEL: str = "crypto_metadata_changes"
+
+    # ------------------------------------------------------------------ #
+    # Metadata snapshot archive (see app/services/snapshot_service.py)   #
+    # ------------------------------------------------------------------ #
+    SNAPSHOT_RETENTION_DAYS: int = 90         # older snapshots are dropped
+    SNAPSHOT_COMPACT_AFTER_DAYS: int = 7      # older days keep one snapshot per coin
+    SNAPSHOT_PARTITIONS_AHEAD: int = 3        # daily partitions created in advance
+    SNAPSHOT_MAINTENANCE_INTERVAL_SECONDS: int = 6 * 3600  # 0 = only at startup
+
     # ------------------------------------------------------------------ #
     # pydantic-settings inner config                                     #
     # ------------------------------------------------------------------ #
@@ -41,5 +84,12 @@ def get_settings() -> Settings:
     return Settings()
 
 
+class _LazySettings:
+    """Stands in for the Settings instance and loads it on first use."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
 # Convenience import for the rest of the codebase:
-settings: Settings = get_settings()
+settings: Settings = _LazySettings()  # type: ignore[assignment]
@@ -1,20 +1,212 @@
+"""
+Application logging.
+
+Records are handed to a QueueHandler in the calling thread and written out by a
+QueueListener on a background thread, so a slow stdout never stalls a request
+or a bulk refresh. The caller only does the cheap part:
+
+• filter:  per-logger rate limits and sampling drop records before they are
+           queued (warnings and errors always get through)
+• enqueue: the record goes on the queue unformatted; `msg % args` and the JSON
+           encoding happen in the listener thread. Log with arguments,
+           logger.info("Saved %s", symbol), not f-strings, so a record that is
+           dropped or below the level costs nothing to build. Arguments are
+           read when the record is written, so pass values, not objects that
+           change afterwards.
+
+If the writer falls LOG_QUEUE_SIZE records behind, new records are dropped
+rather than waited on. Dropped records are counted by logger and reason and
+exported at /metrics.
+
+Configured from the environment (not settings) so it works before settings load:
+
+    LOG_LEVEL         INFO
+    LOG_FORMAT        json (one object per line) or text
+    LOG_QUEUE_SIZE    10000
+    LOG_RATE_LIMITS   logger=records per second, comma separated (e.g. crypto_app.metadata=100)
+    LOG_SAMPLING      logger=fraction kept, comma separated (e.g. crypto_app.ingestion=0.25)
+
+A policy applies to the named logger and its children.
+"""
+
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
 
-# Define a standard log format
+# Human-readable format for LOG_FORMAT=text
 LOG_FORMAT = (
     "[%(asctime)s] [%(levelname)s] "
     "[%(name)s.%(funcName)s:%(lineno)d] - %(message)s"
 )
+DEFAULT_RATE_LIMITS = "crypto_app.metadata=100"
+
+# Attributes every LogRecord has; anything else came in through `extra=` and goes into the JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with any `extra=` fields alongside the message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "where": f"{record.funcName}:{record.lineno}",
+            "msg": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+def _parse_policies(value: str) -> dict[str, float]:
+    """'a=1,b.c=0.5' -> {'a': 1.0, 'b.c': 0.5}"""
+    policies = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, number = item.partition("=")
+        policies[name.strip()] = float(number)
+    return policies
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class LogPolicyFilter(logging.Filter):
+    """
+    Per-logger rate limiting (token bucket, burst of one second's worth) and
+    random sampling. Records at WARNING and above always pass.
+    """
 
-# Create a root logger for the entire app
+    def __init__(self, rate_limits: dict[str, float], sampling: dict[str, float]):
+        super().__init__()
+        self.rate_limits = rate_limits
+        self.sampling = sampling
+        self.dropped: dict[tuple[str, str], int] = {}
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._resolved: dict[str, tuple[str | None, str | None]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _match(name: str, policies: dict[str, float]) -> str | None:
+        while name:
+            if name in policies:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def _policies_for(self, name: str) -> tuple[str | None, str | None]:
+        resolved = self._resolved.get(name)
+        if resolved is None:
+            resolved = self._resolved[name] = (self._match(name, self.rate_limits), self._match(name, self.sampling))
+        return resolved
+
+    def record_drop(self, name: str, reason: str) -> None:
+        with self._lock:
+            self.dropped[(name, reason)] = self.dropped.get((name, reason), 0) + 1
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        limited, sampled = self._policies_for(record.name)
+        if sampled is not None and random.random() >= self.sampling[sampled]:
+            self.record_drop(record.name, "sampled")
+            return False
+        if limited is not None:
+            with self._lock:
+                bucket = self._buckets.get(limited)
+                if bucket is None:
+                    bucket = self._buckets[limited] = _TokenBucket(self.rate_limits[limited])
+                allowed = bucket.take()
+            if not allowed:
+                self.record_drop(record.name, "rate_limited")
+                return False
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Queues records as they are; the listener's handler does all formatting.
+    Never blocks: when the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: LogPolicyFilter):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.addFilter(policy)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.policy.record_drop(record.name, "queue_full")
+
+
+def _build_listener() -> tuple[LazyQueueHandler, QueueListener]:
+    output = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        output.setFormatter(logging.Formatter(LOG_FORMAT))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    policy = LogPolicyFilter(
+        _parse_policies(os.getenv("LOG_RATE_LIMITS", DEFAULT_RATE_LIMITS)),
+        _parse_policies(os.getenv("LOG_SAMPLING", "")),
+    )
+    log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    return LazyQueueHandler(log_queue, policy), QueueListener(log_queue, output, respect_handler_level=True)
+
+
+_handler, _listener = _build_listener()
+_listener.start()
+# Flush whatever is still queued on interpreter exit
+atexit.register(_listener.stop)
+
+# Root handler for the entire app
 logging.basicConfig(
-    level=logging.INFO,  # You can set to DEBUG for more verbosity
-    format=LOG_FORMAT,
-    handlers=[
-        logging.StreamHandler(sys.stdout)  # Logs to console
-    ]
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[_handler],
 )
 
 # Optional: you can define a logger for specific parts of the app
 logger = logging.getLogger("crypto_app")
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Child of the app logger (crypto_app.<name>), so policies can target one area."""
+    return logger.getChild(name)
+
+
+def dropped_records() -> dict[tuple[str, str], int]:
+    """Records dropped so far, by (logger name, reason)."""
+    with _handler.policy._lock:
+        return dict(_handler.policy.dropped)
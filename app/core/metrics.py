@@ -0,0 +1,253 @@
+"""
+Prometheus metrics for the API, the database layer and outbound fetches.
+
+• HTTP: latency histogram per route template, method and status (PrometheusMiddleware).
+• DB: every statement is timed through SQLAlchemy cursor events; pool checkout
+  wait is timed by InstrumentedQueuePool, and pool occupancy/saturation is read
+  at scrape time.
+• Index: reads served from the in-memory coin index vs the database.
+• Startup: duration of each phase of bringing the app up.
+• Coalescing: identical concurrent reads that shared one execution (single_flight).
+• Push: connected /events clients and the frames fanned out to them.
+• Outbound: HttpClient records latency, cache results and errors per endpoint
+  (CoinGecko endpoint name, or host for the news sources).
+• Log: records dropped by the logging rate limits, sampling or a full queue.
+
+Metrics live in the default registry, exposed at /metrics by app.main. With
+several worker processes, each one exports its own numbers.
+"""
+
+import time
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.logging_config import dropped_records
+
+# Buckets tuned for a small API: sub-millisecond cache hits up to multi-second exports
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# --------------------------------------------------------------------- HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time spent serving HTTP requests",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+
+# ----------------------------------------------------------------------- DB
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds", "Time spent executing SQL statements",
+    ["engine", "operation"], buckets=LATENCY_BUCKETS,
+)
+DB_STATEMENT_ERRORS = Counter(
+    "db_statement_errors_total", "SQL statements that raised", ["engine", "operation"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    ["engine"], buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ["engine"],
+)
+
+# ------------------------------------------------------------------ refresh
+REFRESH_JOB_DURATION = Histogram(
+    "refresh_job_duration_seconds", "Wall time of background refresh jobs",
+    ["trigger", "status"], buckets=(1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+METADATA_UPSERT_ROWS = Counter(
+    "metadata_upsert_rows_total", "Rows seen by metadata bulk upserts, by outcome",
+    ["status"],                           # created / updated / unchanged
+)
+TREND_METRIC_ROWS = Counter(
+    "trend_metric_rows_total", "Coins seen by trend-metric refreshes, by outcome",
+    ["status"],                           # updated / unchanged
+)
+REFRESH_QUEUE_JOBS = Counter(
+    "refresh_queue_jobs_total", "Sharded-refresh coin jobs handled by this process, by outcome",
+    ["outcome"],                          # done / retried / reclaimed (claimed on a later attempt) / failed
+)
+ANALYTICS_ROWS = Counter(
+    "analytics_rows_total", "Coins seen by market analytics refreshes, by outcome",
+    ["status"],                           # created / updated / unchanged / removed
+)
+
+# -------------------------------------------------------------------- index
+COIN_INDEX_READS = Counter(
+    "coin_index_reads_total", "Metadata reads by where they were answered",
+    ["result"],                           # hit = in-memory index, miss = database (index catching up)
+)
+
+# --------------------------------------------------------------- coalescing
+SINGLE_FLIGHT_CALLS = Counter(
+    "single_flight_calls_total", "Coalescible reads, by whether they ran the work or joined a call in flight",
+    ["group", "role"],                    # leader / follower; ratio = follower / (leader + follower)
+)
+SINGLE_FLIGHT_CALLERS = Histogram(
+    "single_flight_callers", "Calls served by each coalesced execution",
+    ["group"], buckets=(1, 2, 3, 5, 10, 25, 50, 100, 250),
+)
+
+# ------------------------------------------------------------------ startup
+STARTUP_PHASE_SECONDS = Gauge(
+    "startup_phase_seconds", "Time taken by each phase of the last startup (see app/core/startup.py)",
+    ["phase"],                            # import / create_app / db_warmup / ... / total
+)
+
+# --------------------------------------------------------------------- push
+PUSH_CLIENTS = Gauge("push_clients", "Dashboards connected to /events")
+PUSH_EVENTS = Counter(
+    "push_events_total", "Frames queued for /events clients",
+    ["event"],                            # coins / resync
+)
+
+# ----------------------------------------------------------------- outbound
+OUTBOUND_REQUEST_DURATION = Histogram(
+    "outbound_request_duration_seconds", "Upstream round-trip time (network calls only)",
+    ["endpoint"], buckets=LATENCY_BUCKETS,
+)
+OUTBOUND_REQUESTS = Counter(
+    "outbound_requests_total", "Upstream GETs by how they were answered",
+    ["endpoint", "result"],               # network / cache / not_modified / replay
+)
+OUTBOUND_ERRORS = Counter(
+    "outbound_request_errors_total", "Upstream GETs that failed",
+    ["endpoint", "reason"],               # HTTP status code, or the exception class name
+)
+
+
+# ---------------------------------------------------------------- middleware
+class PrometheusMiddleware:
+    """
+    ASGI middleware timing every request by route template (/api/v1/crypto-metadata/{metadata_id}),
+    not raw path, so metric cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            HTTP_REQUEST_DURATION.labels(scope["method"], template, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+
+
+# ----------------------------------------------------------------------- DB
+def _operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
+def instrument_engine(engine: Engine, name: str, max_overflow: int = 0) -> None:
+    """
+    Time every statement `engine` executes, labelled by engine name and SQL verb.
+    `max_overflow` is the value the pool was built with, for the saturation gauge.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_query_start"].pop()
+        DB_STATEMENT_DURATION.labels(name, _operation(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        stack = context.connection.info.get("metrics_query_start") if context.connection else None
+        if stack:
+            stack.pop()
+        DB_STATEMENT_ERRORS.labels(name, _operation(context.statement or "")).inc()
+
+    _POOLS[name] = (engine, max_overflow)
+
+
+class _CheckoutTimingMixin:
+    """Times Pool.connect(), i.e. how long a caller waited for a connection."""
+
+    metrics_name = "default"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_name).observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    metrics_name = "sync"
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+# Engines whose pools are reported at scrape time, with their max_overflow, by engine label
+_POOLS: dict[str, tuple[Engine, int]] = {}
+
+
+class _PoolCollector:
+    """Reads pool occupancy when /metrics is scraped instead of tracking it on every checkout."""
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections currently in use", labels=["engine"])
+        size = GaugeMetricFamily("db_pool_size", "Persistent connections the pool keeps", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond pool_size", labels=["engine"])
+        saturation = GaugeMetricFamily(
+            "db_pool_saturation", "Checked-out connections / (pool_size + max_overflow)", labels=["engine"],
+        )
+        for name, (engine, max_overflow) in _POOLS.items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            in_use = pool.checkedout()
+            capacity = pool.size() + max(max_overflow, 0)
+            checked_out.add_metric([name], in_use)
+            size.add_metric([name], pool.size())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+            saturation.add_metric([name], in_use / capacity if capacity else 0.0)
+        yield from (checked_out, size, overflow, saturation)
+
+
+REGISTRY.register(_PoolCollector())
+
+
+# ---------------------------------------------------------------------- log
+class _LogDropCollector:
+    """Exports the log records dropped by rate limits, sampling or a full queue (see logging_config)."""
+
+    def collect(self):
+        dropped = CounterMetricFamily(
+            "log_records_dropped", "Log records never written, by logger and reason",
+            labels=["logger", "reason"],      # rate_limited / sampled / queue_full
+        )
+        for (name, reason), count in dropped_records().items():
+            dropped.add_metric([name, reason], count)
+        yield dropped
+
+
+REGISTRY.register(_LogDropCollector())
@@ -0,0 +1,91 @@
+"""
+Fast-path response encoding for read endpoints.
+
+Rows arrive as plain dicts straight from SQL (no ORM objects, no Pydantic
+validation) and are encoded to bytes in one call: orjson for JSON, or
+MessagePack when the client asks for it in Accept and msgpack is installed.
+"""
+
+from datetime import date, datetime
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException, Request, Response, status
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for Accept: application/msgpack
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def to_plain(value):
+    """Render values JSON/MessagePack can't carry natively the way the Pydantic schemas do."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps_json(data) -> bytes:
+    # orjson encodes UUID and datetime itself (UTC as "Z", like Pydantic); to_plain covers the rest
+    return orjson.dumps(data, default=to_plain, option=orjson.OPT_UTC_Z)
+
+
+def _accept_qualities(accept: str) -> dict[str, float]:
+    """'a/b;q=0.5, c/d' -> {'a/b': 0.5, 'c/d': 1.0}; media types lower-cased, bad q-values read as 0."""
+    qualities = {}
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        qualities[media_type.lower()] = max(quality, qualities.get(media_type.lower(), 0.0))
+    return qualities
+
+
+def wants_msgpack(request: Request) -> bool:
+    """
+    True if Accept names MessagePack with q > 0, at least as high as JSON's. JSON's
+    quality comes from its most specific match (application/json, application/*, */*);
+    MessagePack is only chosen when named explicitly, so wildcards keep JSON.
+    """
+    qualities = _accept_qualities(request.headers.get("accept", ""))
+    msgpack_q = max((qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES), default=0.0)
+    if msgpack_q <= 0:
+        return False
+    json_q = next(
+        (qualities[media_range] for media_range in (JSON_MEDIA_TYPE, "application/*", "*/*") if media_range in qualities),
+        0.0,
+    )
+    return msgpack_q >= json_q
+
+
+def encode_response(request: Request, data, status_code: int = status.HTTP_200_OK, headers: dict | None = None) -> Response:
+    """
+    Encode `data` as MessagePack if the client asked for it, JSON otherwise.
+
+    Raises:
+        HTTPException: 406 if MessagePack was requested but msgpack isn't installed.
+    """
+    if wants_msgpack(request):
+        if msgpack is None:
+            raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail="MessagePack support is not installed")
+        body = msgpack.packb(data, default=to_plain, use_bin_type=True)
+        media_type = MSGPACK_MEDIA_TYPES[0]
+    else:
+        body = dumps_json(data)
+        media_type = JSON_MEDIA_TYPE
+    response = Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+    response.headers["Vary"] = "Accept"
+    return response
@@ -0,0 +1,51 @@
+"""
+Startup timing: how long each phase of bringing the app up took.
+
+The lifespan wraps its steps in StartupTimer phases. Independent steps run
+concurrently, so phases can overlap and their sum can exceed the total. The
+breakdown is logged once the app is ready, exported as startup_phase_seconds,
+and kept on app.state.startup_timings.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Awaitable, TypeVar
+
+from app.core.logging_config import logger
+from app.core.metrics import STARTUP_PHASE_SECONDS
+
+T = TypeVar("T")
+
+
+class StartupTimer:
+    def __init__(self, started: float | None = None):
+        self.started = time.perf_counter() if started is None else started
+        self.phases: dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+        STARTUP_PHASE_SECONDS.labels(name).set(seconds)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        with self.phase(name):
+            return await awaitable
+
+    def finish(self) -> dict[str, float]:
+        """Log and return the breakdown in milliseconds, including the total."""
+        self.record("total", time.perf_counter() - self.started)
+        breakdown = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        logger.info(
+            "[STARTUP] Ready in %.0fms (%s).",
+            breakdown["total"],
+            ", ".join(f"{name} {ms:.0f}ms" for name, ms in breakdown.items() if name != "total"),
+            extra={"startup_ms": breakdown},
+        )
+        return breakdown
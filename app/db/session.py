@@ -1,17 +1,223 @@
-from sqlalchemy import create_engine
+"""
+Database engines and session factories.
+
+Nothing is created at import: the engines are built on first use (get_engine(),
+get_async_engine(), or the `engine` / `async_engine` module attributes), and
+SessionLocal / AsyncSessionLocal build theirs the first time they are called.
+The app's lifespan then opens DB_WARMUP_CONNECTIONS per engine with
+warm_up_pools(), so the first requests don't pay for the connection handshake
+(and TLS, for Neon).
+"""
+
+import asyncio
+import time
+from functools import lru_cache
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings  # We'll define this in Step 4
+from app.core.logging_config import logger
+from app.core.metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
+
+
+def pool_options(url: str, asynchronous: bool = False) -> dict:
+    """
+    Pool settings from config, on a QueuePool that reports checkout wait times.
+    SQLite (used as a local stand-in) doesn't use a QueuePool, so it gets none.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def attach_sqlite_schema(engine: Engine) -> None:
+    """
+    Make `reporting_schema.<table>` resolve on a file-backed SQLite stand-in by
+    attaching a sibling database file under that name on every new connection.
+    No-op for other backends.
+    """
+    url = engine.url
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return
+    schema_file = f"{url.database}.reporting_schema"
+
+    @event.listens_for(engine, "connect")
+    def _attach(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"ATTACH DATABASE '{schema_file}' AS reporting_schema")
+        cursor.close()
+
+
+def to_async_url(url: str) -> str:
+    """
+    Translate the configured (sync) database URL to its async-driver equivalent.
+
+    postgresql:// becomes postgresql+asyncpg://. libpq-only query options such as
+    sslmode=require (as in Neon connection strings) are mapped to asyncpg's ssl=.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+
+    query = dict(parsed.query)
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode and "ssl" not in query:
+        query["ssl"] = sslmode
+    query.setdefault("prepared_statement_cache_size", str(settings.DB_STATEMENT_CACHE_SIZE))
+    return parsed.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+
+def async_connect_args(url: str) -> dict:
+    """asyncpg keeps its own statement cache; size it alongside SQLAlchemy's."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+
+@lru_cache()
+def get_engine() -> Engine:
+    """The sync engine, created on first call."""
+    engine = create_engine(
+        settings.SQLALCHEMY_DATABASE_URI,  # This will typically be a PostgreSQL connection string
+        pool_pre_ping=True,  # Helps detect stale connections and reconnect automatically
+        **pool_options(settings.SQLALCHEMY_DATABASE_URI)
+    )
+    attach_sqlite_schema(engine)
+    instrument_engine(engine, "sync", settings.DB_MAX_OVERFLOW)
+    return engine
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """Async engine for the API routes: requests wait on Postgres without holding a threadpool slot."""
+    async_engine = create_async_engine(
+        to_async_url(settings.SQLALCHEMY_DATABASE_URI),
+        pool_pre_ping=True,
+        connect_args=async_connect_args(settings.SQLALCHEMY_DATABASE_URI),
+        **pool_options(settings.SQLALCHEMY_DATABASE_URI, asynchronous=True)
+    )
+    attach_sqlite_schema(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine, "async", settings.DB_MAX_OVERFLOW)
+    return async_engine
+
+
+class _LazySessionFactory:
+    """Calls through to a sessionmaker that is only built (with its engine) on first use."""
+
+    def __init__(self, build):
+        self._build = build
+
+    @property
+    def factory(self):
+        return self._build()
+
+    def __call__(self, **kwargs):
+        return self.factory(**kwargs)
+
+
+@lru_cache()
+def _sessionmaker() -> sessionmaker:
+    # A session is the primary way we interact with the database (e.g., querying, inserting)
+    return sessionmaker(
+        autocommit=False,  # We'll manage commits manually (recommended)
+        autoflush=False,   # Disable autoflush to avoid unintended writes
+        bind=get_engine()  # Bind the session to the sync engine
+    )
+
+
+@lru_cache()
+def _async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False  # Objects stay readable after commit without another round trip
+    )
+
+
+SessionLocal = _LazySessionFactory(_sessionmaker)             # SessionLocal() -> Session
+AsyncSessionLocal = _LazySessionFactory(_async_sessionmaker)  # AsyncSessionLocal() -> AsyncSession
+
+
+def __getattr__(name: str):
+    # `from app.db.session import engine` keeps working; the engine is built at that point
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ------------------------------------------------------------------ warm-up
+def _warm_count(pool, wanted: int) -> int:
+    # SQLite stand-ins don't pool; one connection is enough to check the database
+    return min(wanted, pool.size()) if isinstance(pool, QueuePool) else min(wanted, 1)
+
+
+def _warm_sync(engine: Engine, wanted: int) -> int:
+    connections = []
+    try:
+        for _ in range(_warm_count(engine.pool, wanted)):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def _warm_async(engine: AsyncEngine, wanted: int) -> int:
+    count = _warm_count(engine.sync_engine.pool, wanted)
+    opened = asyncio.Event()
+    ready = 0
+
+    async def hold():
+        nonlocal ready
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            ready += 1
+            if ready == count:
+                opened.set()
+            # Keep it checked out until all are open, or the pool would hand this one out again
+            await opened.wait()
+
+    try:
+        await asyncio.gather(*(hold() for _ in range(count)))
+    finally:
+        # If one connect failed, `ready` never reaches `count`; release the ones that did open
+        opened.set()
+    return count
+
+
+async def warm_up_pools(connections: int) -> dict[str, int]:
+    """
+    Open `connections` pooled connections on each engine (capped at the pool
+    size) and hand them back to the pool, so they are ready for the first
+    requests. Async connections open concurrently; sync ones on a worker thread.
 
-# Create the SQLAlchemy engine using the database URL from the config
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,  # This will typically be a PostgreSQL connection string
-    pool_pre_ping=True  # Helps detect stale connections and reconnect automatically
-)
-
-# Create a sessionmaker factory bound to the engine
-# A session is the primary way we interact with the database (e.g., querying, inserting)
-SessionLocal = sessionmaker(
-    autocommit=False,  # We'll manage commits manually (recommended)
-    autoflush=False,   # Disable autoflush to avoid unintended writes
-    bind=engine        # Bind the session to the engine created above
-)
+    Returns:
+        Connections opened per engine.
+    """
+    if connections <= 0:
+        return {}
+    started = time.perf_counter()
+    opened_async, opened_sync = await asyncio.gather(
+        _warm_async(get_async_engine(), connections),
+        asyncio.to_thread(_warm_sync, get_engine(), connections),
+    )
+    logger.info(
+        "[DB] Warmed up %d async and %d sync connections in %.0fms.",
+        opened_async, opened_sync, (time.perf_counter() - started) * 1000,
+    )
+    return {"async": opened_async, "sync": opened_sync}
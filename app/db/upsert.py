@@ -0,0 +1,38 @@
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, table):
+    """
+    Return an INSERT construct that supports ON CONFLICT for the session's backend.
+
+    Postgres is what we run in production; SQLite is accepted so the same code path
+    works against a local stand-in database.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert(table)
+    return sqlite_insert(table)
+
+
+def changed_column_updates(table, key: str, changes: list[dict]):
+    """
+    Group per-row changes into UPDATE ... WHERE <key> = :b_key statements for executemany.
+
+    Each dict in `changes` holds the row's `key` plus only the columns that changed. Rows
+    that change the same set of columns share one statement, and each statement SETs just
+    those columns, so an unchanged column is never rewritten. Yields (statement, params).
+    """
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for row in changes:
+        groups.setdefault(tuple(sorted(column for column in row if column != key)), []).append(row)
+
+    for columns, rows in groups.items():
+        if not columns:
+            continue
+        stmt = update(table).where(table.c[key] == bindparam("b_key")).values(
+            {column: bindparam(f"b_{column}") for column in columns}
+        )
+        params = [{"b_key": row[key], **{f"b_{column}": row[column] for column in columns}} for row in rows]
+        yield stmt, params
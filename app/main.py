@@ -1,55 +1,219 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response, status
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-import subprocess
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from app.core.config import get_settings, settings
 from app.core.logging_config import logger
-from app.api.v1 import crypto_metadata_endpoints
-from app.db.session import SessionLocal
-from app.models.metadata_models import CryptoMetadata
+from app.core.metrics import PrometheusMiddleware
+from app.core.startup import StartupTimer
+from app.api.v1 import analytics_endpoints, crypto_metadata_endpoints, price_history_endpoints
+from app.services.dashboard_cache import DashboardCache
+from app.db.session import AsyncSessionLocal, get_async_engine, get_engine, warm_up_pools
+from app.services.coin_broadcaster import CoinBroadcaster
+from app.services.coin_index import CoinIndex
+from app.services.pg_change_feed import PgChangeFeed
+from app.services.refresh_job_manager import RefreshJobManager
+from app.services.refresh_queue import RefreshQueue
+from app.services.snapshot_service import SnapshotMaintenanceTask
+
+# Module imports are the first phase of the startup breakdown
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
-# --------------------------------------
-# Instantiate FastAPI application
-# --------------------------------------
-app = FastAPI(
-    title="Crypto Metadata API",
-    description="An API and dashboard for managing cryptocurrency metadata",
-    version="1.0.0"
-)
 
 # --------------------------------------
-# API Router
+# Lifespan: warm-up, snapshot archive upkeep, coin index, live-update push, background refresh jobs
 # --------------------------------------
-app.include_router(crypto_metadata_endpoints.router)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    timer: StartupTimer = app.state.startup_timer
+    with timer.phase("settings"):
+        get_settings()
+    with timer.phase("engines"):
+        engine = get_engine()
+        async_engine = get_async_engine()
+
+    # Open pooled connections now so the first requests skip the handshake (and TLS)
+    try:
+        await timer.timed("db_warmup", warm_up_pools(settings.DB_WARMUP_CONNECTIONS))
+    except Exception as e:
+        logger.warning("[STARTUP] Connection warm-up failed, continuing without it: %s", e)
+
+    coin_index: CoinIndex = app.state.coin_index
+    app.state.snapshot_maintenance = SnapshotMaintenanceTask(engine, settings.SNAPSHOT_MAINTENANCE_INTERVAL_SECONDS)
+    await asyncio.gather(
+        timer.timed("snapshot_maintenance", app.state.snapshot_maintenance.start()),
+        timer.timed("coin_index", coin_index.start()),
+        # Compiles index.html into Jinja2's template cache
+        timer.timed("template", asyncio.to_thread(app.state.templates.env.get_template, "index.html")),
+    )
+    # The coin index only serves reads while other processes' writes reach it through the feed
+    with timer.phase("change_feed"):
+        app.state.change_feed = PgChangeFeed(async_engine, settings.PUSH_PG_CHANNEL)
+        coin_index.change_feed = app.state.change_feed
+        if settings.PUSH_PG_NOTIFY:
+            await app.state.change_feed.start()
+
+    # Render the dashboard once, so the first visitor gets the cached page
+    try:
+        await timer.timed("dashboard", app.state.dashboard_cache.get())
+    except Exception as e:
+        logger.warning("[STARTUP] Dashboard pre-render failed; the first request renders it: %s", e)
+
+    with timer.phase("background_tasks"):
+        app.state.broadcaster = CoinBroadcaster(
+            coin_index,
+            queue_size=settings.PUSH_CLIENT_QUEUE_SIZE,
+            heartbeat_seconds=settings.PUSH_HEARTBEAT_SECONDS,
+        )
+        await app.state.broadcaster.start()
+        app.state.refresh_jobs = RefreshJobManager(
+            top_n=settings.REFRESH_TOP_N,
+            concurrency=settings.REFRESH_CONCURRENCY,
+            interval_seconds=settings.REFRESH_INTERVAL_SECONDS,
+            mode=settings.REFRESH_MODE,
+            queue=RefreshQueue(
+                engine, settings.REFRESH_QUEUE_LEASE_SECONDS, settings.REFRESH_QUEUE_MAX_ATTEMPTS
+            ) if settings.REFRESH_MODE == "queue" else None,
+        )
+        await app.state.refresh_jobs.start()
+    app.state.startup_timings = timer.finish()
+    yield
+    await app.state.refresh_jobs.stop()
+    await app.state.change_feed.stop()
+    await app.state.broadcaster.stop()
+    await coin_index.stop()
+    await app.state.snapshot_maintenance.stop()
+
 
 # --------------------------------------
-# Static files and Templates (for frontend)
+# Web UI route (dashboard)
 # --------------------------------------
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-templates = Jinja2Templates(directory="app/templates")
+web_router = APIRouter()
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison: `*`, or any listed tag equal to `etag` ignoring W/."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+@web_router.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    started = time.perf_counter()
+    snapshot, cache_hit = await request.app.state.dashboard_cache.get()
+
+    headers = {
+        "Vary": "Accept-Encoding",
+        "X-Data-Version": str(snapshot.version),
+        "X-Dashboard-Cache": "hit" if cache_hit else "miss",
+    }
+    if snapshot.gzipped and "gzip" in request.headers.get("accept-encoding", ""):
+        body, headers["ETag"] = snapshot.gzipped, snapshot.gzip_etag
+        headers["Content-Encoding"] = "gzip"
+    else:
+        body, headers["ETag"] = snapshot.html, snapshot.etag
+    # Only the validator of the variant being served counts as a match
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        body, status_code = b"", status.HTTP_304_NOT_MODIFIED
+    else:
+        status_code = status.HTTP_200_OK
+
+    timing = f"total;dur={(time.perf_counter() - started) * 1000:.2f}"
+    if not cache_hit:
+        timing += f", render;dur={snapshot.render_ms:.2f}"
+    headers["Server-Timing"] = timing
+    return Response(content=body, status_code=status_code, media_type="text/html; charset=utf-8", headers=headers)
 
 # --------------------------------------
-# Web UI route (dashboard)
+# Refresh jobs (run in the background, poll for status)
 # --------------------------------------
-@app.get("/", response_class=HTMLResponse)
-def home(request: Request):
-    db = SessionLocal()
-    coins = db.query(CryptoMetadata).order_by(CryptoMetadata.market_cap_rank).all()
-    return templates.TemplateResponse("index.html", {"request": request, "coins": coins})
+@web_router.post("/refresh", status_code=status.HTTP_202_ACCEPTED)
+async def refresh(request: Request):
+    job = request.app.state.refresh_jobs.trigger()
+    return job.to_dict()
+
+
+@web_router.get("/refresh/{job_id}")
+async def refresh_status(job_id: str, request: Request):
+    job = request.app.state.refresh_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    return job.to_dict()
 
 # --------------------------------------
-# Refresh data endpoint (calls fetch script)
+# Live updates: per-coin deltas as server-sent events
 # --------------------------------------
-@app.post("/refresh")
-def refresh():
-    subprocess.run(["python", "app/scripts/fetch_and_post_metadata.py"])
-    return {"status": "ok"}
+@web_router.get("/events", include_in_schema=False)
+async def events(request: Request):
+    return StreamingResponse(
+        request.app.state.broadcaster.stream(request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # --------------------------------------
 # Optional API Health check route
 # --------------------------------------
-@app.get("/api/health", tags=["Health"])
+@web_router.get("/api/health", tags=["Health"])
 def health():
     logger.info("Health check passed.")
     return {"status": "ok", "message": "Welcome to the Crypto Metadata API"}
+
+# --------------------------------------
+# Prometheus scrape endpoint
+# --------------------------------------
+@web_router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+# --------------------------------------
+# App factory: `uvicorn app.main:app`, or `uvicorn --factory app.main:create_app`
+# --------------------------------------
+def create_app() -> FastAPI:
+    """
+    Build the app. Only cheap wiring happens here; connections, the coin index,
+    the compiled template and the first dashboard render are set up in the
+    lifespan and reported in the startup breakdown.
+    """
+    timer = StartupTimer(started=_IMPORT_STARTED)
+    timer.record("import", _IMPORT_SECONDS)
+    with timer.phase("create_app"):
+        app = FastAPI(
+            title="Crypto Metadata API",
+            description="An API and dashboard for managing cryptocurrency metadata",
+            version="1.0.0",
+            lifespan=lifespan,
+        )
+        app.state.startup_timer = timer
+        # Request latency per route template, exported at /metrics
+        app.add_middleware(PrometheusMiddleware)
+
+        app.include_router(crypto_metadata_endpoints.router)
+        app.include_router(price_history_endpoints.router)
+        app.include_router(analytics_endpoints.router)
+        app.include_router(web_router)
+
+        # Static files and templates (for frontend); the static dir is checked on first request, not here
+        app.mount("/static", StaticFiles(directory="app/static", check_dir=False), name="static")
+        # index.html is compiled in the lifespan, before the first request
+        app.state.templates = Jinja2Templates(directory="app/templates")
+        # In-memory replica of crypto_metadata serving the read endpoints and the dashboard
+        app.state.coin_index = CoinIndex(AsyncSessionLocal)
+        # Rendered dashboard, reused until the data version changes
+        app.state.dashboard_cache = DashboardCache(app.state.templates.env, "index.html", index=app.state.coin_index)
+    return app
+
+
+app = create_app()
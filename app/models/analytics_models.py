@@ -0,0 +1,62 @@
+from sqlalchemy import Column, String, Integer, DateTime, BigInteger, Float, Index
+from app.db.base import Base
+
+
+class CoinAnalytics(Base):
+    """
+    Per-coin inputs to the market analytics, one row per tracked coin.
+
+    Maintained by AnalyticsService.refresh after each ingestion: rows are diffed
+    against crypto_metadata and only the coins whose inputs changed are rewritten.
+    When a coin's rank moves, the rank it had before is kept in previous_rank, so
+    the movers endpoints read the latest move straight off this table.
+    """
+    __tablename__ = "coin_analytics"
+    __table_args__ = (
+        # Top gainers / losers: ORDER BY rank_change DESC / ASC
+        Index("ix_coin_analytics_rank_change", "rank_change"),
+        {'schema': 'reporting_schema'},
+    )
+
+    crypto_symbol = Column(String(10), primary_key=True)
+    crypto_name = Column(String(255), nullable=False)
+    market_cap_rank = Column(Integer)
+    previous_rank = Column(Integer)                  # rank before the latest move
+    rank_change = Column(Integer)                    # previous_rank - market_cap_rank; > 0 climbed
+    rank_changed_at = Column(DateTime(timezone=True))
+    circulating_supply = Column(BigInteger)
+    max_supply = Column(BigInteger)
+    supply_ratio = Column(Float)                     # circulating / max supply; NULL if uncapped
+    return_1d_pct = Column(Float)
+    return_7d_pct = Column(Float)
+    volatility_30d_pct = Column(Float)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class MarketSummary(Base):
+    """
+    Aggregates over coin_analytics, recomputed whenever a refresh changes a row
+    there. Holds a single row (scope "tracked"). ranks_moved_at is stamped by each
+    refresh pass that moves a rank, and marks which rank moves are the latest.
+    """
+    __tablename__ = "market_summary"
+    __table_args__ = {'schema': 'reporting_schema'}
+
+    scope = Column(String(16), primary_key=True)
+    coin_count = Column(Integer, nullable=False)
+    ranked_count = Column(Integer, nullable=False)
+    capped_count = Column(Integer, nullable=False)   # coins with a max supply
+    supply_ratio_p10 = Column(Float)
+    supply_ratio_p25 = Column(Float)
+    supply_ratio_p50 = Column(Float)
+    supply_ratio_p75 = Column(Float)
+    supply_ratio_p90 = Column(Float)
+    supply_ratio_mean = Column(Float)
+    advancers_1d = Column(Integer, nullable=False)   # return_1d_pct > 0
+    decliners_1d = Column(Integer, nullable=False)   # return_1d_pct < 0
+    return_1d_median = Column(Float)
+    return_7d_median = Column(Float)
+    return_7d_mean = Column(Float)
+    volatility_30d_median = Column(Float)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+    ranks_moved_at = Column(DateTime(timezone=True))
@@ -1,11 +1,10 @@
 import uuid
-from sqlalchemy import Column, String, Integer, DateTime, Text, func, BigInteger
+from sqlalchemy import Column, String, Integer, DateTime, Text, func, BigInteger, Float, Index, DDL, event
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base import Base
 
 class CryptoMetadata(Base):
     __tablename__ = "crypto_metadata"
-    __table_args__ = {'schema': 'reporting_schema'}
 
     crypto_metadata_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     crypto_name = Column(String(255), nullable=False)
@@ -25,3 +24,54 @@ class CryptoMetadata(Base):
 
     # Stores the most recent headline related to the coin (e.g., "2025-05-26: SEC approves ETH ETF")
     recent_headline = Column(String(512))
+
+    # Numeric trend analytics, recomputed from crypto_price_history after each refresh
+    return_1d_pct = Column(Float)
+    return_7d_pct = Column(Float)
+    return_30d_pct = Column(Float)
+    volatility_30d_pct = Column(Float)       # annualised, from daily log returns
+    max_drawdown_30d_pct = Column(Float)     # worst peak-to-trough move, <= 0
+    trend_updated_at = Column(DateTime(timezone=True))
+
+    # Fingerprint of the ingestion-owned columns (see crypto_metadata_service.CONTENT_COLUMNS);
+    # refreshes skip rows whose payload hashes the same. NULL until the row is next written.
+    content_hash = Column(String(32))
+
+    __table_args__ = (
+        # Keyset pagination: ORDER BY market_cap_rank NULLS LAST, crypto_symbol
+        Index("ix_crypto_metadata_rank_symbol", market_cap_rank, crypto_symbol),
+        # ?updated_since= filter
+        Index("ix_crypto_metadata_updated_at", updated_at),
+        # ?symbol_prefix= filter: lower(crypto_symbol) LIKE 'abc%'
+        Index(
+            "ix_crypto_metadata_symbol_lower_prefix",
+            func.lower(crypto_symbol).label("symbol_lower"),
+            postgresql_ops={"symbol_lower": "varchar_pattern_ops"},
+        ),
+        {'schema': 'reporting_schema'},
+    )
+
+
+# ---------------------------------------------------------------- search
+# Full-text search (see CryptoMetadataService.search_crypto_metadata) is Postgres-only,
+# so its column and indexes are DDL here rather than mapped: the ORM never loads the
+# tsvector, and create_all() on a SQLite stand-in skips them. The column is GENERATED,
+# so Postgres keeps it current on every write. Mirrors migration e6f2a9c4b1d3, which
+# explains the weights.
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(crypto_name, '') || ' ' || crypto_symbol), 'A') || "
+    "setweight(to_tsvector('english', translate(coalesce(recent_headline, ''), '/-_.', '    ')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(notes, '')), 'C')"
+)
+
+SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE reporting_schema.crypto_metadata ADD COLUMN search_vector tsvector "
+    f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED",
+    "CREATE INDEX ix_crypto_metadata_search_vector ON reporting_schema.crypto_metadata USING gin (search_vector)",
+    "CREATE INDEX ix_crypto_metadata_name_trgm ON reporting_schema.crypto_metadata USING gin (crypto_name gin_trgm_ops)",
+    "CREATE INDEX ix_crypto_metadata_symbol_trgm ON reporting_schema.crypto_metadata USING gin (crypto_symbol gin_trgm_ops)",
+)
+
+for statement in SEARCH_DDL:
+    event.listen(CryptoMetadata.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, Float
+from app.db.base import Base
+
+
+class CryptoPriceHistory(Base):
+    """
+    One price observation per coin and timestamp.
+
+    Kept deliberately narrow (no surrogate key) since it grows by hundreds of rows
+    per coin per month; the composite primary key doubles as the lookup index.
+    """
+    __tablename__ = "crypto_price_history"
+    __table_args__ = {'schema': 'reporting_schema'}
+
+    crypto_symbol = Column(String(10), primary_key=True)
+    observed_at = Column(DateTime(timezone=True), primary_key=True)
+    price_usd = Column(Float, nullable=False)
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, BigInteger, Index, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+
+class RefreshQueueJob(Base):
+    """
+    One coin to fetch in a sharded refresh run (REFRESH_MODE=queue).
+
+    A coordinator turns get_top_coin_ids into one row per coin; any number of
+    workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED and hold them under a
+    lease. A row whose lease runs out (its worker died) can be claimed again until
+    it has used up its attempts. See app/services/refresh_queue.py.
+    """
+    __tablename__ = "refresh_queue"
+    __table_args__ = (
+        UniqueConstraint("run_id", "coin_id"),
+        # Claims scan queued (and expired running) rows of the run in rank order
+        Index("ix_refresh_queue_status_position", "status", "position"),
+        {'schema': 'reporting_schema'},
+    )
+
+    job_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    run_id = Column(UUID(as_uuid=True), nullable=False)
+    coin_id = Column(String(100), nullable=False)          # CoinGecko id
+    position = Column(Integer, nullable=False)             # market cap order within the run
+    status = Column(String(16), nullable=False, default="queued")   # queued / running / done / failed
+    attempts = Column(Integer, nullable=False, default=0)
+    claimed_by = Column(String(100))                       # worker id (host:pid) holding the lease
+    lease_expires_at = Column(DateTime(timezone=True))
+    enqueued_at = Column(DateTime(timezone=True), server_default=func.current_timestamp(), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+    error = Column(Text)
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, BigInteger, Float, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+
+class CryptoMetadataSnapshot(Base):
+    """
+    Append-only archive of crypto_metadata rows, one row per coin per write.
+
+    On Postgres the table is range-partitioned by day on snapshot_at, so retention
+    drops whole partitions instead of deleting rows (see snapshot_service).
+    Partitions are created ahead of time; a DEFAULT partition catches the rest.
+    """
+    __tablename__ = "crypto_metadata_snapshot"
+    __table_args__ = (
+        # The partition key has to be part of the primary key
+        PrimaryKeyConstraint("crypto_symbol", "snapshot_at"),
+        {'schema': 'reporting_schema', 'postgresql_partition_by': 'RANGE (snapshot_at)'},
+    )
+
+    crypto_symbol = Column(String(10), nullable=False)
+    snapshot_at = Column(DateTime(timezone=True), nullable=False)
+    change_source = Column(String(32), nullable=False)   # create / update / bulk_upsert / trend_metrics / delete
+
+    crypto_metadata_id = Column(UUID(as_uuid=True), nullable=False)
+    crypto_name = Column(String(255), nullable=False)
+    market_cap_rank = Column(Integer)
+    circulating_supply = Column(BigInteger)
+    max_supply = Column(BigInteger)
+    listed_exchange = Column(String(255), nullable=False)
+    notes = Column(Text)
+    trend_info = Column(String(255))
+    recent_headline = Column(String(512))
+    return_1d_pct = Column(Float)
+    return_7d_pct = Column(Float)
+    return_30d_pct = Column(Float)
+    volatility_30d_pct = Column(Float)
+    max_drawdown_30d_pct = Column(Float)
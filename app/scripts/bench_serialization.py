@@ -0,0 +1,131 @@
+"""
+Compare the two read paths for the metadata list:
+
+  orm      db.query(CryptoMetadata) -> CryptoMetadataOut.model_validate -> stdlib json
+           (what FastAPI does for a response_model route)
+  fast     SELECT of plain columns -> dicts -> orjson (the current endpoints)
+  msgpack  same rows -> MessagePack (Accept: application/msgpack)
+
+By default it seeds an in-memory SQLite database with synthetic rows so the
+numbers are reproducible; pass --database-url to time against real data instead.
+
+    python app/scripts/bench_serialization.py --rows 5000 --repeat 30
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+if __package__ in (None, ""):
+    # Allow running as `python app/scripts/bench_serialization.py` from the project root
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.crypto_metadata_endpoints import CryptoMetadataOut
+from app.core.serialization import dumps_json, msgpack
+from app.models.metadata_models import CryptoMetadata
+from app.services.crypto_metadata_service import metadata_select
+
+
+def sqlite_engine(rows: int):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def attach_schema(dbapi_connection, _):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS reporting_schema")
+
+    CryptoMetadata.__table__.create(engine)
+    with Session(engine) as db:
+        db.bulk_insert_mappings(CryptoMetadata, [
+            {
+                "crypto_metadata_id": uuid.uuid4(),
+                "crypto_name": f"Coin {i}",
+                "crypto_symbol": f"C{i:06d}",
+                "market_cap_rank": i + 1,
+                "circulating_supply": 21_000_000 * (i + 1),
+                "max_supply": 21_000_000 * (i + 2),
+                "listed_exchange": "Binance, Coinbase, Kraken",
+                "notes": "x" * 200,
+                "trend_info": "Change over 7 days: 3.14%",
+                "recent_headline": f"https://news.example.com/coin-{i}",
+                "return_1d_pct": 0.5,
+                "return_7d_pct": 3.14,
+                "return_30d_pct": -7.2,
+                "volatility_30d_pct": 61.8,
+                "max_drawdown_30d_pct": -12.5,
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+    return engine
+
+
+def orm_path(db: Session) -> bytes:
+    records = db.query(CryptoMetadata).order_by(CryptoMetadata.market_cap_rank).all()
+    models = [CryptoMetadataOut.model_validate(record) for record in records]
+    # Mirrors fastapi.routing.serialize_response + JSONResponse.render
+    return json.dumps(jsonable_encoder(models), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(db: Session) -> bytes:
+    return dumps_json([dict(row) for row in db.execute(metadata_select()).mappings()])
+
+
+def msgpack_path(db: Session) -> bytes:
+    rows = [dict(row) for row in db.execute(metadata_select()).mappings()]
+    return msgpack.packb(rows, default=str, use_bin_type=True)
+
+
+def time_path(engine, path, repeat: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        with Session(engine) as db:
+            started = time.perf_counter()
+            size = len(path(db))
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ORM vs fast-path list serialization.")
+    parser.add_argument("--rows", type=int, default=5000, help="Synthetic rows to seed (SQLite only)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", help="Benchmark against this database instead of seeded SQLite")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url) if args.database_url else sqlite_engine(args.rows)
+    paths = {"orm": orm_path, "fast": fast_path}
+    if msgpack is not None:
+        paths["msgpack"] = msgpack_path
+
+    for path in paths.values():  # warm-up: compile statements, fill caches
+        time_path(engine, path, 1)
+    results = {name: time_path(engine, path, args.repeat) for name, path in paths.items()}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    baseline = results["orm"]["p50_ms"]
+    print(f"{'path':<8} {'p50 ms':>9} {'p95 ms':>9} {'bytes':>10} {'speedup':>8}")
+    for name, result in results.items():
+        print(f"{name:<8} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['bytes']:>10} "
+              f"{baseline / result['p50_ms']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
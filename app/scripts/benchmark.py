@@ -0,0 +1,339 @@
+"""
+Reproducible benchmark for the API routes, the dashboard and a full refresh cycle.
+
+Everything runs locally: the app is served by uvicorn in-process against a
+SQLite file (default) or a Postgres database given with --database-url, and
+CoinGecko / the news sites are replaced by app/scripts/fake_upstreams.py.
+
+    python app/scripts/benchmark.py --coins 500 --requests 200 --concurrency 8 \\
+        --output bench/$(git rev-parse --short HEAD).json
+    python app/scripts/benchmark.py --compare bench/old.json --output bench/new.json
+
+WARNING: the crypto_metadata, crypto_price_history and crypto_metadata_snapshot
+tables of the target database are emptied first. Point --database-url at a scratch database.
+
+The refresh cycle is seeded by two POST /refresh runs (cold: every coin is
+new; warm: nothing changed upstream). CoinGecko pacing is switched off so the
+numbers measure this code rather than the rate limit.
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+if __package__ in (None, ""):
+    # Allow running as `python app/scripts/benchmark.py` from the project root
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import requests
+
+from app.scripts.fake_upstreams import FakeUpstreams
+
+METADATA_URL = "/api/v1/crypto-metadata/"
+BULK_SIZE = 100
+REFRESH_POLL_SECONDS = 0.05
+
+
+# --------------------------------------------------------------------- stats
+def summarize(latencies_ms: list[float], wall_seconds: float, errors: int) -> dict:
+    ordered = sorted(latencies_ms)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "p50_ms": round(pct(50), 3),
+        "p90_ms": round(pct(90), 3),
+        "p99_ms": round(pct(99), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+        "throughput_rps": round(len(ordered) / wall_seconds, 1) if wall_seconds else 0.0,
+    }
+
+
+def run_load(base_url: str, make_request, count: int, concurrency: int, warmup: int = 5) -> dict:
+    """
+    Issue `count` requests built by make_request(i) -> (method, path, kwargs)
+    from `concurrency` threads, each with its own keep-alive session.
+    """
+    local = threading.local()
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def one(i: int) -> tuple[float, bool]:
+        method, path, kwargs = make_request(i)
+        started = time.perf_counter()
+        response = session().request(method, base_url + path, timeout=60, **kwargs)
+        _ = response.content
+        return (time.perf_counter() - started) * 1000, response.status_code < 400
+
+    for i in range(warmup):
+        one(-1 - i)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(one, range(count)))
+        wall = time.perf_counter() - started
+    return summarize([ms for ms, _ in results], wall, sum(1 for _, ok in results if not ok))
+
+
+# ------------------------------------------------------------------ database
+def prepare_database() -> str:
+    """Create the schema/tables if needed and empty them. Returns the backend name."""
+    from sqlalchemy import delete, text
+
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.models.analytics_models import CoinAnalytics, MarketSummary
+    from app.models.metadata_models import CryptoMetadata
+    from app.models.price_history_models import CryptoPriceHistory
+    from app.models.snapshot_models import CryptoMetadataSnapshot
+
+    backend = engine.url.get_backend_name()
+    with engine.begin() as conn:
+        if backend == "postgresql":
+            conn.execute(text("CREATE SCHEMA IF NOT EXISTS reporting_schema"))
+        Base.metadata.create_all(conn)
+        conn.execute(delete(CryptoPriceHistory))
+        conn.execute(delete(CryptoMetadataSnapshot))
+        conn.execute(delete(CoinAnalytics))
+        conn.execute(delete(MarketSummary))
+        conn.execute(delete(CryptoMetadata))
+    return backend
+
+
+# ------------------------------------------------------------------- serving
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_app(port: int):
+    import uvicorn
+
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="benchmark-uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+# ------------------------------------------------------------------- phases
+def bench_refresh(base_url: str, upstreams: FakeUpstreams) -> dict:
+    """Trigger POST /refresh and poll it to completion."""
+    upstreams.reset_calls()
+    started = time.perf_counter()
+    job = requests.post(f"{base_url}/refresh", timeout=10).json()
+    while job["status"] in ("pending", "running"):
+        time.sleep(REFRESH_POLL_SECONDS)
+        job = requests.get(f"{base_url}/refresh/{job['job_id']}", timeout=10).json()
+    return {
+        "status": job["status"],
+        "error": job["error"],
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "job_seconds": job["duration_seconds"],
+        "report": job["report"],
+        "upstream_calls": upstreams.reset_calls(),
+    }
+
+
+def bench_routes(base_url: str, count: int, concurrency: int) -> dict:
+    seeded = []
+    cursor = None
+    while True:
+        response = requests.get(base_url + METADATA_URL, params={"limit": 1000, **({"cursor": cursor} if cursor else {})})
+        seeded.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    if not seeded:
+        raise RuntimeError("No rows to benchmark against; did the refresh fail?")
+
+    def payload(row: dict, i: int) -> dict:
+        return {
+            "crypto_name": row["crypto_name"],
+            "crypto_symbol": row["crypto_symbol"],
+            "market_cap_rank": row["market_cap_rank"],
+            "circulating_supply": row["circulating_supply"],
+            "max_supply": row["max_supply"],
+            "listed_exchange": row["listed_exchange"],
+            "notes": f"benchmark edit {i}",
+        }
+
+    def create(i: int):
+        return "POST", METADATA_URL, {"json": {
+            "crypto_name": f"Bench {i}", "crypto_symbol": f"BN{i:08d}", "listed_exchange": "Bench",
+        }}
+
+    results = {}
+    scenarios = [
+        ("GET /", lambda i: ("GET", "/", {"headers": {"Accept-Encoding": "gzip"}})),
+        ("GET /api/v1/crypto-metadata/?limit=100",
+         lambda i: ("GET", METADATA_URL, {"params": {"limit": 100}})),
+        ("GET /api/v1/crypto-metadata/?limit=1000",
+         lambda i: ("GET", METADATA_URL, {"params": {"limit": 1000}})),
+        ("GET /api/v1/crypto-metadata/{id}",
+         lambda i: ("GET", f"{METADATA_URL}{seeded[i % len(seeded)]['crypto_metadata_id']}", {})),
+        ("GET /api/v1/crypto-metadata/export",
+         lambda i: ("GET", f"{METADATA_URL}export", {})),
+        ("GET /api/v1/crypto-metadata/search",
+         lambda i: ("GET", f"{METADATA_URL}search", {"params": {"q": seeded[i % len(seeded)]["crypto_name"][:4]}})),
+        ("GET /api/v1/analytics/movers",
+         lambda i: ("GET", "/api/v1/analytics/movers", {"params": {"direction": ("gainers", "losers")[i % 2]}})),
+        ("GET /api/v1/analytics/summary",
+         lambda i: ("GET", "/api/v1/analytics/summary", {})),
+        ("PUT /api/v1/crypto-metadata/{id}",
+         lambda i: ("PUT", f"{METADATA_URL}{seeded[i % len(seeded)]['crypto_metadata_id']}",
+                    {"json": payload(seeded[i % len(seeded)], i)})),
+        ("POST /api/v1/crypto-metadata/bulk",
+         lambda i: ("POST", f"{METADATA_URL}bulk",
+                    {"json": [payload(row, i) for row in (seeded * 2)[(i * BULK_SIZE) % len(seeded):][:BULK_SIZE]]})),
+        ("POST /api/v1/crypto-metadata/", create),
+    ]
+    for name, make_request in scenarios:
+        results[name] = run_load(base_url, make_request, count, concurrency)
+        print(f"  {name:<45} p50 {results[name]['p50_ms']:>8.2f}ms  p99 {results[name]['p99_ms']:>8.2f}ms  "
+              f"{results[name]['throughput_rps']:>8.1f} req/s  errors {results[name]['errors']}")
+
+    # Delete what the POST scenario created
+    response = requests.get(base_url + METADATA_URL,
+                            params={"symbol_prefix": "BN", "limit": 1000, "fields": "crypto_metadata_id"})
+    ids = [row["crypto_metadata_id"] for row in response.json()]
+    if ids:
+        name = "DELETE /api/v1/crypto-metadata/{id}"
+        results[name] = run_load(base_url, lambda i: ("DELETE", f"{METADATA_URL}{ids[i]}", {}),
+                                 len(ids), concurrency, warmup=0)
+        print(f"  {name:<45} p50 {results[name]['p50_ms']:>8.2f}ms  p99 {results[name]['p99_ms']:>8.2f}ms  "
+              f"{results[name]['throughput_rps']:>8.1f} req/s  errors {results[name]['errors']}")
+    return results
+
+
+# ------------------------------------------------------------------ compare
+def compare(baseline: dict, current: dict) -> None:
+    print(f"\nCompared with {baseline['meta'].get('git_commit', '?')} ({baseline['meta']['started_at']}):")
+    for name, result in current["routes"].items():
+        old = baseline.get("routes", {}).get(name)
+        if not old:
+            continue
+        print(f"  {name:<45} p50 {_delta(old['p50_ms'], result['p50_ms'])}  p99 {_delta(old['p99_ms'], result['p99_ms'])}")
+    for name, result in current["refresh"].items():
+        old = baseline.get("refresh", {}).get(name)
+        if old and old.get("job_seconds") and result.get("job_seconds"):
+            print(f"  refresh ({name}){'':<35} {_delta(old['job_seconds'], result['job_seconds'], 's')}")
+
+
+def _delta(old: float, new: float, unit: str = "ms") -> str:
+    change = (new - old) / old * 100 if old else 0.0
+    return f"{old:.2f}{unit} -> {new:.2f}{unit} ({change:+.1f}%)"
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the API, dashboard and refresh cycle locally")
+    parser.add_argument("--coins", type=int, default=500, help="Coins served by the fake CoinGecko and refreshed")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per route")
+    parser.add_argument("--refresh-mode", choices=("snapshot", "detail"), default="snapshot")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0, help="Delay added by the fake upstreams")
+    parser.add_argument("--database-url", help="Scratch database to use instead of a temporary SQLite file")
+    parser.add_argument("--output", default="benchmark.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to print deltas against")
+    args = parser.parse_args()
+
+    output = Path(args.output).resolve()
+    baseline = Path(args.compare).resolve() if args.compare else None
+    # app.main mounts app/static relative to the working directory
+    os.chdir(Path(__file__).resolve().parents[2])
+
+    workdir = Path(tempfile.mkdtemp(prefix="crypto-bench-"))
+    upstreams = FakeUpstreams(args.coins, args.upstream_latency_ms).start()
+
+    # Must be in place before anything under app/ reads settings or builds the engines
+    os.environ.update({
+        "SQLALCHEMY_DATABASE_URI": args.database_url or f"sqlite:///{workdir / 'bench.db'}",
+        "REFRESH_TOP_N": str(args.coins),
+        "REFRESH_MODE": args.refresh_mode,
+        "REFRESH_INTERVAL_SECONDS": "0",
+        "COINGECKO_API_URL": f"{upstreams.url}/api/v3",
+        "INGESTION_NEWS_SOURCES": " ".join(upstreams.news_sources),
+        "INGESTION_CACHE_DIR": str(workdir / "cache"),
+        "INGESTION_HTTP_CACHE": "0",
+    })
+
+    from app.scripts import fetch_and_post_metadata
+    from app.scripts.rate_limiter import AdaptiveTokenBucket
+
+    unlimited = 1_000_000.0
+    fetch_and_post_metadata.COINGECKO_LIMITER = AdaptiveTokenBucket(rate=unlimited, capacity=unlimited, max_rate=unlimited)
+
+    backend = prepare_database()
+    port = free_port()
+    server, thread = serve_app(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    result = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": backend,
+            "coins": args.coins,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "refresh_mode": args.refresh_mode,
+            "upstream_latency_ms": args.upstream_latency_ms,
+        },
+        "refresh": {},
+        "routes": {},
+    }
+    try:
+        print(f"Refreshing {args.coins} coins from the fake upstreams ({backend})...")
+        for phase in ("cold", "warm"):
+            result["refresh"][phase] = bench_refresh(base_url, upstreams)
+            print(f"  {phase}: {result['refresh'][phase]['job_seconds']:.2f}s, "
+                  f"{sum(result['refresh'][phase]['upstream_calls'].values())} upstream calls")
+        print(f"Benchmarking routes ({args.requests} requests, {args.concurrency} concurrent)...")
+        result["routes"] = bench_routes(base_url, args.requests, args.concurrency)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        upstreams.stop()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+
+    if baseline:
+        compare(json.loads(baseline.read_text(encoding="utf-8")), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+
+class DescriptionCache:
+    """
+    On-disk cache of coin descriptions keyed by CoinGecko coin id.
+
+    Descriptions barely ever change, so they are only re-fetched from
+    /coins/{id} once the cached copy is older than `ttl_seconds`.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, coin_id: str) -> tuple[bool, str | None]:
+        """Return (fresh, notes); `fresh` is False for unknown or stale coins."""
+        with self._lock:
+            entry = self._load().get(coin_id)
+        if entry is None or time.time() - entry["fetched_at"] > self.ttl_seconds:
+            return False, None
+        return True, entry["notes"]
+
+    def put(self, coin_id: str, notes: str | None) -> None:
+        with self._lock:
+            self._load()[coin_id] = {"fetched_at": time.time(), "notes": notes}
+
+    def save(self) -> None:
+        with self._lock:
+            if self._entries is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self._entries), encoding="utf-8")
+            tmp_path.replace(self.path)
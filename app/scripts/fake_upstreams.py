@@ -0,0 +1,204 @@
+"""
+Local stand-ins for CoinGecko and the news sites, for benchmarks and offline runs.
+
+Serves a deterministic universe of `coins` coins:
+
+    /api/v3/coins/markets               paginated, with 7-day sparklines
+    /api/v3/coins/{id}                  detail (market_data + description)
+    /api/v3/coins/{id}/market_chart     hourly prices for ?days=
+    /news/{n}?q=...                     an HTML results page with a headline link
+
+Point the ingestion at it with COINGECKO_API_URL=<url>/api/v3 and
+INGESTION_NEWS_SOURCES="<url>/news/0?q={} <url>/news/1?q={}".
+
+    python app/scripts/fake_upstreams.py --coins 1000 --port 8765
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HOUR_MS = 3_600_000
+SPARKLINE_POINTS = 168                    # CoinGecko's 7-day sparkline is hourly
+NEWS_PAGE_PADDING = 20_000                # bytes of markup before the first link
+
+
+def _price(index: int, hour: int) -> float:
+    """Deterministic, gently oscillating price for coin `index` at hour offset `hour`."""
+    base = 50_000 / (index + 1)
+    return round(base * (1 + 0.05 * math.sin(hour / 24 + index)), 8)
+
+
+class FakeUpstreams:
+    """
+    Threaded HTTP server impersonating CoinGecko and the news sources.
+
+    Args:
+        coins (int): Size of the coin universe.
+        latency_ms (float): Delay added to every response, to mimic a real network.
+        port (int): Port to listen on; 0 picks a free one.
+    """
+
+    def __init__(self, coins: int, latency_ms: float = 0, port: int = 0):
+        self.coins = coins
+        self.latency_ms = latency_ms
+        self.now_ms = int(time.time() * 1000) // HOUR_MS * HOUR_MS
+        self.calls: Counter[str] = Counter()
+        self._calls_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def news_sources(self) -> list[str]:
+        return [f"{self.url}/news/{n}?q={{}}" for n in range(2)]
+
+    def start(self) -> "FakeUpstreams":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_calls(self) -> dict[str, int]:
+        with self._calls_lock:
+            calls = dict(self.calls)
+            self.calls.clear()
+        return calls
+
+    # ------------------------------------------------------------- payloads
+    def _coin(self, index: int) -> dict:
+        return {
+            "id": f"coin-{index}",
+            "symbol": f"c{index}",
+            "name": f"Coin {index}",
+            "market_cap_rank": index + 1,
+            "circulating_supply": 1_000_000 * (index + 1),
+            "max_supply": 2_000_000 * (index + 1) if index % 3 else None,
+        }
+
+    def _index(self, coin_id: str) -> int | None:
+        try:
+            index = int(coin_id.removeprefix("coin-"))
+        except ValueError:
+            return None
+        return index if 0 <= index < self.coins else None
+
+    def markets(self, per_page: int, page: int) -> list[dict]:
+        start = (page - 1) * per_page
+        last_updated = datetime.fromtimestamp(self.now_ms / 1000, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+        return [
+            {
+                **self._coin(index),
+                "current_price": _price(index, 0),
+                "last_updated": last_updated,
+                "sparkline_in_7d": {"price": [_price(index, -h) for h in range(SPARKLINE_POINTS - 1, -1, -1)]},
+            }
+            for index in range(start, min(start + per_page, self.coins))
+        ]
+
+    def detail(self, index: int) -> dict:
+        coin = self._coin(index)
+        return {
+            **coin,
+            "market_data": {
+                "circulating_supply": coin["circulating_supply"],
+                "max_supply": coin["max_supply"],
+            },
+            "description": {"en": f"{coin['name']} is a synthetic benchmark coin. " * 8},
+        }
+
+    def market_chart(self, index: int, days: int) -> dict:
+        hours = days * 24
+        return {"prices": [[self.now_ms - h * HOUR_MS, _price(index, -h)] for h in range(hours, -1, -1)]}
+
+    def news_page(self, query: str) -> str:
+        padding = "<div class='result'><span>filler</span></div>" * (NEWS_PAGE_PADDING // 44)
+        slug = query.replace(" ", "-").lower()
+        return (
+            f"<html><body><a href='/'>home</a>{padding}"
+            f"<a href='https://news.example.com/{slug}'>{query} rallies</a></body></html>"
+        )
+
+    # -------------------------------------------------------------- routing
+    def _handler(self):
+        upstreams = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if upstreams.latency_ms:
+                    time.sleep(upstreams.latency_ms / 1000)
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                parts = [part for part in parsed.path.split("/") if part]
+
+                endpoint, body, content_type = "unknown", None, "application/json"
+                if parts[:3] == ["api", "v3", "coins"]:
+                    if parts[3:] == ["markets"]:
+                        endpoint = "coingecko.markets"
+                        body = upstreams.markets(int(params.get("per_page", 100)), int(params.get("page", 1)))
+                    elif len(parts) >= 4 and (index := upstreams._index(parts[3])) is not None:
+                        if parts[4:] == ["market_chart"]:
+                            endpoint = "coingecko.market_chart"
+                            body = upstreams.market_chart(index, int(params.get("days", 30)))
+                        elif not parts[4:]:
+                            endpoint = "coingecko.detail"
+                            body = upstreams.detail(index)
+                elif parts[:1] == ["news"]:
+                    endpoint, content_type = "news", "text/html"
+                    body = upstreams.news_page(params.get("q", ""))
+
+                with upstreams._calls_lock:
+                    upstreams.calls[endpoint] += 1
+                if body is None:
+                    self._send(404, b'{"error":"not found"}')
+                elif isinstance(body, str):
+                    self._send(200, body.encode(), content_type)
+                else:
+                    self._send(200, json.dumps(body).encode(), content_type)
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve fake CoinGecko and news endpoints")
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    upstreams = FakeUpstreams(args.coins, args.latency_ms, args.port).start()
+    print(f"Fake upstreams for {args.coins} coins on {upstreams.url}")
+    print(f"  COINGECKO_API_URL={upstreams.url}/api/v3")
+    print(f"  INGESTION_NEWS_SOURCES=\"{' '.join(upstreams.news_sources)}\"")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        upstreams.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,39 @@
+import logging
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
 import requests
 from datetime import datetime
-from bs4 import BeautifulSoup
-import time
+
+if __package__ in (None, ""):
+    # Allow running as `python app/scripts/fetch_and_post_metadata.py` from the project root
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.core.logging_config import get_logger
+from app.scripts.description_cache import DescriptionCache
+from app.scripts.headline_resolver import HeadlineResolver
+from app.scripts.http_client import client_from_env
+from app.scripts.rate_limiter import AdaptiveTokenBucket, parse_retry_after
+
+logger = get_logger("ingestion")
 
 # -------------------------
 # Configuration
 # -------------------------
 API_URL = "http://127.0.0.1:8000/api/v1/crypto-metadata/"
-COINGECKO_TOP_COINS = "https://api.coingecko.com/api/v3/coins/markets"
-COINGECKO_DETAIL = "https://api.coingecko.com/api/v3/coins/{}"
-COINGECKO_TREND = "https://api.coingecko.com/api/v3/coins/{}/market_chart"
+BULK_API_URL = f"{API_URL}bulk"
+PRICE_HISTORY_API_URL = "http://127.0.0.1:8000/api/v1/price-history/"
+ANALYTICS_REFRESH_API_URL = "http://127.0.0.1:8000/api/v1/analytics/refresh"
+# Both can be pointed elsewhere (e.g. the benchmark's fake upstreams) through the environment
+COINGECKO_API_URL = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3").rstrip("/")
+COINGECKO_TOP_COINS = f"{COINGECKO_API_URL}/coins/markets"
+COINGECKO_DETAIL = f"{COINGECKO_API_URL}/coins/{{}}"
+COINGECKO_TREND = f"{COINGECKO_API_URL}/coins/{{}}/market_chart"
 
-NEWS_SOURCES = [
+NEWS_SOURCES = os.getenv("INGESTION_NEWS_SOURCES", "").split() or [
     "https://news.google.com/search?q={}%20cryptocurrency",
     "https://www.bing.com/news/search?q={}+cryptocurrency",
     "https://duckduckgo.com/?q={}+cryptocurrency&ia=news",
@@ -20,62 +42,92 @@ NEWS_SOURCES = [
 
 TOP_N = 10
 VS_CURRENCY = "usd"
+HISTORY_DAYS = 30
+REQUEST_TIMEOUT = 15
+MAX_RETRIES = 3
+MARKETS_PAGE_SIZE = 250                   # CoinGecko's maximum per_page for /coins/markets
+DESCRIPTION_TTL = 7 * 24 * 3600           # re-fetch /coins/{id} descriptions weekly
+CACHE_DIR = Path(os.getenv("INGESTION_CACHE_DIR", ".cache"))
+
+# Pooled, caching (and optionally recording/replaying) client for every upstream call
+HTTP = client_from_env(CACHE_DIR)
+
+# Descriptions only change rarely; keep them between runs
+DESCRIPTION_CACHE = DescriptionCache(CACHE_DIR / "coin_descriptions.json", DESCRIPTION_TTL)
+
+# Queries all news sources at once, caches per coin/source, skips failing sources
+HEADLINE_RESOLVER = HeadlineResolver(NEWS_SOURCES, client=HTTP)
+
+# Shared by every worker: starts at ~30 calls/min and adapts to CoinGecko's 429s
+COINGECKO_LIMITER = AdaptiveTokenBucket(rate=0.5, capacity=3, max_rate=1.0)
+
+
+def coingecko_get(url: str, params: dict | None = None) -> requests.Response:
+    """
+    GET a CoinGecko endpoint through the shared client and rate limiter.
+
+    Cached responses don't consume a limiter token. A 429 response throttles the
+    limiter (honouring Retry-After) and the call is retried up to MAX_RETRIES times
+    before the error is raised.
+    """
+    for _ in range(MAX_RETRIES + 1):
+        response = HTTP.get(url, params=params, timeout=REQUEST_TIMEOUT, before_request=COINGECKO_LIMITER.acquire)
+        if response.status_code == 429:
+            pause = COINGECKO_LIMITER.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+            logger.warning("[INGEST] Rate limited by CoinGecko, backing off %.0fs", pause)
+            continue
+        if not response.from_cache:
+            COINGECKO_LIMITER.on_success()
+        response.raise_for_status()
+        return response
+    response.raise_for_status()
+    return response
 
 def get_top_coin_ids(limit=10):
     try:
-        response = requests.get(COINGECKO_TOP_COINS, params={
+        response = coingecko_get(COINGECKO_TOP_COINS, params={
             "vs_currency": VS_CURRENCY,
             "order": "market_cap_desc",
             "per_page": limit,
             "page": 1
         })
-        response.raise_for_status()
         return [coin["id"] for coin in response.json()]
     except Exception as e:
-        print(f"❌ Failed to fetch top coins: {e}")
+        logger.error("[ERROR][INGEST] Failed to fetch top coins: %s", e)
         return []
 
-def get_price_trend(coin_id: str, days: int = 7) -> str:
+def get_price_history(coin_id: str, since_ms: int | None = None) -> list[list[float]]:
+    """
+    Download a coin's market_chart series as [[epoch_ms, price], ...].
+
+    Only the days since `since_ms` (the last point we already store) are requested,
+    and only points newer than it are returned.
+    """
+    days = HISTORY_DAYS
+    if since_ms is not None:
+        days = min(HISTORY_DAYS, max(1, math.ceil((time.time() * 1000 - since_ms) / 86_400_000)))
     try:
-        response = requests.get(COINGECKO_TREND.format(coin_id), params={
+        response = coingecko_get(COINGECKO_TREND.format(coin_id), params={
             "vs_currency": VS_CURRENCY,
             "days": days
         })
-        response.raise_for_status()
         prices = response.json().get("prices", [])
-        if len(prices) < 2:
-            return "Insufficient data"
-        start_price = prices[0][1]
-        end_price = prices[-1][1]
-        pct_change = ((end_price - start_price) / start_price) * 100
-        return f"Change over {days} days: {pct_change:.2f}%"
+        return [point for point in prices if since_ms is None or point[0] > since_ms]
     except Exception as e:
-        print(f"⚠️ Trend fetch failed for {coin_id}: {e}")
-        return "Trend unavailable"
+        logger.warning("[INGEST] Price history fetch failed for %s: %s", coin_id, e)
+        return []
 
 def get_recent_headline_link(coin_name: str) -> str:
-    headers = {"User-Agent": "Mozilla/5.0"}
-    for template in NEWS_SOURCES:
-        try:
-            url = template.format(coin_name.replace(" ", "+"))
-            response = requests.get(url, headers=headers, timeout=5)
-            soup = BeautifulSoup(response.text, "html.parser")
-            links = soup.find_all("a", href=True)
-            for link in links:
-                href = link["href"]
-                if "http" in href and "google" not in href:
-                    return href
-        except Exception:
-            continue
-    return "No link found"
+    return HEADLINE_RESOLVER.resolve(coin_name)
 
 def fetch_metadata(coin_id: str) -> dict | None:
     try:
-        response = requests.get(COINGECKO_DETAIL.format(coin_id))
-        response.raise_for_status()
+        response = coingecko_get(COINGECKO_DETAIL.format(coin_id))
         data = response.json()
         cs = data["market_data"]["circulating_supply"]
         ms = data["market_data"]["max_supply"]
+        notes = data["description"]["en"][:200] if data["description"]["en"] else None
+        DESCRIPTION_CACHE.put(coin_id, notes)
         return {
             "crypto_name": data["name"],
             "crypto_symbol": data["symbol"].upper(),
@@ -83,43 +135,158 @@ def fetch_metadata(coin_id: str) -> dict | None:
             "circulating_supply": int(cs) if cs is not None else None,
             "max_supply": int(ms) if ms is not None else None,
             "listed_exchange": "Binance",
-            "notes": data["description"]["en"][:200] if data["description"]["en"] else None,
-            "trend_info": get_price_trend(coin_id),
+            "notes": notes,
             "recent_headline": get_recent_headline_link(data["name"])
         }
     except Exception as e:
-        print(f"❌ Metadata fetch failed for {coin_id}: {e}")
+        logger.error("[ERROR][INGEST] Metadata fetch failed for %s: %s", coin_id, e)
+        return None
+
+def get_market_snapshot(limit: int) -> list[dict]:
+    """
+    Fetch the top `limit` coins from /coins/markets, MARKETS_PAGE_SIZE per call.
+
+    Each row already carries rank, supplies and a 7-day hourly price sparkline,
+    so no per-coin CoinGecko calls are needed for those fields. If a page fails,
+    the rows from the pages before it are returned.
+    """
+    rows: list[dict] = []
+    per_page = min(MARKETS_PAGE_SIZE, limit)  # must stay constant for page offsets to line up
+    page = 1
+    try:
+        while len(rows) < limit:
+            response = coingecko_get(COINGECKO_TOP_COINS, params={
+                "vs_currency": VS_CURRENCY,
+                "order": "market_cap_desc",
+                "per_page": per_page,
+                "page": page,
+                "sparkline": "true"
+            })
+            batch = response.json()
+            if not isinstance(batch, list):
+                raise ValueError(f"expected a list of coins, got {type(batch).__name__}")
+            rows.extend(batch)
+            if len(batch) < per_page:
+                break
+            page += 1
+    except Exception as e:
+        logger.error("[ERROR][INGEST] Market snapshot failed on page %s, keeping %s coins: %s", page, len(rows), e)
+    return rows[:limit]
+
+
+def build_market_payload(row: dict) -> dict:
+    """Map one /coins/markets row onto the CryptoMetadata payload fields."""
+    cs = row.get("circulating_supply")
+    ms = row.get("max_supply")
+    return {
+        "crypto_name": row["name"],
+        "crypto_symbol": row["symbol"].upper(),
+        "market_cap_rank": row.get("market_cap_rank"),
+        "circulating_supply": int(cs) if cs is not None else None,
+        "max_supply": int(ms) if ms is not None else None,
+        "listed_exchange": "Binance",
+    }
+
+
+def sparkline_points(row: dict) -> list[list[float]]:
+    """
+    Turn a markets row's 7-day sparkline into [[epoch_ms, price], ...].
+
+    The sparkline has no timestamps; its points are evenly spaced over 7 days
+    and the last one is taken to be at the row's last_updated time.
+    """
+    prices = (row.get("sparkline_in_7d") or {}).get("price") or []
+    if not prices or not row.get("last_updated"):
+        return []
+    end_ms = datetime.fromisoformat(row["last_updated"].replace("Z", "+00:00")).timestamp() * 1000
+    step_ms = 7 * 86_400_000 / len(prices)
+    return [[end_ms - (len(prices) - 1 - i) * step_ms, price] for i, price in enumerate(prices)]
+
+
+def get_coin_description(coin_id: str) -> str | None:
+    """
+    Return a coin's (truncated) description, from cache unless missing or stale.
+
+    Raises on upstream failure so callers can keep the stored value instead.
+    """
+    fresh, notes = DESCRIPTION_CACHE.get(coin_id)
+    if fresh:
+        return notes
+    response = coingecko_get(COINGECKO_DETAIL.format(coin_id), params={
+        "localization": "false",
+        "tickers": "false",
+        "market_data": "false",
+        "community_data": "false",
+        "developer_data": "false"
+    })
+    description = response.json()["description"]["en"]
+    notes = description[:200] if description else None
+    DESCRIPTION_CACHE.put(coin_id, notes)
+    return notes
+
+def upsert_metadata_batch(payloads: list[dict]) -> dict | None:
+    """
+    Upsert a batch of payloads through the bulk endpoint in one round trip.
+
+    Returns the endpoint's result (created/updated/unchanged counts and per-row
+    status), or None if the request failed.
+    """
+    if not payloads:
+        return {"created": 0, "updated": 0, "unchanged": 0, "items": []}
+    try:
+        response = HTTP.session.post(BULK_API_URL, json=payloads, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        result = response.json()
+        if logger.isEnabledFor(logging.DEBUG):
+            for item in result["items"]:
+                logger.debug("[INGEST] %s %s", item["status"].capitalize(), item["crypto_symbol"])
+        return result
+    except Exception as e:
+        logger.error("[ERROR][INGEST] Bulk upsert of %d coins failed: %s", len(payloads), e)
+        return None
+
+
+def upsert_metadata(payload: dict) -> bool:
+    return upsert_metadata_batch([payload]) is not None
+
+
+def get_last_price_timestamps() -> dict[str, int]:
+    """Latest stored price point per symbol, as epoch milliseconds."""
+    try:
+        response = HTTP.session.get(f"{PRICE_HISTORY_API_URL}latest", timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return {
+            symbol: int(datetime.fromisoformat(observed_at).timestamp() * 1000)
+            for symbol, observed_at in response.json().items()
+        }
+    except Exception as e:
+        logger.warning("[INGEST] Could not load stored price history, fetching full windows: %s", e)
+        return {}
+
+
+def post_price_history(series: dict[str, list[list[float]]]) -> dict | None:
+    """Append new price points and trigger the trend metric recomputation."""
+    try:
+        response = HTTP.session.post(PRICE_HISTORY_API_URL, json=series, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logger.error("[ERROR][INGEST] Price history upload failed: %s", e)
         return None
 
-def upsert_metadata(payload: dict):
+
+def refresh_analytics() -> dict | None:
+    """Ask the API to bring the market analytics tables up to date."""
     try:
-        response = requests.get(API_URL)
+        response = HTTP.session.post(ANALYTICS_REFRESH_API_URL, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        existing = response.json()
-        match = next((coin for coin in existing if coin["crypto_symbol"] == payload["crypto_symbol"]), None)
-
-        if match:
-            metadata_id = match["crypto_metadata_id"]
-            put_response = requests.put(f"{API_URL}{metadata_id}/", json=payload)
-            if put_response.status_code == 200:
-                print(f"🔁 Updated {payload['crypto_symbol']}")
-            else:
-                print(f"❌ Failed to update {payload['crypto_symbol']}: {put_response.status_code}")
-        else:
-            post_response = requests.post(API_URL, json=payload)
-            if post_response.status_code == 201:
-                print(f"✅ Created {payload['crypto_symbol']}")
-            else:
-                print(f"❌ Failed to create {payload['crypto_symbol']}: {post_response.status_code}")
+        return response.json()
     except Exception as e:
-        print(f"❌ Error during upsert of {payload.get('crypto_symbol', 'unknown')}: {e}")
+        logger.error("[ERROR][INGEST] Analytics refresh failed: %s", e)
+        return None
 
 
 if __name__ == "__main__":
-    print(f"🚀 Fetching metadata for top {TOP_N} coins...")
-    top_coins = get_top_coin_ids(TOP_N)
-    for coin_id in top_coins:
-        payload = fetch_metadata(coin_id)
-        if payload:
-            upsert_metadata(payload)
-        time.sleep(20)  # ⏳ Delay to avoid 429 errors
\ No newline at end of file
+    from app.scripts.ingestion import main
+
+    main()
@@ -0,0 +1,208 @@
+"""
+Concurrent news headline lookup.
+
+All healthy sources are queried at once and the first one to yield a usable
+link wins; the others are told to stop reading. Pages are parsed as they
+stream in and parsing stops at the first matching <a href>, so most of a
+page is never downloaded. Results are cached per (coin, source), and a source
+that keeps failing is skipped for a cool-down period.
+"""
+
+import codecs
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+
+import requests
+
+from app.scripts.http_client import HttpClient
+
+NO_LINK = "No link found"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def is_headline_link(href: str) -> bool:
+    return "http" in href and "google" not in href
+
+
+class _LinkFound(Exception):
+    pass
+
+
+class _FirstLinkParser(HTMLParser):
+    """Incremental parser that raises _LinkFound on the first usable <a href>."""
+
+    def __init__(self):
+        super().__init__()
+        self.link: str | None = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        for name, value in attrs:
+            if name == "href" and value and is_headline_link(value):
+                self.link = value
+                raise _LinkFound
+
+
+class _SourceHealth:
+    __slots__ = ("consecutive_failures", "skip_until")
+
+    def __init__(self):
+        self.consecutive_failures = 0
+        self.skip_until = 0.0
+
+
+class HeadlineResolver:
+    """
+    Resolve a recent headline link for a coin from several news sources in parallel.
+
+    Args:
+        sources (list[str]): URL templates taking the search term via `{}`.
+        timeout (float): Per-source connect/read timeout in seconds.
+        cache_ttl (float): How long a found link is reused.
+        miss_ttl (float): How long a "no link on this source" result is reused.
+        failure_threshold (int): Consecutive failures before a source is skipped.
+        cooldown (float): How long a failing source is skipped before being retried.
+        client (HttpClient | None): Shared outbound client; a plain Session if None.
+    """
+
+    def __init__(
+        self,
+        sources: list[str],
+        timeout: float = 5,
+        cache_ttl: float = 1800,
+        miss_ttl: float = 300,
+        failure_threshold: int = 3,
+        cooldown: float = 600,
+        max_cache_entries: int = 5000,
+        chunk_size: int = 8192,
+        client: HttpClient | None = None,
+    ):
+        self.sources = list(sources)
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.miss_ttl = miss_ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cache_entries = max_cache_entries
+        self.chunk_size = chunk_size
+
+        self._http = client or requests.Session()
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(self.sources), thread_name_prefix="headline")
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple[str, str], tuple[float, str | None]] = OrderedDict()
+        self._health = {source: _SourceHealth() for source in self.sources}
+
+    # ---------------------------------------------------------------- cache
+    def _cached(self, coin_key: str, source: str) -> tuple[bool, str | None]:
+        with self._lock:
+            entry = self._cache.get((coin_key, source))
+            if entry is None:
+                return False, None
+            expires_at, link = entry
+            if expires_at < time.monotonic():
+                del self._cache[(coin_key, source)]
+                return False, None
+            self._cache.move_to_end((coin_key, source))
+            return True, link
+
+    def _store(self, coin_key: str, source: str, link: str | None) -> None:
+        ttl = self.cache_ttl if link else self.miss_ttl
+        with self._lock:
+            self._cache[(coin_key, source)] = (time.monotonic() + ttl, link)
+            self._cache.move_to_end((coin_key, source))
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+
+    # --------------------------------------------------------------- health
+    def _is_healthy(self, source: str) -> bool:
+        with self._lock:
+            return self._health[source].skip_until <= time.monotonic()
+
+    def _record(self, source: str, ok: bool) -> None:
+        with self._lock:
+            health = self._health[source]
+            if ok:
+                health.consecutive_failures = 0
+                return
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold:
+                health.skip_until = time.monotonic() + self.cooldown
+
+    def source_health(self) -> dict[str, dict]:
+        """Snapshot of per-source failure counts and whether each is being skipped."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                source: {
+                    "consecutive_failures": health.consecutive_failures,
+                    "skipped_for_seconds": max(0.0, health.skip_until - now),
+                }
+                for source, health in self._health.items()
+            }
+
+    # ---------------------------------------------------------------- fetch
+    def _fetch(self, source: str, coin_name: str, coin_key: str, cancelled: threading.Event) -> str | None:
+        url = source.format(coin_name.replace(" ", "+"))
+        parser = _FirstLinkParser()
+        try:
+            with self._http.get(url, headers=HEADERS, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+                for chunk in response.iter_content(self.chunk_size):
+                    if cancelled.is_set():
+                        return None
+                    parser.feed(decoder.decode(chunk))
+        except _LinkFound:
+            pass
+        except Exception:
+            if not cancelled.is_set():
+                self._record(source, ok=False)
+            return None
+
+        self._record(source, ok=True)
+        self._store(coin_key, source, parser.link)
+        return parser.link
+
+    def resolve(self, coin_name: str) -> str:
+        """
+        Return the first headline link found for `coin_name`, or NO_LINK.
+
+        Cached links are returned without any network access; otherwise every healthy
+        source without a fresh cached miss is queried concurrently.
+        """
+        coin_key = coin_name.lower()
+        pending_sources = []
+        for source in self.sources:
+            hit, link = self._cached(coin_key, source)
+            if hit and link:
+                return link
+            if not hit and self._is_healthy(source):
+                pending_sources.append(source)
+        if not pending_sources:
+            return NO_LINK
+
+        cancelled = threading.Event()
+        futures = {
+            self._executor.submit(self._fetch, source, coin_name, coin_key, cancelled)
+            for source in pending_sources
+        }
+        deadline = time.monotonic() + self.timeout * 2
+        try:
+            while futures:
+                done, futures = wait(futures, timeout=max(0.0, deadline - time.monotonic()),
+                                     return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    link = future.result()
+                    if link:
+                        return link
+        finally:
+            cancelled.set()
+            for future in futures:
+                future.cancel()
+        return NO_LINK
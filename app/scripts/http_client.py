@@ -0,0 +1,213 @@
+"""
+Shared outbound HTTP client for the ingestion scripts.
+
+• One pooled requests.Session (keep-alive) for every upstream call.
+• On-disk response cache with a TTL per endpoint (see CACHE_RULES); once an
+  entry expires it is revalidated with If-None-Match / If-Modified-Since, so an
+  unchanged payload costs a 304 instead of a full download.
+• Record / replay: INGESTION_HTTP_MODE=record saves every upstream response
+  as a fixture, INGESTION_HTTP_MODE=replay serves only from those fixtures and
+  never touches the network, for offline tests and benchmarks.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from app.core.metrics import OUTBOUND_ERRORS, OUTBOUND_REQUEST_DURATION, OUTBOUND_REQUESTS
+
+MODES = ("live", "record", "replay")
+
+# (endpoint name, URL pattern, TTL in seconds); first match wins
+CACHE_RULES = [
+    ("coingecko.markets", re.compile(r"api\.coingecko\.com/api/v3/coins/markets"), 60),
+    ("coingecko.market_chart", re.compile(r"api\.coingecko\.com/api/v3/coins/[^/?]+/market_chart"), 300),
+    ("coingecko.detail", re.compile(r"api\.coingecko\.com/api/v3/coins/[^/?]+$"), 6 * 3600),
+]
+
+# Response headers worth keeping alongside a cached body
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+class ReplayMissError(RuntimeError):
+    """Raised in replay mode when no fixture exists for a request."""
+
+
+def endpoint_for(url: str) -> tuple[str, int]:
+    """
+    Return (endpoint name, cache TTL) for a URL. Unknown URLs (e.g. the news
+    sources) are named after their host and not cached.
+    """
+    for name, pattern, ttl in CACHE_RULES:
+        if pattern.search(url):
+            return name, ttl
+    return urlsplit(url).hostname or "other", 0
+
+
+def _cache_key(url: str, params: dict | None) -> str:
+    query = urlencode(sorted((params or {}).items()))
+    return hashlib.sha256(f"GET {url}?{query}".encode()).hexdigest()
+
+
+def _to_response(entry: dict, url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response._content = base64.b64decode(entry["body"])
+    response._content_consumed = True
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    return response
+
+
+class HttpClient:
+    """
+    Pooled, caching HTTP client.
+
+    Args:
+        cache_dir (Path | None): Where cached responses live; None disables the cache.
+        fixtures_dir (Path): Where record mode writes and replay mode reads fixtures.
+        mode (str): "live", "record" or "replay".
+        pool_size (int): Max keep-alive connections per host.
+    """
+
+    def __init__(self, cache_dir: Path | None, fixtures_dir: Path, mode: str = "live", pool_size: int = 20):
+        if mode not in MODES:
+            raise ValueError(f"Unknown HTTP mode {mode!r}, expected one of {MODES}")
+        self.cache_dir = cache_dir
+        self.fixtures_dir = fixtures_dir
+        self.mode = mode
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._write_lock = threading.Lock()
+
+    # ------------------------------------------------------------ storage
+    @staticmethod
+    def _read(directory: Path | None, key: str) -> dict | None:
+        if directory is None:
+            return None
+        try:
+            return json.loads((directory / f"{key}.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, directory: Path | None, key: str, entry: dict) -> None:
+        if directory is None:
+            return
+        with self._write_lock:
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = directory / f"{key}.tmp"
+            tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+            tmp_path.replace(directory / f"{key}.json")
+
+    @staticmethod
+    def _entry(response: requests.Response, url: str, params: dict | None) -> dict:
+        return {
+            "url": url,
+            "params": params,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "stored_at": time.time(),
+        }
+
+    # ---------------------------------------------------------------- GET
+    def get(
+        self,
+        url: str,
+        params: dict | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        stream: bool = False,
+        before_request: Callable[[], object] | None = None,
+    ) -> requests.Response:
+        """
+        GET `url`, serving from cache or fixtures where possible.
+
+        `before_request` runs only when a request actually goes over the network
+        (e.g. to take a rate-limiter token). Streamed responses are served from a
+        fresh cache entry if one exists but are never written to the cache, since
+        callers may stop reading part-way; record mode reads them fully instead.
+        """
+        key = _cache_key(url, params)
+        endpoint, ttl = endpoint_for(url)
+        if self.mode == "replay":
+            fixture = self._read(self.fixtures_dir, key)
+            if fixture is None:
+                raise ReplayMissError(f"No recorded fixture for GET {url} {params or ''}")
+            OUTBOUND_REQUESTS.labels(endpoint, "replay").inc()
+            return _to_response(fixture, url)
+
+        # Record mode always goes to the network so every request ends up as a fixture
+        cached = self._read(self.cache_dir, key) if ttl and self.mode == "live" else None
+        if cached and time.time() - cached["stored_at"] < ttl:
+            OUTBOUND_REQUESTS.labels(endpoint, "cache").inc()
+            return _to_response(cached, url)
+
+        request_headers = dict(headers or {})
+        if cached:
+            if "ETag" in cached["headers"]:
+                request_headers["If-None-Match"] = cached["headers"]["ETag"]
+            if "Last-Modified" in cached["headers"]:
+                request_headers["If-Modified-Since"] = cached["headers"]["Last-Modified"]
+
+        if before_request:
+            before_request()
+        started = time.perf_counter()
+        try:
+            response = self.session.get(
+                url, params=params, headers=request_headers, timeout=timeout,
+                stream=stream and self.mode != "record",
+            )
+        except requests.RequestException as e:
+            OUTBOUND_ERRORS.labels(endpoint, type(e).__name__).inc()
+            raise
+        finally:
+            OUTBOUND_REQUEST_DURATION.labels(endpoint).observe(time.perf_counter() - started)
+
+        if cached and response.status_code == 304:
+            OUTBOUND_REQUESTS.labels(endpoint, "not_modified").inc()
+            cached["stored_at"] = time.time()
+            self._write(self.cache_dir, key, cached)
+            return _to_response(cached, url)
+
+        OUTBOUND_REQUESTS.labels(endpoint, "network").inc()
+        if response.status_code >= 400:
+            OUTBOUND_ERRORS.labels(endpoint, str(response.status_code)).inc()
+        if self.mode == "record":
+            self._write(self.fixtures_dir, key, self._entry(response, url, params))
+        if ttl and response.status_code == 200 and not stream:
+            self._write(self.cache_dir, key, self._entry(response, url, params))
+        response.from_cache = False
+        return response
+
+
+def client_from_env(cache_root: Path) -> HttpClient:
+    """
+    Build the scripts' shared client from environment variables:
+
+    INGESTION_HTTP_MODE      live (default) / record / replay
+    INGESTION_HTTP_CACHE     set to 0 to disable the on-disk response cache
+    INGESTION_FIXTURES_DIR   fixture location (default: <cache_root>/fixtures)
+    """
+    use_cache = os.getenv("INGESTION_HTTP_CACHE", "1") != "0"
+    return HttpClient(
+        cache_dir=cache_root / "http" if use_cache else None,
+        fixtures_dir=Path(os.getenv("INGESTION_FIXTURES_DIR", cache_root / "fixtures")),
+        mode=os.getenv("INGESTION_HTTP_MODE", "live"),
+    )
@@ -0,0 +1,352 @@
+"""
+Async ingestion engine for the metadata refresh.
+
+Runs the per-coin steps from fetch_and_post_metadata concurrently. The steps
+themselves are blocking (requests + BeautifulSoup), so each one runs in a
+worker thread; CoinGecko pacing comes from the shared COINGECKO_LIMITER
+instead of a fixed sleep between coins.
+
+Usage:
+    python -m app.scripts.ingestion --top-n 50 --concurrency 8
+    python -m app.scripts.ingestion --mode queue --top-n 500     # one of several nodes
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Protocol
+
+if __package__ in (None, ""):
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.core.logging_config import get_logger
+from app.scripts import fetch_and_post_metadata as steps
+from app.services.refresh_queue import ClaimedJob, RefreshQueue
+
+DEFAULT_CONCURRENCY = 4
+BULK_BATCH_SIZE = 100
+# Snapshot mode only scrapes headlines for the highest-ranked coins
+HEADLINE_TOP_N = 50
+
+# "detail": 1 + 2N CoinGecko calls, one /coins/{id} and market_chart per coin.
+# "snapshot": paginated /coins/markets, plus /coins/{id} only for new or stale coins.
+# "queue": the detail calls, sharded across nodes through app/services/refresh_queue.py.
+MODES = ("detail", "snapshot", "queue")
+# Queue mode: how long to wait before looking again while the remaining coins are leased elsewhere
+QUEUE_POLL_SECONDS = 2.0
+
+logger = get_logger("ingestion")
+
+# Called with (completed, total) after every coin
+ProgressCallback = Callable[[int, int], None]
+
+
+
+class IngestionSink(Protocol):
+    """Where an ingestion run reads stored state from and writes its results to."""
+
+    def upsert_metadata(self, payloads: list[dict]) -> dict | None:
+        """Upsert one batch; return the bulk result, or None on failure."""
+
+    def last_price_timestamps(self) -> dict[str, int]:
+        """Latest stored price point per symbol, as epoch milliseconds."""
+
+    def append_prices(self, series: dict[str, list[list[float]]]) -> dict | None:
+        """Append new price points and recompute the trend metrics."""
+
+    def refresh_analytics(self) -> dict | None:
+        """Update the market analytics tables once the run's writes are in."""
+
+
+class ApiSink:
+    """Writes through the HTTP API, as the standalone script does."""
+
+    def upsert_metadata(self, payloads: list[dict]) -> dict | None:
+        return steps.upsert_metadata_batch(payloads)
+
+    def last_price_timestamps(self) -> dict[str, int]:
+        return steps.get_last_price_timestamps()
+
+    def append_prices(self, series: dict[str, list[list[float]]]) -> dict | None:
+        return steps.post_price_history(series)
+
+    def refresh_analytics(self) -> dict | None:
+        return steps.refresh_analytics()
+
+
+@dataclass
+class IngestionReport:
+    total: int = 0
+    succeeded: int = 0
+    failed: list[str] = field(default_factory=list)
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    price_points: int = 0
+    metrics_updated: int = 0
+    analytics_updated: int = 0
+    elapsed_seconds: float = 0.0
+
+
+CoinResult = tuple[str, dict | None, list[list[float]]]
+
+
+async def _fetch_coin(coin_id: str, semaphore: asyncio.Semaphore, last_seen: dict[str, int]) -> CoinResult:
+    """Detail mode: /coins/{id} plus market_chart for one coin."""
+    async with semaphore:
+        payload = await asyncio.to_thread(steps.fetch_metadata, coin_id)
+        if payload is None:
+            return coin_id, None, []
+        since_ms = last_seen.get(payload["crypto_symbol"])
+        prices = await asyncio.to_thread(steps.get_price_history, coin_id, since_ms)
+        return coin_id, payload, prices
+
+
+async def _complete_market_row(
+    row: dict, semaphore: asyncio.Semaphore, last_seen: dict[str, int], with_headline: bool
+) -> CoinResult:
+    """
+    Snapshot mode: build the payload from a /coins/markets row, calling upstream only
+    for what the row lacks - a missing or stale description, the headline, and the
+    full price window for coins with no stored history yet.
+    """
+    coin_id = row["id"]
+    payload = steps.build_market_payload(row)
+    since_ms = last_seen.get(payload["crypto_symbol"])
+    prices = [point for point in steps.sparkline_points(row) if since_ms is None or point[0] > since_ms]
+
+    async with semaphore:
+        try:
+            payload["notes"] = await asyncio.to_thread(steps.get_coin_description, coin_id)
+        except Exception as e:
+            logger.warning("[INGEST] Description fetch failed for %s, keeping stored notes: %s", coin_id, e)
+        if with_headline:
+            payload["recent_headline"] = await asyncio.to_thread(steps.get_recent_headline_link, payload["crypto_name"])
+        if since_ms is None:
+            prices = await asyncio.to_thread(steps.get_price_history, coin_id) or prices
+    return coin_id, payload, prices
+
+
+async def _plan_detail(top_n: int, semaphore: asyncio.Semaphore, last_seen: dict[str, int]) -> list[asyncio.Task]:
+    coin_ids = await asyncio.to_thread(steps.get_top_coin_ids, top_n)
+    return [asyncio.create_task(_fetch_coin(coin_id, semaphore, last_seen)) for coin_id in coin_ids]
+
+
+async def _plan_snapshot(top_n: int, semaphore: asyncio.Semaphore, last_seen: dict[str, int]) -> list[asyncio.Task]:
+    rows = await asyncio.to_thread(steps.get_market_snapshot, top_n)
+    tasks = []
+    seen_symbols = set()
+    for row in rows:
+        symbol = row["symbol"].upper()
+        # crypto_symbol is unique and at most 10 chars; the higher-ranked coin keeps a shared symbol
+        if symbol in seen_symbols or len(symbol) > 10:
+            continue
+        seen_symbols.add(symbol)
+        with_headline = len(tasks) < HEADLINE_TOP_N
+        tasks.append(asyncio.create_task(_complete_market_row(row, semaphore, last_seen, with_headline)))
+    return tasks
+
+
+def _count_upsert(result: dict, rows: int, report: IngestionReport) -> None:
+    report.succeeded += rows
+    report.created += result["created"]
+    report.updated += result["updated"]
+    report.unchanged += result["unchanged"]
+
+
+async def _flush(batch: list[tuple[str, dict]], report: IngestionReport, sink: IngestionSink) -> None:
+    result = await asyncio.to_thread(sink.upsert_metadata, [payload for _, payload in batch])
+    if result is None:
+        report.failed.extend(coin_id for coin_id, _ in batch)
+        return
+    _count_upsert(result, len(batch), report)
+
+
+async def _append_prices(series: dict[str, list[list[float]]], report: IngestionReport, sink: IngestionSink) -> None:
+    result = await asyncio.to_thread(sink.append_prices, series)
+    if result is not None:
+        report.price_points += sum(result["appended"].values())
+        report.metrics_updated += result["metrics_updated"]
+
+
+async def _refresh_analytics(report: IngestionReport, sink: IngestionSink) -> None:
+    result = await asyncio.to_thread(sink.refresh_analytics)
+    if result is not None:
+        report.analytics_updated += result["created"] + result["updated"] + result["removed"]
+
+
+async def _work_queue(
+    queue: RefreshQueue,
+    run_id,
+    concurrency: int,
+    on_progress: ProgressCallback | None,
+    sink: IngestionSink,
+    report: IngestionReport,
+) -> None:
+    """
+    Queue mode: claim coins of `run_id` a few at a time, fetch them with the detail
+    steps, write the batch, and record the outcome, until no coin is left queued or
+    running. While the remaining coins are leased to other workers, keep polling so
+    that any a dead worker leaves behind are picked up once their lease expires.
+    """
+    last_seen = await asyncio.to_thread(sink.last_price_timestamps)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    while True:
+        jobs: list[ClaimedJob] = await asyncio.to_thread(queue.claim, run_id, max(1, concurrency))
+        if jobs:
+            results = await asyncio.gather(*(_fetch_coin(job.coin_id, semaphore, last_seen) for job in jobs))
+            report.total += len(jobs)
+            errors = {}
+            payloads = []
+            series: dict[str, list[list[float]]] = {}
+            for job, (_, payload, prices) in zip(jobs, results):
+                if payload is None:
+                    errors[job.job_id] = "metadata fetch failed"
+                    continue
+                payloads.append(payload)
+                if prices:
+                    series[payload["crypto_symbol"]] = prices
+
+            if payloads:
+                result = await asyncio.to_thread(sink.upsert_metadata, payloads)
+                if result is None:
+                    errors.update({job.job_id: "metadata upsert failed" for job in jobs})
+                else:
+                    _count_upsert(result, len(payloads), report)
+                    if series:
+                        await _append_prices(series, report, sink)
+            await asyncio.to_thread(queue.finish, jobs, errors)
+            # Only coins out of attempts count as failed; the others go back to the queue
+            report.failed.extend(job.coin_id for job in jobs if job.job_id in errors and job.attempts >= queue.max_attempts)
+
+        progress = await asyncio.to_thread(queue.progress, run_id)
+        if on_progress:
+            on_progress(progress.done + progress.failed, progress.total)
+        if progress.finished:
+            return
+        if not jobs:
+            await asyncio.sleep(QUEUE_POLL_SECONDS)
+
+
+async def run_ingestion(
+    top_n: int = steps.TOP_N,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_progress: ProgressCallback | None = None,
+    sink: IngestionSink | None = None,
+    mode: str = "snapshot",
+    queue: RefreshQueue | None = None,
+    join_only: bool = False,
+) -> IngestionReport:
+    """
+    Fetch the top `top_n` coins, at most `concurrency` at a time, and upsert them
+    in batches of BULK_BATCH_SIZE. Price history is fetched incrementally (only
+    points newer than what the sink already stores) and appended at the end.
+
+    Args:
+        top_n (int): Number of coins to refresh, by market cap.
+        concurrency (int): Maximum number of coins in flight.
+        on_progress (ProgressCallback | None): Optional progress hook.
+        sink (IngestionSink | None): Storage to write to; the HTTP API by default.
+        mode (str): "snapshot" (few upstream calls, scales to thousands of coins),
+            "detail" (per-coin /coins/{id} and market_chart calls) or "queue"
+            (detail calls shared with every other node working the same run).
+        queue (RefreshQueue | None): Required in queue mode.
+        join_only (bool): Queue mode: work on the active run, but never start one.
+
+    Returns:
+        IngestionReport summarising the run; in queue mode, this node's share of it
+        (progress is reported for the whole run).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown ingestion mode {mode!r}, expected one of {MODES}")
+    sink = sink or ApiSink()
+    started = time.perf_counter()
+
+    if mode == "queue":
+        if queue is None:
+            raise ValueError("Queue mode needs a RefreshQueue")
+        if join_only:
+            run_id = await asyncio.to_thread(queue.active_run)
+        else:
+            run_id, _ = await asyncio.to_thread(queue.coordinate, lambda: steps.get_top_coin_ids(top_n))
+        report = IngestionReport()
+        if run_id is not None:
+            await _work_queue(queue, run_id, concurrency, on_progress, sink, report)
+            await _refresh_analytics(report, sink)
+        await asyncio.to_thread(steps.DESCRIPTION_CACHE.save)
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+    last_seen = await asyncio.to_thread(sink.last_price_timestamps)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    plan = _plan_snapshot if mode == "snapshot" else _plan_detail
+    tasks = await plan(top_n, semaphore, last_seen)
+    report = IngestionReport(total=len(tasks))
+    if on_progress:
+        on_progress(0, report.total)
+
+    completed = 0
+    batch: list[tuple[str, dict]] = []
+    series: dict[str, list[list[float]]] = {}
+    for next_done in asyncio.as_completed(tasks):
+        coin_id, payload, prices = await next_done
+        completed += 1
+        if payload is None:
+            report.failed.append(coin_id)
+        else:
+            batch.append((coin_id, payload))
+            if prices:
+                series[payload["crypto_symbol"]] = prices
+            if len(batch) >= BULK_BATCH_SIZE:
+                await _flush(batch, report, sink)
+                batch = []
+        if on_progress:
+            on_progress(completed, report.total)
+
+    if batch:
+        await _flush(batch, report, sink)
+
+    # Metrics are written onto the metadata rows, so history goes in after every batch
+    if series:
+        await _append_prices(series, report, sink)
+    await _refresh_analytics(report, sink)
+
+    await asyncio.to_thread(steps.DESCRIPTION_CACHE.save)
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh crypto metadata from CoinGecko")
+    parser.add_argument("--top-n", type=int, default=steps.TOP_N)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--mode", choices=MODES, default="snapshot")
+    parser.add_argument("--join", action="store_true", help="queue mode: only help with a run already in progress")
+    args = parser.parse_args()
+
+    queue = None
+    if args.mode == "queue":
+        from app.core.config import settings
+        from app.db.session import engine
+
+        queue = RefreshQueue(engine, settings.REFRESH_QUEUE_LEASE_SECONDS, settings.REFRESH_QUEUE_MAX_ATTEMPTS)
+
+    logger.info("[INGEST] Fetching metadata for top %d coins (%s mode, %d at a time).", args.top_n, args.mode, args.concurrency)
+    report = asyncio.run(run_ingestion(args.top_n, args.concurrency, mode=args.mode, queue=queue, join_only=args.join))
+    logger.info(
+        "[INGEST] Done in %.1fs: %d/%d succeeded, %d failed (%d created, %d updated, %d unchanged, "
+        "%d new price points, %d coins with new trend metrics, %d analytics rows changed).",
+        report.elapsed_seconds, report.succeeded, report.total, len(report.failed), report.created,
+        report.updated, report.unchanged, report.price_points, report.metrics_updated, report.analytics_updated,
+    )
+    if report.failed:
+        logger.error("[ERROR][INGEST] Failed coins: %s", ", ".join(report.failed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header into a number of seconds.
+
+    The header may hold either a delay in seconds or an HTTP date.
+    Returns None when the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveTokenBucket:
+    """
+    Thread-safe token bucket shared by every worker that talks to one upstream.
+
+    Tokens refill at `rate` per second up to `capacity`. A 429 halves the
+    rate, drains the bucket and blocks everyone until Retry-After has passed;
+    each success afterwards nudges the rate back up towards `max_rate`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int = 1,
+        min_rate: float = 0.05,
+        max_rate: float | None = None,
+        recovery_step: float = 0.05,
+        default_backoff: float = 30.0,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.recovery_step = recovery_step
+        self.default_backoff = default_backoff
+
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available and consume it.
+
+        Returns:
+            Number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def on_success(self) -> None:
+        """Additively raise the rate again after a successful call."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_throttle(self, retry_after: float | None = None) -> float:
+        """
+        Record a 429 from upstream.
+
+        Args:
+            retry_after (float | None): Seconds requested by the server, if any.
+
+        Returns:
+            The pause (in seconds) imposed on all callers.
+        """
+        pause = retry_after if retry_after is not None else self.default_backoff
+        with self._lock:
+            now = time.monotonic()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._last_refill = now + pause
+            self._blocked_until = max(self._blocked_until, now + pause)
+        return pause
@@ -0,0 +1,210 @@
+"""
+Market analytics over the tracked coins: rank movers, supply saturation and
+cross-coin aggregates.
+
+Dashboards used to derive these by pulling every crypto_metadata row on each
+tick. Instead, refresh() runs once at the end of every ingestion and keeps two
+summary tables current (see app/models/analytics_models.py):
+
+• coin_analytics: a narrow copy of the inputs per coin. Each pass diffs it
+                  against crypto_metadata and rewrites only the coins whose
+                  inputs changed; a rank change records the previous rank.
+• market_summary: percentiles and other aggregates over coin_analytics,
+                  recomputed only when the pass changed a row.
+
+The read endpoints query these tables and never touch crypto_metadata.
+Materialized views would need a full REFRESH each time and don't exist on the
+SQLite stand-in, so the tables are maintained here instead.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.core.metrics import ANALYTICS_ROWS
+from app.db.upsert import changed_column_updates, dialect_insert
+from app.models.analytics_models import CoinAnalytics, MarketSummary
+from app.models.metadata_models import CryptoMetadata
+
+# Serializes refresh passes when several nodes finish an ingestion at once
+ANALYTICS_LOCK_KEY = 0x5A4E_0003
+SUMMARY_SCOPE = "tracked"
+SUPPLY_PERCENTILES = (10, 25, 50, 75, 90)
+# Copied from crypto_metadata as they are; supply_ratio is derived
+SOURCE_COLUMNS = (
+    "crypto_name", "market_cap_rank", "circulating_supply", "max_supply",
+    "return_1d_pct", "return_7d_pct", "volatility_30d_pct",
+)
+
+
+def supply_ratio(circulating: int | None, maximum: int | None) -> float | None:
+    """Share of the max supply in circulation, or None for uncapped coins."""
+    if circulating is None or not maximum:
+        return None
+    return circulating / maximum
+
+
+def _rank_change(previous: int | None, current: int | None) -> int | None:
+    if previous is None or current is None:
+        return None
+    return previous - current
+
+
+def _stat(values: np.ndarray, func) -> float | None:
+    return float(func(values)) if values.size else None
+
+
+class AnalyticsService:
+    """
+    Maintains and reads the market analytics tables.
+    """
+
+    @staticmethod
+    def refresh(db: Session, now: datetime | None = None) -> dict[str, int]:
+        """
+        Bring coin_analytics in line with crypto_metadata, then recompute
+        market_summary if anything changed.
+
+        Coins are compared column by column: unchanged coins are not written, and
+        changed ones only get the columns that moved. Coins gone from
+        crypto_metadata are dropped.
+
+        Returns:
+            Counts of coins created, updated, unchanged and removed.
+        """
+        meta = CryptoMetadata.__table__
+        table = CoinAnalytics.__table__
+
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ANALYTICS_LOCK_KEY})
+            # Taken once the lock is held, so passes on different nodes stamp in the order they ran
+            now = now or datetime.now(timezone.utc)
+            stored = {
+                row["crypto_symbol"]: row
+                for row in db.execute(select(table)).mappings()
+            }
+            source = db.execute(
+                select(meta.c.crypto_symbol, *(meta.c[column] for column in SOURCE_COLUMNS))
+            ).mappings().all()
+
+            created, changes = [], []
+            for row in source:
+                values = {column: row[column] for column in SOURCE_COLUMNS}
+                values["supply_ratio"] = supply_ratio(row["circulating_supply"], row["max_supply"])
+                current = stored.pop(row["crypto_symbol"], None)
+                if current is None:
+                    created.append({"crypto_symbol": row["crypto_symbol"], **values, "updated_at": now})
+                    continue
+                changed = {column: value for column, value in values.items() if current[column] != value}
+                if not changed:
+                    continue
+                if "market_cap_rank" in changed:
+                    changed["previous_rank"] = current["market_cap_rank"]
+                    changed["rank_change"] = _rank_change(current["market_cap_rank"], changed["market_cap_rank"])
+                    changed["rank_changed_at"] = now
+                changes.append({"crypto_symbol": row["crypto_symbol"], **changed, "updated_at": now})
+            removed = list(stored)
+
+            if created:
+                db.execute(insert(table), created)
+            for stmt, params in changed_column_updates(table, "crypto_symbol", changes):
+                db.execute(stmt, params)
+            if removed:
+                db.execute(delete(table).where(table.c.crypto_symbol.in_(removed)))
+            if created or changes or removed:
+                AnalyticsService._refresh_summary(db, now)
+            # Marks this pass's moves as the latest; a pass that moved no rank leaves the previous ones
+            if any("rank_changed_at" in change for change in changes):
+                db.execute(
+                    update(MarketSummary).where(MarketSummary.scope == SUMMARY_SCOPE).values(ranks_moved_at=now)
+                )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error("[ERROR][ANALYTICS] Failed to refresh market analytics: %s", e)
+            raise
+
+        counts = {
+            "created": len(created),
+            "updated": len(changes),
+            "unchanged": len(source) - len(created) - len(changes),
+            "removed": len(removed),
+        }
+        for status, count in counts.items():
+            ANALYTICS_ROWS.labels(status).inc(count)
+        logger.info(
+            "[ANALYTICS] Refreshed: %d created, %d updated, %d unchanged, %d removed.",
+            counts["created"], counts["updated"], counts["unchanged"], counts["removed"],
+        )
+        return counts
+
+    @staticmethod
+    def _refresh_summary(db: Session, now: datetime) -> None:
+        """Recompute the market_summary row from coin_analytics (in the caller's transaction)."""
+        table = CoinAnalytics.__table__
+        rows = db.execute(select(
+            table.c.market_cap_rank, table.c.supply_ratio, table.c.return_1d_pct,
+            table.c.return_7d_pct, table.c.volatility_30d_pct,
+        )).all()
+
+        def column(index: int) -> np.ndarray:
+            return np.array([row[index] for row in rows if row[index] is not None], dtype=float)
+
+        ratios, return_1d, return_7d, volatility = column(1), column(2), column(3), column(4)
+        percentiles = np.percentile(ratios, SUPPLY_PERCENTILES) if ratios.size else [None] * len(SUPPLY_PERCENTILES)
+        values = {
+            "coin_count": len(rows),
+            "ranked_count": sum(1 for row in rows if row[0] is not None),
+            "capped_count": int(ratios.size),
+            **{
+                f"supply_ratio_p{p}": None if value is None else float(value)
+                for p, value in zip(SUPPLY_PERCENTILES, percentiles)
+            },
+            "supply_ratio_mean": _stat(ratios, np.mean),
+            "advancers_1d": int(np.count_nonzero(return_1d > 0)),
+            "decliners_1d": int(np.count_nonzero(return_1d < 0)),
+            "return_1d_median": _stat(return_1d, np.median),
+            "return_7d_median": _stat(return_7d, np.median),
+            "return_7d_mean": _stat(return_7d, np.mean),
+            "volatility_30d_median": _stat(volatility, np.median),
+            "computed_at": now,
+        }
+        stmt = dialect_insert(db, MarketSummary).values(scope=SUMMARY_SCOPE, **values)
+        db.execute(stmt.on_conflict_do_update(index_elements=["scope"], set_=values))
+
+    @staticmethod
+    def get_movers(db: Session, direction: str = "gainers", limit: int = 10,
+                   since: datetime | None = None) -> list[CoinAnalytics]:
+        """
+        Coins whose rank climbed ("gainers") or dropped ("losers") the most in the
+        latest refresh that moved any rank, or, with `since`, in any refresh at or
+        after that time (each coin's latest move).
+        """
+        if since is None:
+            since = db.scalar(select(MarketSummary.ranks_moved_at).where(MarketSummary.scope == SUMMARY_SCOPE))
+            if since is None:
+                return []
+        query = db.query(CoinAnalytics)
+        if direction == "gainers":
+            query = query.filter(CoinAnalytics.rank_change > 0).order_by(CoinAnalytics.rank_change.desc())
+        else:
+            query = query.filter(CoinAnalytics.rank_change < 0).order_by(CoinAnalytics.rank_change)
+        query = query.filter(CoinAnalytics.rank_changed_at >= since)
+        return query.order_by(CoinAnalytics.market_cap_rank).limit(limit).all()
+
+    @staticmethod
+    def get_supply_saturation(db: Session, order: str = "desc", limit: int = 50) -> list[CoinAnalytics]:
+        """Capped coins by share of max supply in circulation, most (or least) saturated first."""
+        ratio = CoinAnalytics.supply_ratio
+        return db.query(CoinAnalytics).filter(ratio.isnot(None)).order_by(
+            ratio.desc() if order == "desc" else ratio, CoinAnalytics.crypto_symbol
+        ).limit(limit).all()
+
+    @staticmethod
+    def get_summary(db: Session) -> MarketSummary | None:
+        return db.get(MarketSummary, SUMMARY_SCOPE)
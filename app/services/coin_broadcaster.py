@@ -0,0 +1,131 @@
+"""
+Pushes per-coin changes to connected dashboards as server-sent events.
+
+One CoinBroadcaster per process listens to the CoinIndex, which already reads
+the affected rows once per change and works out which fields moved. Each update
+is encoded into a single SSE frame that every client queue receives as-is, so a
+connected client costs a queue slot, not a database query.
+
+Frames on GET /events:
+
+    retry: 2000
+    event: hello    data: {"version": 12}                          on connect
+    event: coins    data: {"version": 13, "source": "bulk_upsert",
+                           "coins": [{"crypto_symbol": "BTC", "market_cap_rank": 1}, ...],
+                           "removed": ["XYZ"]}                       changed fields only
+    event: resync   data: {"version": 14}                           client fell behind; reload
+
+Every frame's id is the data version. A browser that reconnects sends it back
+as Last-Event-ID; if anything changed in between it gets `resync` straight away,
+otherwise the stream simply carries on.
+
+With several worker processes, PUSH_PG_NOTIFY (on by default) lets each one's
+index hear about the others' writes (see pg_change_feed). Versions are per process, so a client
+reconnecting to a different worker is told to resync.
+
+Open event streams count as active connections to uvicorn, so run it with
+--timeout-graceful-shutdown to keep them from holding up a restart.
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+from app.core.metrics import PUSH_CLIENTS, PUSH_EVENTS
+from app.core.serialization import dumps_json
+from app.services import data_events
+from app.services.coin_index import CoinIndex, IndexUpdate
+
+
+def sse_frame(event: str, data: dict, event_id: int | None = None) -> bytes:
+    """Encode one server-sent event; `data` is JSON on a single line."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + dumps_json(data) + b"\n\n"
+
+
+HEARTBEAT_FRAME = b": ping\n\n"
+
+
+class CoinBroadcaster:
+    """
+    Fans coin index updates out to every connected /events client.
+
+    Args:
+        index (CoinIndex): Source of per-coin changes.
+        queue_size (int): Frames buffered per client; a client that falls this far
+            behind is sent `resync` and its backlog dropped.
+        heartbeat_seconds (int): Idle interval before a keep-alive comment is sent.
+    """
+
+    def __init__(self, index: CoinIndex, queue_size: int = 100, heartbeat_seconds: int = 15):
+        self.index = index
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.version = data_events.current_version()
+        self._clients: set[asyncio.Queue] = set()
+
+    async def start(self) -> None:
+        snapshot = self.index.snapshot
+        self.version = snapshot.version if snapshot else data_events.current_version()
+        self.index.subscribe(self._on_update)
+
+    async def stop(self) -> None:
+        for queue in list(self._clients):
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)  # ends the client's stream
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    # ---------------------------------------------------------------- clients
+    async def stream(self, last_event_id: str | None = None) -> AsyncIterator[bytes]:
+        """
+        The SSE byte stream for one client, until it disconnects or the app stops.
+        `last_event_id` is the client's Last-Event-ID header, sent when it reconnects.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._clients.add(queue)
+        PUSH_CLIENTS.inc()
+        try:
+            yield b"retry: 2000\n" + sse_frame("hello", {"version": self.version}, self.version)
+            if last_event_id is not None and last_event_id != str(self.version):
+                PUSH_EVENTS.labels("resync").inc()
+                yield sse_frame("resync", {"version": self.version}, self.version)
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    frame = HEARTBEAT_FRAME
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self._clients.discard(queue)
+            PUSH_CLIENTS.dec()
+
+    def _offer(self, queue: asyncio.Queue, frame: bytes | None) -> None:
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Too far behind for deltas to be useful: drop the backlog, tell it to reload
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(sse_frame("resync", {"version": self.version}, self.version))
+            PUSH_EVENTS.labels("resync").inc()
+
+    def _publish(self, event: str, frame: bytes) -> None:
+        for queue in list(self._clients):
+            self._offer(queue, frame)
+        PUSH_EVENTS.labels(event).inc(len(self._clients))
+
+    # ---------------------------------------------------------------- changes
+    def _on_update(self, update: IndexUpdate) -> None:
+        """CoinIndex listener; runs on the event loop after each applied change."""
+        self.version = update.version
+        if update.coins or update.removed:
+            payload = {
+                "version": update.version, "source": update.source,
+                "coins": update.coins, "removed": update.removed,
+            }
+            self._publish("coins", sse_frame("coins", payload, update.version))
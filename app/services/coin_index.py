@@ -0,0 +1,279 @@
+"""
+In-process replica of crypto_metadata for the read endpoints.
+
+The table is small and only changes on writes we hear about, so each process
+keeps every coin in memory: compact __slots__ records, looked up by ID, symbol
+or rank order. The index is loaded at startup and follows data_events: each
+change re-reads just the affected rows (one query, whatever the number of
+readers) and swaps in a new immutable snapshot. Changes made by other processes
+(workers, replicas, queue-mode ingestion) arrive the same way through
+PgChangeFeed. On Postgres the index is only served while that feed is
+listening; without it, other processes' writes would go unnoticed, so reads go
+to the database.
+
+Consistency comes from the data version. A snapshot is served only while its
+version equals data_events.current_version(). Right after a write, until the
+index has caught up, current() returns None and callers read the database
+instead, so a client never reads older data than it just wrote.
+
+Listeners (CoinBroadcaster) are handed the per-coin field changes of every update.
+"""
+
+import asyncio
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Mapping
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.logging_config import logger
+from app.services import data_events
+from app.services.crypto_metadata_service import (
+    LISTABLE_FIELDS, MAX_PAGE_SIZE, _finish_page, decode_cursor, metadata_select,
+)
+from app.services.data_events import DataChange
+from app.services.pg_change_feed import PgChangeFeed
+
+INDEXED_FIELDS = (*LISTABLE_FIELDS, "updated_at")
+# Seconds before a batch whose rows could not be read is retried without waiting for a new change
+RETRY_SECONDS = 5
+
+
+class CoinRecord:
+    """One coin's LISTABLE_FIELDS plus updated_at; __slots__ keeps it to a few hundred bytes."""
+
+    __slots__ = INDEXED_FIELDS
+
+    def __init__(self, row: Mapping):
+        for name in INDEXED_FIELDS:
+            setattr(self, name, row[name])
+        if self.updated_at is not None and self.updated_at.tzinfo is None:
+            self.updated_at = self.updated_at.replace(tzinfo=timezone.utc)  # SQLite drops the offset
+
+    @property
+    def sort_key(self) -> tuple:
+        # ORDER BY market_cap_rank NULLS LAST, crypto_symbol
+        return (self.market_cap_rank is None, self.market_cap_rank or 0, self.crypto_symbol)
+
+    def as_dict(self, fields=LISTABLE_FIELDS) -> dict:
+        return {name: getattr(self, name) for name in fields}
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    version: int
+    by_id: dict[UUID, CoinRecord]
+    by_symbol: dict[str, CoinRecord]
+    ordered: list[CoinRecord]            # rank order, unranked last
+    keys: list[tuple]                    # sort_key of each entry in `ordered`, for bisect
+
+    @classmethod
+    def build(cls, version: int, records) -> "IndexSnapshot":
+        ordered = sorted(records, key=lambda record: record.sort_key)
+        return cls(
+            version=version,
+            by_id={record.crypto_metadata_id: record for record in ordered},
+            by_symbol={record.crypto_symbol: record for record in ordered},
+            ordered=ordered,
+            keys=[record.sort_key for record in ordered],
+        )
+
+    def page(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        min_rank: int | None = None,
+        max_rank: int | None = None,
+        symbol_prefix: str | None = None,
+        symbols: list[str] | None = None,
+        updated_since: datetime | None = None,
+        fields: list[str] | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        Same contract as CryptoMetadataService.list_crypto_metadata_page, answered from memory:
+        bisect to the cursor (or min_rank), then scan forward applying the filters.
+
+        Raises:
+            ValueError: For a malformed cursor or an unknown field name.
+        """
+        unknown = set(fields or ()) - set(LISTABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        limit = min(limit, MAX_PAGE_SIZE)
+
+        start = 0
+        if cursor:
+            after_rank, after_symbol = decode_cursor(cursor)
+            start = bisect_right(self.keys, (after_rank is None, after_rank or 0, after_symbol))
+        if min_rank is not None:
+            start = max(start, bisect_left(self.keys, (False, min_rank, "")))
+        prefix = symbol_prefix.lower() if symbol_prefix else None
+        wanted = set(symbols) if symbols else None
+        if updated_since is not None and updated_since.tzinfo is None:
+            updated_since = updated_since.replace(tzinfo=timezone.utc)
+
+        rows = []
+        for record in self.ordered[start:]:
+            rank = record.market_cap_rank
+            if min_rank is not None and rank is None:
+                break  # unranked coins sort last and never match a rank filter
+            if max_rank is not None and (rank is None or rank > max_rank):
+                break
+            if prefix and not record.crypto_symbol.lower().startswith(prefix):
+                continue
+            if wanted is not None and record.crypto_symbol not in wanted:
+                continue
+            if updated_since is not None and (record.updated_at is None or record.updated_at < updated_since):
+                continue
+            rows.append(record.as_dict())
+            if len(rows) > limit:
+                break
+        return _finish_page(rows, limit, fields)
+
+
+@dataclass(frozen=True)
+class IndexUpdate:
+    version: int
+    source: str
+    coins: list[dict]                    # crypto_symbol plus the fields that changed
+    removed: list[str]                   # symbols no longer present
+
+
+IndexListener = Callable[[IndexUpdate], None]
+
+
+class CoinIndex:
+    """
+    Keeps an IndexSnapshot of crypto_metadata in step with data_events.
+
+    Args:
+        session_factory: AsyncSession factory for the startup load and the per-change reads.
+
+    The app sets `change_feed` once the feed exists; until then nothing is served.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+        self._snapshot: IndexSnapshot | None = None
+        self._listeners: list[IndexListener] = []
+        self._changes: asyncio.Queue[DataChange] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._unsubscribe = None
+        self.change_feed: PgChangeFeed | None = None
+
+    def sees_all_writes(self) -> bool:
+        """True if writes from other processes reach this index (see PgChangeFeed.in_sync)."""
+        return self.change_feed is not None and self.change_feed.in_sync
+
+    def current(self) -> IndexSnapshot | None:
+        """
+        The snapshot, if it reflects every change this process knows about and
+        other processes' changes are reaching it; else None.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == data_events.current_version() and self.sees_all_writes():
+            return snapshot
+        return None
+
+    @property
+    def snapshot(self) -> IndexSnapshot | None:
+        """The latest snapshot, even if a newer change is still being applied."""
+        return self._snapshot
+
+    def subscribe(self, listener: IndexListener) -> None:
+        self._listeners.append(listener)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._changes = asyncio.Queue()
+        # Subscribe before loading so a write landing mid-load is applied afterwards
+        self._unsubscribe = data_events.subscribe(self._on_change)
+        version = data_events.current_version()
+        try:
+            records = [CoinRecord(row) for row in await self._fetch(None)]
+            self._snapshot = IndexSnapshot.build(version, records)
+            logger.info("[INDEX] Loaded %s coins at version %s.", len(records), version)
+        except SQLAlchemyError as e:
+            logger.error("[ERROR][INDEX] Initial load failed; reads go to the database until the next change: %s", e)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._unsubscribe:
+            self._unsubscribe()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    # ---------------------------------------------------------------- changes
+    def _on_change(self, change: DataChange) -> None:
+        """data_events listener; runs in the writer's thread, so only hands the change over."""
+        self._loop.call_soon_threadsafe(self._changes.put_nowait, change)
+
+    async def _run(self) -> None:
+        failed: list[DataChange] = []
+        while True:
+            # Changes from a failed batch are carried into the next one, so their coins are re-read too
+            changes = failed
+            try:
+                changes = [*failed, await asyncio.wait_for(self._changes.get(), RETRY_SECONDS if failed else None)]
+            except asyncio.TimeoutError:
+                pass
+            while not self._changes.empty():
+                changes.append(self._changes.get_nowait())
+            try:
+                update = await self._apply(changes)
+            except SQLAlchemyError as e:
+                logger.error("[ERROR][INDEX] Could not read changed rows for version %s: %s", changes[-1].version, e)
+                failed = changes
+                continue
+            failed = []
+            for listener in self._listeners:
+                try:
+                    listener(update)
+                except Exception as e:
+                    logger.error("[ERROR][INDEX] Listener %r failed: %s", listener, e)
+
+    async def _apply(self, changes: list[DataChange]) -> IndexUpdate:
+        """Re-read the rows behind a batch of changes and swap in the resulting snapshot."""
+        version = changes[-1].version
+        # A change without symbols (e.g. the end of a refresh) means "anything may have changed"
+        full = self._snapshot is None or any(not change.symbols for change in changes)
+        symbols = None if full else sorted({symbol for change in changes for symbol in change.symbols})
+        fresh = [CoinRecord(row) for row in await self._fetch(symbols)]
+
+        previous = self._snapshot
+        by_symbol = {} if full else dict(previous.by_symbol)
+        if not full:
+            for symbol in symbols:
+                by_symbol.pop(symbol, None)
+        for record in fresh:
+            old = previous.by_id.get(record.crypto_metadata_id) if previous else None
+            if old is not None and old.crypto_symbol != record.crypto_symbol:
+                by_symbol.pop(old.crypto_symbol, None)  # renamed by a PUT
+            by_symbol[record.crypto_symbol] = record
+        self._snapshot = IndexSnapshot.build(version, by_symbol.values())
+
+        before = previous.by_symbol if previous else {}
+        coins = []
+        for record in fresh:
+            old = before.get(record.crypto_symbol)
+            delta = {
+                name: getattr(record, name) for name in LISTABLE_FIELDS
+                if old is None or getattr(old, name) != getattr(record, name)
+            }
+            if delta:
+                coins.append({"crypto_symbol": record.crypto_symbol, **delta})
+        removed = sorted(symbol for symbol in before if symbol not in self._snapshot.by_symbol)
+        return IndexUpdate(version=version, source=changes[-1].source, coins=coins, removed=removed)
+
+    async def _fetch(self, symbols: list[str] | None) -> list[dict]:
+        stmt = metadata_select(symbols=symbols, extra_columns=("updated_at",))
+        async with self.session_factory() as db:
+            return [dict(row) for row in (await db.execute(stmt)).mappings()]
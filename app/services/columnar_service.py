@@ -0,0 +1,386 @@
+"""
+Columnar (Parquet / Arrow IPC) export and import for offline analytics.
+
+Exports read the database through a server-side cursor, COLUMNAR_BATCH_SIZE
+rows at a time, and write each batch as a Parquet row group or an Arrow record
+batch (zstd-compressed), so memory stays flat however large the dump. Files
+open directly in pandas / polars / DuckDB with their types intact.
+
+Datasets:
+
+• metadata       reporting_schema.crypto_metadata (range on updated_at)
+• snapshots      reporting_schema.crypto_metadata_snapshot (range on snapshot_at)
+• price_history  reporting_schema.crypto_price_history (range on observed_at)
+
+The dataset name is stored in the file's schema metadata, so the loader knows
+where a file goes. On Postgres, a file is loaded with one COPY into a temporary
+staging table, fed CSV encoded by Arrow batch by batch, followed by one
+INSERT ... SELECT ... ON CONFLICT DO NOTHING: rows already present are kept.
+
+pyarrow is optional; without it the functions here raise RuntimeError.
+
+    python -m app.services.columnar_service export snapshots --since 2026-10-01 -o week.parquet
+    python -m app.services.columnar_service import week.parquet
+"""
+
+import argparse
+import asyncio
+import io
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Iterator
+
+from sqlalchemy import BigInteger, DateTime, Engine, Float, Integer, Table, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.logging_config import logger
+from app.models.metadata_models import CryptoMetadata
+from app.models.price_history_models import CryptoPriceHistory
+from app.models.snapshot_models import CryptoMetadataSnapshot
+from app.services.data_events import notify_data_changed
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for columnar export/import
+    pa = None
+
+COLUMNAR_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+COLUMNAR_BATCH_SIZE = 10_000
+COMPRESSION = "zstd"
+
+# dataset -> (table, column a time range applies to)
+DATASETS: dict[str, tuple[Table, str]] = {
+    "metadata": (CryptoMetadata.__table__, "updated_at"),
+    "snapshots": (CryptoMetadataSnapshot.__table__, "snapshot_at"),
+    "price_history": (CryptoPriceHistory.__table__, "observed_at"),
+}
+DATASET_KEY = b"crypto_dataset"
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("Columnar export/import needs pyarrow (pip install pyarrow)")
+
+
+def _dataset(name: str) -> tuple[Table, str]:
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset {name!r}, expected one of {tuple(DATASETS)}")
+    return DATASETS[name]
+
+
+def _arrow_type(column):
+    column_type = column.type
+    if isinstance(column_type, UUID):
+        return pa.string()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column_type, BigInteger):
+        return pa.int64()
+    if isinstance(column_type, Integer):
+        return pa.int32()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    return pa.string()
+
+
+def arrow_schema(dataset: str) -> "pa.Schema":
+    """The Arrow schema of a dataset's table; UUIDs travel as strings."""
+    require_pyarrow()
+    table, _ = _dataset(dataset)
+    return pa.schema(
+        [pa.field(column.name, _arrow_type(column), nullable=column.nullable) for column in table.columns],
+        metadata={DATASET_KEY: dataset.encode()},
+    )
+
+
+def export_statement(dataset: str, since: datetime | None = None, until: datetime | None = None):
+    """
+    Every column of the dataset's table, optionally limited to [since, until) on its
+    time column. Naive datetimes are taken as UTC.
+    """
+    table, time_column = _dataset(dataset)
+    stmt = select(*table.columns)
+    if since is not None:
+        stmt = stmt.where(table.c[time_column] >= _as_utc(since))
+    if until is not None:
+        stmt = stmt.where(table.c[time_column] < _as_utc(until))
+    return stmt
+
+
+def _as_utc(moment: datetime) -> datetime:
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def to_record_batch(schema: "pa.Schema", rows) -> "pa.RecordBatch":
+    """Turn a batch of row tuples into an Arrow record batch, column by column."""
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_string(field.type):
+            values = [value if value is None or isinstance(value, str) else str(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkBuffer:
+    """Write-only file object that hands back whatever was written since the last drain()."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _open_writer(fmt: str, sink, schema: "pa.Schema"):
+    if fmt == "parquet":
+        return pq.ParquetWriter(sink, schema, compression=COMPRESSION)
+    if fmt == "arrow":
+        return pa_ipc.new_stream(sink, schema, options=pa_ipc.IpcWriteOptions(compression=COMPRESSION))
+    raise ValueError(f"Unknown columnar format {fmt!r}, expected one of {tuple(COLUMNAR_FORMATS)}")
+
+
+class ColumnarEncoder:
+    """Encodes row batches incrementally; every call returns the bytes ready to send."""
+
+    def __init__(self, dataset: str, fmt: str):
+        self.schema = arrow_schema(dataset)
+        self._buffer = _ChunkBuffer()
+        self._writer = _open_writer(fmt, self._buffer, self.schema)
+
+    def encode(self, rows) -> bytes:
+        self._writer.write_batch(to_record_batch(self.schema, rows))
+        return self._buffer.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._buffer.drain()
+
+
+# ------------------------------------------------------------------ export
+async def stream_columnar(
+    async_engine,
+    dataset: str,
+    fmt: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    batch_size: int = COLUMNAR_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Yield a dataset as Parquet or Arrow IPC stream bytes, one batch at a time.
+    Encoding runs in a worker thread so large batches don't stall the event loop.
+    """
+    encoder = ColumnarEncoder(dataset, fmt)
+    exported = 0
+    async with async_engine.connect() as conn:
+        result = await conn.stream(export_statement(dataset, since, until).execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            exported += len(rows)
+            yield await asyncio.to_thread(encoder.encode, rows)
+    yield encoder.close()
+    logger.info("[EXPORT] Streamed %s %s rows as %s.", exported, dataset, fmt)
+
+
+def export_to_file(
+    engine: Engine,
+    dataset: str,
+    fmt: str,
+    path: Path,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    batch_size: int = COLUMNAR_BATCH_SIZE,
+) -> int:
+    """Write a dataset to `path` as Parquet or an Arrow IPC stream. Returns the row count."""
+    schema = arrow_schema(dataset)
+    exported = 0
+    with engine.connect() as conn, open(path, "wb") as sink:
+        writer = _open_writer(fmt, sink, schema)
+        try:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+                export_statement(dataset, since, until)
+            )
+            for rows in result.partitions():
+                writer.write_batch(to_record_batch(schema, rows))
+                exported += len(rows)
+        finally:
+            writer.close()
+    logger.info("[EXPORT] Wrote %s %s rows to %s as %s.", exported, dataset, path, fmt)
+    return exported
+
+
+# ------------------------------------------------------------------ import
+def read_batches(path: Path, batch_size: int = COLUMNAR_BATCH_SIZE) -> tuple["pa.Schema", Iterator["pa.RecordBatch"]]:
+    """Open a Parquet file or Arrow IPC stream/file; returns its schema and a batch iterator."""
+    require_pyarrow()
+    with open(path, "rb") as probe:
+        magic = probe.read(6)
+    if magic[:4] == b"PAR1":
+        parquet = pq.ParquetFile(path)
+        return parquet.schema_arrow, parquet.iter_batches(batch_size=batch_size)
+    source = pa.memory_map(str(path))
+    if magic == b"ARROW1":  # the random-access file format, as written by pyarrow.feather / ipc.new_file
+        reader = pa_ipc.open_file(source)
+        return reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+    reader = pa_ipc.open_stream(source)
+    return reader.schema, iter(reader)
+
+
+class _CsvReader:
+    """Readable file object producing CSV for COPY from Arrow batches, encoded on demand."""
+
+    def __init__(self, batches: Iterable["pa.RecordBatch"]):
+        self._batches = iter(batches)
+        self._pending = b""
+        self.rows = 0
+
+    def _encode(self, batch: "pa.RecordBatch") -> bytes:
+        buffer = io.BytesIO()
+        pa_csv.write_csv(batch, buffer, pa_csv.WriteOptions(include_header=False))
+        self.rows += batch.num_rows
+        return buffer.getvalue()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._pending) < size:
+            batch = next(self._batches, None)
+            if batch is None:
+                break
+            self._pending += self._encode(batch)
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def chunks(self) -> Iterator[bytes]:
+        for batch in self._batches:
+            yield self._encode(batch)
+
+
+def _copy_csv(conn, sql: str, reader: _CsvReader) -> None:
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, reader, size=1 << 20)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                for chunk in reader.chunks():
+                    copy.write(chunk)
+    finally:
+        cursor.close()
+
+
+def import_file(engine: Engine, path: Path, dataset: str | None = None, batch_size: int = COLUMNAR_BATCH_SIZE) -> dict:
+    """
+    Load a file written by this module (or any file with matching column names) into
+    its dataset's table. Rows whose key already exists are skipped.
+
+    Returns:
+        {"dataset", "rows", "inserted"}.
+
+    Raises:
+        ValueError: If the dataset can't be determined or the file has unknown columns.
+    """
+    schema, batches = read_batches(path, batch_size)
+    dataset = dataset or (schema.metadata or {}).get(DATASET_KEY, b"").decode() or None
+    if dataset is None:
+        raise ValueError(f"{path} doesn't say which dataset it holds; pass one explicitly")
+    table, _ = _dataset(dataset)
+    columns = list(schema.names)
+    unknown = set(columns) - set(table.c.keys())
+    if unknown:
+        raise ValueError(f"{path} has columns {', '.join(sorted(unknown))} that {table.name} doesn't")
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            column_list = ", ".join(f'"{name}"' for name in columns)
+            conn.execute(text(
+                f"CREATE TEMP TABLE columnar_stage (LIKE {table.fullname} INCLUDING DEFAULTS) ON COMMIT DROP"
+            ))
+            reader = _CsvReader(batches)
+            _copy_csv(conn, f"COPY columnar_stage ({column_list}) FROM STDIN WITH (FORMAT csv)", reader)
+            rows = reader.rows
+            inserted = conn.execute(text(
+                f"INSERT INTO {table.fullname} ({column_list}) SELECT {column_list} FROM columnar_stage "
+                f"ON CONFLICT DO NOTHING"
+            )).rowcount
+        else:
+            # SQLite stand-in: no COPY, so plain multi-row inserts
+            uuid_columns = [column.name for column in table.columns if isinstance(column.type, UUID)]
+            rows = inserted = 0
+            for batch in batches:
+                records = batch.to_pylist()
+                for record in records:
+                    for name in uuid_columns:
+                        if record.get(name) is not None:
+                            record[name] = uuid.UUID(record[name])
+                if records:
+                    inserted += conn.execute(sqlite_insert(table).on_conflict_do_nothing(), records).rowcount
+                rows += len(records)
+
+    logger.info(
+        "[IMPORT] Loaded %s into %s: %d of %d rows inserted in %.2fs.",
+        path, table.name, inserted, rows, time.perf_counter() - started,
+    )
+    if dataset == "metadata" and inserted:
+        notify_data_changed("import")
+    return {"dataset": dataset, "rows": rows, "inserted": inserted}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or import datasets as Parquet / Arrow IPC")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="dump a dataset to a file")
+    export.add_argument("dataset", choices=list(DATASETS))
+    export.add_argument("--format", choices=list(COLUMNAR_FORMATS), default="parquet")
+    export.add_argument("--since", type=datetime.fromisoformat, help="inclusive, on the dataset's time column")
+    export.add_argument("--until", type=datetime.fromisoformat, help="exclusive")
+    export.add_argument("-o", "--output", type=Path, help="defaults to <dataset>.<format>")
+
+    load = commands.add_parser("import", help="load a file written by export")
+    load.add_argument("path", type=Path)
+    load.add_argument("--dataset", choices=list(DATASETS), help="if the file doesn't record it")
+    args = parser.parse_args()
+
+    from app.db.session import engine
+
+    if args.command == "export":
+        output = args.output or Path(f"{args.dataset}.{args.format}")
+        started = time.perf_counter()
+        rows = export_to_file(engine, args.dataset, args.format, output, args.since, args.until)
+        print(f"📦 {rows} rows -> {output} ({output.stat().st_size / 1e6:.1f} MB) in {time.perf_counter() - started:.1f}s")
+    else:
+        result = import_file(engine, args.path, args.dataset)
+        print(f"📥 {result['inserted']} of {result['rows']} rows inserted into {result['dataset']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,331 @@
+import base64
+import hashlib
+import json
+import uuid
+from datetime import datetime
+from sqlalchemy import and_, case, column, func, literal, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import UUID
 
+from app.core.metrics import METADATA_UPSERT_ROWS
+from app.core.serialization import dumps_json
+from app.db.upsert import changed_column_updates, dialect_insert
+from app.services.data_events import current_version, notify_data_changed
+from app.services.single_flight import SingleFlight, freeze
+from app.services.snapshot_service import SnapshotService
 from app.models.metadata_models import CryptoMetadata
-from app.core.logging_config import logger
+from app.core.logging_config import get_logger
+
+# Logs on every create / update / delete; rate-limited by LOG_RATE_LIMITS (see logging_config)
+logger = get_logger("metadata")
+
+BULK_STATUSES = ("created", "updated", "unchanged")
+
+# Columns written by the metadata ingestion. content_hash fingerprints exactly these;
+# the trend columns belong to PriceHistoryService.refresh_trend_columns.
+CONTENT_COLUMNS = (
+    "crypto_name", "market_cap_rank", "circulating_supply", "max_supply",
+    "listed_exchange", "notes", "recent_headline",
+)
+
+
+def content_hash(values: dict) -> str:
+    """Fingerprint of a row's CONTENT_COLUMNS; missing keys count as NULL."""
+    return hashlib.blake2b(dumps_json([values.get(column) for column in CONTENT_COLUMNS]), digest_size=16).hexdigest()
+
+
+def count_bulk_statuses(items: list[dict]) -> dict[str, int]:
+    """Tally the per-row statuses returned by bulk_upsert_crypto_metadata."""
+    counts = {status: 0 for status in BULK_STATUSES}
+    for item in items:
+        counts[item["status"]] += 1
+    return counts
+
+
+def _stored_hashes_statement(symbols):
+    """Just enough of the stored rows to recognise unchanged payloads: symbol, ID and content_hash."""
+    return select(
+        CryptoMetadata.crypto_symbol, CryptoMetadata.crypto_metadata_id, CryptoMetadata.content_hash
+    ).where(CryptoMetadata.crypto_symbol.in_(list(symbols)))
+
+
+def _stored_values_statement(by_symbol: dict[str, dict], symbols: list[str]):
+    """The stored values of every column the rows for `symbols` send, for a column-by-column diff."""
+    columns = set(CONTENT_COLUMNS).union(*(by_symbol[symbol].keys() for symbol in symbols))
+    columns.update(("crypto_symbol", "crypto_metadata_id", "content_hash", "updated_at"))
+    return select(*(CryptoMetadata.__table__.c[column] for column in sorted(columns))).where(
+        CryptoMetadata.crypto_symbol.in_(symbols)
+    )
+
+
+def _plan_bulk_upsert(by_symbol: dict[str, dict], stored: dict) -> tuple[dict, list[dict], list[str]]:
+    """
+    First pass: classify incoming rows against the stored (symbol, ID, content_hash).
+
+    A row carrying exactly the CONTENT_COLUMNS whose hash matches the stored one is
+    unchanged without reading anything else. Returns the per-symbol results, the new
+    rows to insert and the symbols that need a column-by-column diff (see _diff_bulk_rows).
+    A multi-row INSERT needs the same columns on every row, so fields a new row doesn't
+    send are NULL.
+    """
+    new_columns = sorted({key for symbol, row in by_symbol.items() if symbol not in stored for key in row})
+
+    results = {}
+    to_insert = []
+    to_compare = []
+    for symbol, row in by_symbol.items():
+        current = stored.get(symbol)
+        if current is None:
+            status = "created"
+            to_insert.append({
+                "crypto_metadata_id": uuid.uuid4(),
+                **{column: row.get(column) for column in new_columns},
+                "content_hash": content_hash(row),
+            })
+        elif row.keys() - {"crypto_symbol"} == set(CONTENT_COLUMNS) and content_hash(row) == current.content_hash:
+            status = "unchanged"
+        else:
+            status = None  # decided by _diff_bulk_rows
+            to_compare.append(symbol)
+        results[symbol] = {
+            "crypto_symbol": symbol,
+            "crypto_metadata_id": current.crypto_metadata_id if current else None,
+            "status": status,
+        }
+    return results, to_insert, to_compare
+
+
+def _diff_bulk_rows(by_symbol: dict[str, dict], stored: dict[str, dict], results: dict) -> list[dict]:
+    """
+    Second pass: compare partial or changed rows with the stored values.
+
+    Returns one entry per row to write, holding its ID plus only the columns that differ
+    (for changed_column_updates). A row whose values all match but whose stored
+    content_hash is missing or stale only gets its hash written, keeping updated_at.
+    """
+    to_update = []
+    for symbol, current in stored.items():
+        row = by_symbol[symbol]
+        changes = {key: value for key, value in row.items() if key != "crypto_symbol" and current[key] != value}
+        new_hash = content_hash({**current, **row})
+        if new_hash != current["content_hash"]:
+            changes["content_hash"] = new_hash
+            if len(changes) == 1:
+                changes["updated_at"] = current["updated_at"]
+        results[symbol]["status"] = "updated" if changes.keys() - {"content_hash", "updated_at"} else "unchanged"
+        if changes:
+            to_update.append({"crypto_metadata_id": current["crypto_metadata_id"], **changes})
+    # Rows deleted between the two reads are left alone
+    for result in results.values():
+        if result["status"] is None:
+            result["status"] = "unchanged"
+    return to_update
+
+
+def _bulk_insert_statement(db: Session | AsyncSession, to_insert: list[dict]):
+    """
+    INSERT ... ON CONFLICT (crypto_symbol) DO UPDATE ... RETURNING symbol, id. New rows only;
+    the conflict clause covers a concurrent insert of the same symbol.
+    """
+    stmt = dialect_insert(db, CryptoMetadata).values(to_insert)
+    update_columns = {
+        key: stmt.excluded[key]
+        for key in to_insert[0]
+        if key not in ("crypto_metadata_id", "crypto_symbol")
+    }
+    update_columns["updated_at"] = func.current_timestamp()
+    return stmt.on_conflict_do_update(
+        index_elements=[CryptoMetadata.crypto_symbol],
+        set_=update_columns,
+    ).returning(CryptoMetadata.crypto_symbol, CryptoMetadata.crypto_metadata_id)
+
+
+def _finish_bulk_upsert(results: dict[str, dict], to_update: list[dict]) -> list[dict]:
+    counts = count_bulk_statuses(list(results.values()))
+    columns_written = sum(len(row.keys() - {"crypto_metadata_id", "content_hash", "updated_at"}) for row in to_update)
+    logger.info(
+        "[BULK] Upserted %d rows: %d created, %d updated (%d columns), %d unchanged.",
+        len(results), counts["created"], counts["updated"], columns_written, counts["unchanged"],
+    )
+    for status, count in counts.items():
+        METADATA_UPSERT_ROWS.labels(status).inc(count)
+    changed = [symbol for symbol, result in results.items() if result["status"] != "unchanged"]
+    if changed:
+        notify_data_changed("bulk_upsert", changed)
+    return list(results.values())
+
+
+def _record_changes(metadata: CryptoMetadata, data: dict) -> list[str]:
+    """
+    Set only the attributes of `metadata` that `data` actually changes, so the flush
+    UPDATEs just those columns, and refresh content_hash to match. Returns the names of
+    the changed columns; empty means there is nothing to write.
+    """
+    changed = [key for key, value in data.items() if getattr(metadata, key) != value]
+    if changed:
+        for key in changed:
+            setattr(metadata, key, data[key])
+        metadata.content_hash = content_hash({column: getattr(metadata, column) for column in CONTENT_COLUMNS})
+    return changed
+
+
+# Columns a list request may project with ?fields=, in CryptoMetadataOut order
+LISTABLE_FIELDS = (
+    "crypto_name", "crypto_symbol", "market_cap_rank", "circulating_supply", "max_supply",
+    "listed_exchange", "notes", "trend_info", "recent_headline", "crypto_metadata_id",
+    "return_1d_pct", "return_7d_pct", "return_30d_pct", "volatility_30d_pct", "max_drawdown_30d_pct",
+)
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(market_cap_rank: int | None, crypto_symbol: str) -> str:
+    """Opaque keyset cursor pointing just past the given row."""
+    raw = json.dumps([market_cap_rank, crypto_symbol], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int | None, str]:
+    """Inverse of encode_cursor; raises ValueError on anything it didn't produce."""
+    try:
+        rank, symbol = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError("Malformed cursor") from e
+    if not (rank is None or type(rank) is int) or not isinstance(symbol, str):
+        raise ValueError("Malformed cursor")
+    return rank, symbol
+
+
+def metadata_select(
+    fields: list[str] | None = None,
+    min_rank: int | None = None,
+    max_rank: int | None = None,
+    symbol_prefix: str | None = None,
+    symbols: list[str] | None = None,
+    updated_since: datetime | None = None,
+    extra_columns: tuple[str, ...] = (),
+):
+    """
+    SELECT the requested LISTABLE_FIELDS (all of them if `fields` is empty) plus
+    `extra_columns`, with the list/export filters applied, ordered by
+    (market_cap_rank NULLS LAST, crypto_symbol) so the rank index serves the sort.
+
+    Raises:
+        ValueError: If `fields` names a column that can't be listed.
+    """
+    unknown = set(fields or ()) - set(LISTABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    rank, symbol = CryptoMetadata.market_cap_rank, CryptoMetadata.crypto_symbol
+    names = [name for name in LISTABLE_FIELDS if not fields or name in fields]
+    names += [name for name in extra_columns if name not in names]
+
+    stmt = select(*(getattr(CryptoMetadata, name) for name in names))
+    if min_rank is not None:
+        stmt = stmt.where(rank >= min_rank)
+    if max_rank is not None:
+        stmt = stmt.where(rank <= max_rank)
+    if symbol_prefix:
+        escaped = symbol_prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        stmt = stmt.where(func.lower(symbol).like(f"{escaped}%", escape="\\"))
+    if symbols:
+        stmt = stmt.where(symbol.in_(symbols))
+    if updated_since is not None:
+        stmt = stmt.where(CryptoMetadata.updated_at >= updated_since)
+    return stmt.order_by(rank.asc().nulls_last(), symbol.asc())
+
+
+def _list_page_statement(limit: int, cursor: str | None = None, **filters):
+    """
+    One page of metadata_select() after `cursor`.
+
+    The ordering is unique because crypto_symbol is, so "rows after the cursor"
+    is a plain row-value comparison that the (market_cap_rank, crypto_symbol)
+    index can seek to instead of counting past an OFFSET. Unranked rows sort last.
+    Fetches limit + 1 rows so the caller can tell whether another page exists.
+    """
+    rank, symbol = CryptoMetadata.market_cap_rank, CryptoMetadata.crypto_symbol
+    stmt = metadata_select(**filters, extra_columns=("market_cap_rank", "crypto_symbol"))
+    if cursor:
+        after_rank, after_symbol = decode_cursor(cursor)
+        if after_rank is None:
+            stmt = stmt.where(and_(rank.is_(None), symbol > after_symbol))
+        else:
+            stmt = stmt.where(or_(tuple_(rank, symbol) > tuple_(after_rank, after_symbol), rank.is_(None)))
+    return stmt.limit(limit + 1)
+
+
+def _finish_page(rows, limit: int, fields: list[str] | None) -> tuple[list[dict], str | None]:
+    rows = [dict(row) for row in rows]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["market_cap_rank"], rows[-1]["crypto_symbol"])
+    if fields:
+        rows = [{name: row[name] for name in fields} for row in rows]
+    return rows, next_cursor
+
+
+MAX_SEARCH_RESULTS = 100
+
+
+def _search_statement(db: Session | AsyncSession, q: str, limit: int, fields: list[str] | None = None):
+    """
+    Rows matching the search text `q`, best match first, with a `score` column.
+
+    On Postgres a row matches if the search_vector generated column matches
+    websearch_to_tsquery(q) (quoted phrases, OR and -exclusions work), or if `q` is
+    word-similar to the coin's name or symbol, which catches prefixes ("bitc") and
+    typos ("etherium"). Each condition is served by its own GIN index (see
+    metadata_models.SEARCH_DDL).
+
+    score = normalised ts_rank + the best word similarity + the best whole-string
+    similarity of name or symbol, each between 0 and 1: a hit on the name outranks
+    one in the notes, and "bitcoin" puts Bitcoin ahead of Bitcoin Cash.
+
+    SQLite has neither, so the stand-in falls back to a substring match with an
+    exact symbol ranked first.
+
+    Raises:
+        ValueError: If `fields` names a column that can't be listed.
+    """
+    unknown = set(fields or ()) - set(LISTABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    names = [field for field in LISTABLE_FIELDS if not fields or field in fields]
+    name, symbol = CryptoMetadata.crypto_name, CryptoMetadata.crypto_symbol
+
+    if db.get_bind().dialect.name == "postgresql":
+        # 'simple' matches names and symbols verbatim, 'english' the stemmed notes
+        query = func.websearch_to_tsquery(literal("simple").cast(REGCONFIG), q).op("||")(
+            func.websearch_to_tsquery(literal("english").cast(REGCONFIG), q)
+        )
+        vector = column("search_vector", TSVECTOR)
+        score = (
+            func.ts_rank(vector, query, 32)
+            + func.greatest(func.word_similarity(q, name), func.word_similarity(q, symbol))
+            + func.greatest(func.similarity(q, name), func.similarity(q, symbol))
+        )
+        match = or_(vector.op("@@")(query), name.op("%>")(q), symbol.op("%>")(q))
+    else:
+        needle = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        score = case(
+            (func.lower(symbol) == q.lower(), 2.0),
+            (func.lower(name).like(f"{needle}%", escape="\\"), 1.0),
+            else_=0.5,
+        )
+        searched = (name, symbol, CryptoMetadata.notes, CryptoMetadata.recent_headline)
+        match = or_(*(func.lower(searched_column).like(f"%{needle}%", escape="\\") for searched_column in searched))
+
+    return (
+        select(*(getattr(CryptoMetadata, field) for field in names), score.label("score"))
+        .where(match)
+        .order_by(score.desc(), CryptoMetadata.market_cap_rank.asc().nulls_last(), symbol.asc())
+        .limit(min(limit, MAX_SEARCH_RESULTS))
+    )
 
 
 class CryptoMetadataService:
@@ -16,33 +338,90 @@ class CryptoMetadataService:
     def create_crypto_metadata(db: Session, metadata_data: dict) -> CryptoMetadata:
         """
         Create a new CryptoMetadata record. If one already exists with the same symbol,
-        it will be backed up (e.g., printed/stored/logged) and replaced.
+        its changed fields are overwritten in place (keeping its ID); the previous state
+        stays in the snapshot archive. An identical payload writes nothing.
         """
         try:
-            existing = db.query(CryptoMetadata).filter(
+            metadata = db.query(CryptoMetadata).filter(
                 CryptoMetadata.crypto_symbol == metadata_data["crypto_symbol"]
             ).first()
 
-            if existing:
-                logger.info(f"[REPLACE] Existing entry for {existing.crypto_symbol} found. Backing up and deleting.")
-                # Here you could store to file, archive table, or just log
-                logger.info(f"Backup: {existing.__dict__}")
-                db.delete(existing)
-                db.commit()  # Commit the deletion before insert
+            if metadata:
+                if not _record_changes(metadata, metadata_data):
+                    logger.info("[CREATE] Metadata for %s unchanged; nothing written.", metadata.crypto_symbol)
+                    return metadata
+                logger.info("[REPLACE] Existing entry for %s found. Updating changed fields in place.", metadata.crypto_symbol)
+            else:
+                metadata = CryptoMetadata(**metadata_data, content_hash=content_hash(metadata_data))
+                db.add(metadata)
 
-            new_metadata = CryptoMetadata(**metadata_data)
-            db.add(new_metadata)
+            db.flush()
+            SnapshotService.archive(db, [metadata.crypto_symbol], "create")
             db.commit()
-            db.refresh(new_metadata)
+            db.refresh(metadata)
+
+            logger.info("[CREATE] Metadata for %s saved.", metadata.crypto_symbol)
+            notify_data_changed("create", [metadata.crypto_symbol])
+            return metadata
+
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error("[ERROR][CREATE] Failed to create or replace metadata: %s", e)
+            raise
+
+    @staticmethod
+    def bulk_upsert_crypto_metadata(db: Session, rows: list[dict]) -> list[dict]:
+        """
+        Upsert a batch of CryptoMetadata records keyed on crypto_symbol, in one transaction.
+
+        Incoming rows are fingerprinted first: a full payload whose content_hash matches the
+        stored one is skipped after reading just (symbol, ID, hash). The rest are diffed
+        column by column, and existing rows get UPDATEs that set only their changed columns
+        (one executemany per set of changed columns). New rows go in with a single
+        INSERT ... ON CONFLICT (crypto_symbol) DO UPDATE. If the same symbol appears more
+        than once, the last row wins. Fields missing from a row keep their stored value
+        (or NULL for new rows).
 
-            logger.info(f"[CREATE] New metadata for {new_metadata.crypto_symbol} created.")
-            return new_metadata
+        Args:
+            db (Session): SQLAlchemy session.
+            rows (list[dict]): Field values per record, each including crypto_symbol.
+
+        Returns:
+            One dict per symbol with crypto_symbol, crypto_metadata_id and status
+            ("created", "updated" or "unchanged"), in input order.
+        """
+        by_symbol = {row["crypto_symbol"]: row for row in rows}
+        if not by_symbol:
+            return []
+
+        try:
+            stored = {row.crypto_symbol: row for row in db.execute(_stored_hashes_statement(by_symbol))}
+            results, to_insert, to_compare = _plan_bulk_upsert(by_symbol, stored)
+
+            to_update = []
+            if to_compare:
+                current = {
+                    row["crypto_symbol"]: row
+                    for row in db.execute(_stored_values_statement(by_symbol, to_compare)).mappings()
+                }
+                to_update = _diff_bulk_rows(by_symbol, current, results)
+            for stmt, params in changed_column_updates(CryptoMetadata.__table__, "crypto_metadata_id", to_update):
+                db.execute(stmt, params)
+            if to_insert:
+                for symbol, metadata_id in db.execute(_bulk_insert_statement(db, to_insert)):
+                    results[symbol]["crypto_metadata_id"] = metadata_id
+
+            changed = [symbol for symbol, result in results.items() if result["status"] != "unchanged"]
+            SnapshotService.archive(db, changed, "bulk_upsert")
+            db.commit()
 
         except SQLAlchemyError as e:
             db.rollback()
-            logger.error(f"[ERROR][CREATE] Failed to create or replace metadata: {e}")
+            logger.error("[ERROR][BULK] Failed to upsert %s metadata rows: %s", len(by_symbol), e)
             raise
 
+        return _finish_bulk_upsert(results, to_update)
+
     @staticmethod
     def get_all_crypto_metadata(db: Session) -> list[CryptoMetadata]:
         """
@@ -56,6 +435,46 @@ class CryptoMetadataService:
         """
         return db.query(CryptoMetadata).all()
 
+    @staticmethod
+    def list_crypto_metadata_page(db: Session, limit: int = 100, **filters) -> tuple[list[dict], str | None]:
+        """
+        Retrieve one keyset-paginated page of CryptoMetadata rows as plain dicts.
+
+        Args:
+            db (Session): SQLAlchemy session.
+            limit (int): Page size, capped at MAX_PAGE_SIZE.
+            **filters: cursor, min_rank, max_rank, symbol_prefix, symbols, updated_since and
+                fields (columns to select; all of LISTABLE_FIELDS if omitted).
+
+        Returns:
+            (rows, next_cursor); next_cursor is None on the last page.
+
+        Raises:
+            ValueError: For a malformed cursor or an unknown field name.
+        """
+        limit = min(limit, MAX_PAGE_SIZE)
+        rows = db.execute(_list_page_statement(limit, **filters)).mappings()
+        return _finish_page(rows, limit, filters.get("fields"))
+
+    @staticmethod
+    def search_crypto_metadata(db: Session, q: str, limit: int = 20, fields: list[str] | None = None) -> list[dict]:
+        """
+        Full-text and fuzzy search over names, symbols, notes and headlines.
+
+        Args:
+            db (Session): SQLAlchemy session.
+            q (str): Search text; websearch syntax ("exact phrase", or, -word) on Postgres.
+            limit (int): Maximum results, capped at MAX_SEARCH_RESULTS.
+            fields (list[str] | None): Columns to return; all of LISTABLE_FIELDS if omitted.
+
+        Returns:
+            Matching rows as dicts, best first, each with a `score`.
+
+        Raises:
+            ValueError: For an unknown field name.
+        """
+        return [dict(row) for row in db.execute(_search_statement(db, q, limit, fields)).mappings()]
+
     @staticmethod
     def get_crypto_metadata_by_id(db: Session, metadata_id: UUID) -> CryptoMetadata | None:
         """
@@ -75,7 +494,8 @@ class CryptoMetadataService:
     @staticmethod
     def update_crypto_metadata(db: Session, metadata_id: UUID, update_data: dict) -> CryptoMetadata | None:
         """
-        Update an existing CryptoMetadata record by ID.
+        Update an existing CryptoMetadata record by ID. Only fields whose value differs are
+        written; if none do, the record is returned without touching the database.
 
         Args:
             db (Session): SQLAlchemy session.
@@ -90,21 +510,25 @@ class CryptoMetadataService:
         ).first()
 
         if not metadata:
-            logger.warning(f"[UPDATE] No record found with ID: {metadata_id}")
+            logger.warning("[UPDATE] No record found with ID: %s", metadata_id)
             return None
 
-        for key, value in update_data.items():
-            setattr(metadata, key, value)
+        if not _record_changes(metadata, update_data):
+            logger.info("[UPDATE] CryptoMetadata '%s' unchanged; nothing written.", metadata.crypto_symbol)
+            return metadata
 
         try:
+            db.flush()
+            SnapshotService.archive(db, [metadata.crypto_symbol], "update")
             db.commit()
             db.refresh(metadata)
-            logger.info(f"[UPDATE] CryptoMetadata '{metadata.crypto_symbol}' updated successfully.")
+            logger.info("[UPDATE] CryptoMetadata '%s' updated successfully.", metadata.crypto_symbol)
+            notify_data_changed("update", [metadata.crypto_symbol])
             return metadata
 
         except SQLAlchemyError as e:
             db.rollback()
-            logger.error(f"[ERROR][UPDATE] Failed to update CryptoMetadata: {e}")
+            logger.error("[ERROR][UPDATE] Failed to update CryptoMetadata: %s", e)
             raise
 
     @staticmethod
@@ -124,16 +548,214 @@ class CryptoMetadataService:
         ).first()
 
         if not metadata:
-            logger.warning(f"[DELETE] No record found with ID: {metadata_id}")
+            logger.warning("[DELETE] No record found with ID: %s", metadata_id)
             return False
 
         try:
+            SnapshotService.archive(db, [metadata.crypto_symbol], "delete")
             db.delete(metadata)
             db.commit()
-            logger.info(f"[DELETE] CryptoMetadata '{metadata.crypto_symbol}' deleted successfully.")
+            logger.info("[DELETE] CryptoMetadata '%s' deleted successfully.", metadata.crypto_symbol)
+            notify_data_changed("delete", [metadata.crypto_symbol])
             return True
 
         except SQLAlchemyError as e:
             db.rollback()
-            logger.error(f"[ERROR][DELETE] Failed to delete CryptoMetadata: {e}")
+            logger.error("[ERROR][DELETE] Failed to delete CryptoMetadata: %s", e)
+            raise
+
+
+class AsyncCryptoMetadataService:
+    """
+    AsyncSession counterpart of CryptoMetadataService, used by the API routes so that
+    waiting on the database doesn't tie up a worker thread. Behaviour and return values
+    match the sync methods one-for-one.
+    """
+
+    @staticmethod
+    async def _get(db: AsyncSession, metadata_id: UUID) -> CryptoMetadata | None:
+        return await db.get(CryptoMetadata, metadata_id)
+
+    @staticmethod
+    async def create_crypto_metadata(db: AsyncSession, metadata_data: dict) -> CryptoMetadata:
+        """
+        Create a new CryptoMetadata record, overwriting any existing one with the same symbol in place.
+        """
+        try:
+            metadata = (await db.execute(
+                select(CryptoMetadata).where(CryptoMetadata.crypto_symbol == metadata_data["crypto_symbol"])
+            )).scalars().first()
+
+            if metadata:
+                if not _record_changes(metadata, metadata_data):
+                    logger.info("[CREATE] Metadata for %s unchanged; nothing written.", metadata.crypto_symbol)
+                    return metadata
+                logger.info("[REPLACE] Existing entry for %s found. Updating changed fields in place.", metadata.crypto_symbol)
+            else:
+                metadata = CryptoMetadata(**metadata_data, content_hash=content_hash(metadata_data))
+                db.add(metadata)
+
+            await db.flush()
+            await SnapshotService.archive_async(db, [metadata.crypto_symbol], "create")
+            await db.commit()
+            await db.refresh(metadata)
+
+            logger.info("[CREATE] Metadata for %s saved.", metadata.crypto_symbol)
+            notify_data_changed("create", [metadata.crypto_symbol])
+            return metadata
+
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("[ERROR][CREATE] Failed to create or replace metadata: %s", e)
             raise
+
+    @staticmethod
+    async def bulk_upsert_crypto_metadata(db: AsyncSession, rows: list[dict]) -> list[dict]:
+        """
+        Upsert a batch keyed on crypto_symbol in one transaction.
+        See CryptoMetadataService.bulk_upsert_crypto_metadata.
+        """
+        by_symbol = {row["crypto_symbol"]: row for row in rows}
+        if not by_symbol:
+            return []
+
+        try:
+            stored = {row.crypto_symbol: row for row in await db.execute(_stored_hashes_statement(by_symbol))}
+            results, to_insert, to_compare = _plan_bulk_upsert(by_symbol, stored)
+
+            to_update = []
+            if to_compare:
+                current = {
+                    row["crypto_symbol"]: row
+                    for row in (await db.execute(_stored_values_statement(by_symbol, to_compare))).mappings()
+                }
+                to_update = _diff_bulk_rows(by_symbol, current, results)
+            for stmt, params in changed_column_updates(CryptoMetadata.__table__, "crypto_metadata_id", to_update):
+                await db.execute(stmt, params)
+            if to_insert:
+                for symbol, metadata_id in await db.execute(_bulk_insert_statement(db, to_insert)):
+                    results[symbol]["crypto_metadata_id"] = metadata_id
+
+            changed = [symbol for symbol, result in results.items() if result["status"] != "unchanged"]
+            await SnapshotService.archive_async(db, changed, "bulk_upsert")
+            await db.commit()
+
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("[ERROR][BULK] Failed to upsert %s metadata rows: %s", len(by_symbol), e)
+            raise
+
+        return _finish_bulk_upsert(results, to_update)
+
+    @staticmethod
+    async def get_all_crypto_metadata(db: AsyncSession) -> list[CryptoMetadata]:
+        """Retrieve all CryptoMetadata records."""
+        return list((await db.execute(select(CryptoMetadata))).scalars())
+
+    @staticmethod
+    async def get_crypto_metadata_row(db: AsyncSession, metadata_id: UUID) -> dict | None:
+        """The LISTABLE_FIELDS of one record as a plain dict, without building an ORM object."""
+        stmt = metadata_select().where(CryptoMetadata.crypto_metadata_id == metadata_id)
+        row = (await db.execute(stmt)).mappings().first()
+        return dict(row) if row else None
+
+    @staticmethod
+    async def list_crypto_metadata_page(db: AsyncSession, limit: int = 100, **filters) -> tuple[list[dict], str | None]:
+        """One keyset-paginated page of rows as dicts, plus the next cursor (see the sync method)."""
+        limit = min(limit, MAX_PAGE_SIZE)
+        rows = (await db.execute(_list_page_statement(limit, **filters))).mappings()
+        return _finish_page(rows, limit, filters.get("fields"))
+
+    @staticmethod
+    async def search_crypto_metadata(db: AsyncSession, q: str, limit: int = 20, fields: list[str] | None = None) -> list[dict]:
+        """Ranked full-text and fuzzy search (see the sync method)."""
+        return [dict(row) for row in (await db.execute(_search_statement(db, q, limit, fields))).mappings()]
+
+    @staticmethod
+    async def get_crypto_metadata_by_id(db: AsyncSession, metadata_id: UUID) -> CryptoMetadata | None:
+        """Retrieve a single CryptoMetadata record by its UUID."""
+        return await AsyncCryptoMetadataService._get(db, metadata_id)
+
+    @staticmethod
+    async def update_crypto_metadata(db: AsyncSession, metadata_id: UUID, update_data: dict) -> CryptoMetadata | None:
+        """Update an existing CryptoMetadata record by ID; None if it doesn't exist."""
+        metadata = await AsyncCryptoMetadataService._get(db, metadata_id)
+
+        if not metadata:
+            logger.warning("[UPDATE] No record found with ID: %s", metadata_id)
+            return None
+
+        if not _record_changes(metadata, update_data):
+            logger.info("[UPDATE] CryptoMetadata '%s' unchanged; nothing written.", metadata.crypto_symbol)
+            return metadata
+
+        try:
+            await db.flush()
+            await SnapshotService.archive_async(db, [metadata.crypto_symbol], "update")
+            await db.commit()
+            await db.refresh(metadata)
+            logger.info("[UPDATE] CryptoMetadata '%s' updated successfully.", metadata.crypto_symbol)
+            notify_data_changed("update", [metadata.crypto_symbol])
+            return metadata
+
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("[ERROR][UPDATE] Failed to update CryptoMetadata: %s", e)
+            raise
+
+    @staticmethod
+    async def delete_crypto_metadata(db: AsyncSession, metadata_id: UUID) -> bool:
+        """Delete a CryptoMetadata record by ID; False if it doesn't exist."""
+        metadata = await AsyncCryptoMetadataService._get(db, metadata_id)
+
+        if not metadata:
+            logger.warning("[DELETE] No record found with ID: %s", metadata_id)
+            return False
+
+        try:
+            await SnapshotService.archive_async(db, [metadata.crypto_symbol], "delete")
+            await db.delete(metadata)
+            await db.commit()
+            logger.info("[DELETE] CryptoMetadata '%s' deleted successfully.", metadata.crypto_symbol)
+            notify_data_changed("delete", [metadata.crypto_symbol])
+            return True
+
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("[ERROR][DELETE] Failed to delete CryptoMetadata: %s", e)
+            raise
+
+
+class CoalescedMetadataReads:
+    """
+    The read methods of AsyncCryptoMetadataService behind a single-flight layer
+    (see app/services/single_flight.py). Identical concurrent calls at the same
+    data version share one query and its result, so a burst of clients after a
+    refresh costs one database round trip per distinct request instead of one
+    per client. Results are shared between callers and must not be mutated.
+
+    Each execution opens its own session from `session_factory`; it can outlive
+    the request that started it if that client goes away.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, flights: SingleFlight | None = None):
+        self.session_factory = session_factory
+        self.flights = flights or SingleFlight("metadata_read")
+
+    async def _shared(self, method, *args, **kwargs):
+        key = (method.__name__, current_version(), freeze(args), freeze(kwargs))
+
+        async def run():
+            async with self.session_factory() as db:
+                return await method(db, *args, **kwargs)
+
+        return await self.flights.do(key, run)
+
+    async def get_crypto_metadata_row(self, metadata_id: UUID) -> dict | None:
+        return await self._shared(AsyncCryptoMetadataService.get_crypto_metadata_row, metadata_id)
+
+    async def list_crypto_metadata_page(self, limit: int = 100, **filters) -> tuple[list[dict], str | None]:
+        return await self._shared(AsyncCryptoMetadataService.list_crypto_metadata_page, limit, **filters)
+
+    async def search_crypto_metadata(self, q: str, limit: int = 20, fields: list[str] | None = None) -> list[dict]:
+        return await self._shared(AsyncCryptoMetadataService.search_crypto_metadata, q, limit, fields)
@@ -0,0 +1,104 @@
+import asyncio
+import gzip
+import hashlib
+import time
+from dataclasses import dataclass
+
+from jinja2 import Environment
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.db.session import SessionLocal
+from app.models.metadata_models import CryptoMetadata
+from app.services import data_events
+from app.services.coin_index import CoinIndex
+from app.services.single_flight import SingleFlight
+
+
+@dataclass(frozen=True)
+class RenderedDashboard:
+    version: int
+    html: bytes
+    gzipped: bytes | None
+    etag: str
+    render_ms: float
+
+    @property
+    def gzip_etag(self) -> str:
+        """Strong validator for the gzip body; each content-coding needs its own (RFC 9110 8.8.3)."""
+        return f'{self.etag[:-1]}-gz"'
+
+
+class DashboardCache:
+    """
+    Holds the rendered dashboard HTML for the current data version.
+
+    The page is rendered at most once per data change: the first request after
+    a write re-renders it (in a worker thread), requests arriving meanwhile wait
+    for that render through a single-flight keyed on the data version, and every
+    later one is served the cached bytes (and their gzip copy) without touching
+    the database or Jinja2.
+
+    The data version is per process, so with several workers each one renders
+    its own copy after a change it hears about. Coins are taken from `index`
+    when it is up to date, so a re-render doesn't query the database either.
+
+    `compress` defaults to settings.DASHBOARD_GZIP, read at render time.
+    """
+
+    def __init__(
+        self,
+        env: Environment,
+        template_name: str = "index.html",
+        compress: bool | None = None,
+        index: CoinIndex | None = None,
+    ):
+        self.env = env
+        self.template_name = template_name
+        self.compress = compress
+        self.index = index
+        self._snapshot: RenderedDashboard | None = None
+        self._flights = SingleFlight("dashboard")
+
+    async def get(self) -> tuple[RenderedDashboard, bool]:
+        """
+        Return (snapshot, cache_hit), rendering a fresh snapshot if the data changed.
+        """
+        version = data_events.current_version()
+        snapshot = self._snapshot
+        # Versions only cover changes this process hears about; without the change feed, re-render every time
+        if snapshot and snapshot.version == version and (self.index is None or self.index.sees_all_writes()):
+            return snapshot, True
+
+        snapshot = await self._flights.do(version, lambda: asyncio.to_thread(self._render))
+        if self._snapshot is None or snapshot.version >= self._snapshot.version:
+            self._snapshot = snapshot
+        return snapshot, False
+
+    def _render(self) -> RenderedDashboard:
+        started = time.perf_counter()
+        # Read the version first: a write that lands mid-render bumps it and forces a re-render
+        version = data_events.current_version()
+
+        snapshot = self.index.current() if self.index else None
+        if snapshot is not None:
+            html = self.env.get_template(self.template_name).render(coins=snapshot.ordered).encode("utf-8")
+        else:
+            db = SessionLocal()
+            try:
+                coins = db.query(CryptoMetadata).order_by(CryptoMetadata.market_cap_rank).all()
+                html = self.env.get_template(self.template_name).render(coins=coins).encode("utf-8")
+            finally:
+                db.close()
+
+        compress = settings.DASHBOARD_GZIP if self.compress is None else self.compress
+        gzipped = gzip.compress(html, compresslevel=6) if compress else None
+        render_ms = (time.perf_counter() - started) * 1000
+        logger.info("[DASHBOARD] Rendered version %s (%s bytes) in %.1fms.", version, len(html), render_ms)
+        return RenderedDashboard(
+            version=version,
+            html=html,
+            gzipped=gzipped,
+            etag=f'"{hashlib.blake2b(html, digest_size=12).hexdigest()}"',
+            render_ms=render_ms,
+        )
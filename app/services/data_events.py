@@ -0,0 +1,70 @@
+"""
+In-process notifications for changes to crypto metadata.
+
+Every successful write through CryptoMetadataService / AsyncCryptoMetadataService
+(and every finished refresh job) bumps a process-wide data version and notifies
+subscribers, so caches built from the table know when they are stale.
+Changes made by other processes arrive through PgChangeFeed, flagged remote.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from app.core.logging_config import logger
+
+
+@dataclass(frozen=True)
+class DataChange:
+    version: int
+    source: str                       # e.g. "create", "bulk_upsert", "refresh"
+    symbols: tuple[str, ...] = ()     # affected symbols, if known
+    remote: bool = False              # relayed from another process (see pg_change_feed)
+
+
+Listener = Callable[[DataChange], None]
+
+_lock = threading.Lock()
+_version = 0
+_listeners: list[Listener] = []
+
+
+def current_version() -> int:
+    return _version
+
+
+def subscribe(listener: Listener) -> Callable[[], None]:
+    """Register a listener; returns a function that unregisters it."""
+    with _lock:
+        _listeners.append(listener)
+
+    def unsubscribe() -> None:
+        with _lock:
+            if listener in _listeners:
+                _listeners.remove(listener)
+
+    return unsubscribe
+
+
+def notify_data_changed(source: str, symbols: Iterable[str] = (), remote: bool = False) -> int:
+    """
+    Record that crypto metadata changed and notify listeners.
+
+    Listeners run synchronously in the caller's thread and must be quick;
+    their exceptions are logged, never raised to the writer.
+
+    Returns:
+        The new data version.
+    """
+    global _version
+    with _lock:
+        _version += 1
+        change = DataChange(version=_version, source=source, symbols=tuple(symbols), remote=remote)
+        listeners = list(_listeners)
+
+    for listener in listeners:
+        try:
+            listener(change)
+        except Exception as e:
+            logger.error("[ERROR][EVENTS] Listener %r failed: %s", listener, e)
+    return change.version
@@ -0,0 +1,200 @@
+"""
+Relays data_events between worker processes through Postgres LISTEN/NOTIFY.
+
+data_events is per process, so with several uvicorn workers (or a separate
+ingestion process) a write only invalidates caches and reaches /events clients
+in the process that made it. With PUSH_PG_NOTIFY on, every process runs a
+PgChangeFeed that:
+
+• publishes its own changes with pg_notify(channel, {"source", "symbols"})
+• LISTENs on the channel and replays other processes' changes locally via
+  notify_data_changed(..., remote=True), which are not published again
+
+The feed holds one pooled async connection for the lifetime of the app. If it is
+lost (network blip, server restart, idle disconnect), the feed logs it and
+reconnects with backoff. Notifications sent while it was down are gone, so after
+a reconnect it emits a local change without symbols ("anything may have
+changed"), and the coin index and dashboard rebuild from the database. While the
+connection is quiet, it is checked every HEALTH_CHECK_SECONDS, so a dead socket
+is noticed even when nothing is being published. It is a no-op on SQLite.
+"""
+
+import asyncio
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.logging_config import logger
+from app.core.serialization import dumps_json
+from app.services import data_events
+from app.services.data_events import DataChange
+
+# Postgres caps NOTIFY payloads at 8000 bytes; past this the symbols are left out,
+# which listeners treat as "anything may have changed"
+MAX_PAYLOAD_BYTES = 7900
+HEALTH_CHECK_SECONDS = 30
+RECONNECT_MIN_SECONDS = 1
+RECONNECT_MAX_SECONDS = 60
+
+
+def encode_change(change: DataChange) -> str:
+    payload = dumps_json({"source": change.source, "symbols": list(change.symbols)})
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        payload = dumps_json({"source": change.source, "symbols": []})
+    return payload.decode()
+
+
+class PgChangeFeed:
+    """
+    Publishes local data changes to, and replays remote ones from, a NOTIFY channel.
+
+    Args:
+        engine (AsyncEngine): Engine to take the listening connection from.
+        channel (str): NOTIFY channel shared by every process of the app.
+    """
+
+    def __init__(self, engine: AsyncEngine, channel: str):
+        self.engine = engine
+        self.channel = channel
+        self._conn: AsyncConnection | None = None
+        self._driver = None                  # the asyncpg connection under _conn
+        self._server_pid: int | None = None
+        self._generation = 0                 # bumped per connection, so a stale loss signal is ignored
+        self._listening = False
+        self._outbox: asyncio.Queue | None = None
+        self._pending: str | None = None     # taken from the outbox but not yet sent
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._unsubscribe = None
+
+    @property
+    def in_sync(self) -> bool:
+        """
+        True if every other process's changes reach this one: the LISTEN connection
+        is up, or the backend is the single-process SQLite stand-in.
+        """
+        return self.engine.dialect.name != "postgresql" or self._listening
+
+    async def start(self) -> None:
+        if self.engine.dialect.name != "postgresql":
+            logger.info("[PUSH] LISTEN/NOTIFY feed needs Postgres; changes stay in this process.")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._outbox = asyncio.Queue()
+        self._unsubscribe = data_events.subscribe(self._on_local_change)
+        try:
+            await self._connect()
+            connected = True
+        except Exception as e:
+            logger.error("[ERROR][PUSH] Could not open the LISTEN connection; retrying in the background: %s", e)
+            connected = False
+        self._task = asyncio.create_task(self._run(connected))
+
+    async def stop(self) -> None:
+        if self._unsubscribe:
+            self._unsubscribe()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._disconnect()
+
+    # ------------------------------------------------------------ connection
+    async def _connect(self) -> None:
+        self._generation += 1
+        generation = self._generation
+        self._conn = await self.engine.connect()
+        try:
+            self._driver = (await self._conn.get_raw_connection()).driver_connection
+            self._server_pid = self._driver.get_server_pid()
+            await self._driver.add_listener(self.channel, self._on_notify)
+            self._driver.add_termination_listener(lambda _: self._on_connection_lost(generation))
+        except Exception:
+            await self._disconnect()
+            raise
+        self._listening = True
+        logger.info("[PUSH] Listening for changes from other processes on '%s'.", self.channel)
+
+    async def _disconnect(self) -> None:
+        conn, self._conn = self._conn, None
+        self._listening = False
+        self._generation += 1  # the close below fires the termination listener; ignore it
+        if conn is None:
+            return
+        try:
+            if not self._driver.is_closed():
+                await self._driver.remove_listener(self.channel, self._on_notify)
+        except Exception:
+            pass  # the connection is being dropped anyway
+        try:
+            await conn.invalidate()  # never hand a connection that may be broken back to the pool
+            await conn.close()
+        except Exception as e:
+            logger.debug("[PUSH] Closing the LISTEN connection failed: %s", e)
+
+    def _on_connection_lost(self, generation: int) -> None:
+        # asyncpg termination listener; wakes the loop below through the outbox
+        if generation == self._generation:
+            self._listening = False
+            self._outbox.put_nowait(generation)
+
+    async def _run(self, connected: bool) -> None:
+        delay = RECONNECT_MIN_SECONDS
+        while True:
+            if not connected:
+                try:
+                    await self._connect()
+                except Exception as e:
+                    logger.error("[ERROR][PUSH] Reconnect to '%s' failed, retrying in %ss: %s", self.channel, delay, e)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+                    continue
+                delay = RECONNECT_MIN_SECONDS
+                # Whatever other processes changed while we were away was never delivered
+                data_events.notify_data_changed("reconnect", (), remote=True)
+            try:
+                await self._serve()
+            except Exception as e:
+                logger.error("[ERROR][PUSH] Lost the LISTEN connection on '%s', reconnecting: %s", self.channel, e)
+            await self._disconnect()
+            connected = False
+
+    async def _serve(self) -> None:
+        """Publish queued changes and check the connection while idle; raises once it is lost."""
+        # One connection runs one statement at a time, so NOTIFYs (and checks) go out in order from here
+        while True:
+            if self._pending is None:
+                try:
+                    item = await asyncio.wait_for(self._outbox.get(), HEALTH_CHECK_SECONDS)
+                except asyncio.TimeoutError:
+                    await asyncio.wait_for(self._driver.execute("SELECT 1"), HEALTH_CHECK_SECONDS)
+                    continue
+                if isinstance(item, int):
+                    if item == self._generation:
+                        raise ConnectionError("connection closed")
+                    continue  # loss signal from an earlier connection
+                self._pending = item
+            try:
+                await self._driver.execute("SELECT pg_notify($1, $2)", self.channel, self._pending)
+            except Exception as e:
+                if self._driver.is_closed():
+                    raise  # resent once reconnected
+                logger.error("[ERROR][PUSH] NOTIFY on '%s' failed: %s", self.channel, e)
+            self._pending = None
+
+    def _on_local_change(self, change: DataChange) -> None:
+        """data_events listener; may run in any thread, so only queues the payload."""
+        if not change.remote:
+            self._loop.call_soon_threadsafe(self._outbox.put_nowait, encode_change(change))
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        if pid == self._server_pid:
+            return  # our own NOTIFY, already handled locally
+        try:
+            message = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            logger.warning("[PUSH] Ignoring malformed NOTIFY payload on '%s'.", channel)
+            return
+        data_events.notify_data_changed(message.get("source", "remote"), message.get("symbols") or (), remote=True)
@@ -0,0 +1,248 @@
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.metrics import TREND_METRIC_ROWS
+from app.db.upsert import changed_column_updates, dialect_insert
+from app.models.metadata_models import CryptoMetadata
+from app.models.price_history_models import CryptoPriceHistory
+from app.services.data_events import notify_data_changed
+from app.services.snapshot_service import SnapshotService
+from app.core.logging_config import logger
+
+# Metrics are computed on an hourly grid covering the last 30 days
+BUCKET_SECONDS = 3600
+WINDOW_DAYS = 30
+RETURN_WINDOWS = {"return_1d_pct": 1, "return_7d_pct": 7, "return_30d_pct": 30}
+INSERT_CHUNK_SIZE = 5000
+
+
+def format_trend_info(return_pct: float | None, days: int = 7) -> str:
+    """Human-readable summary kept in CryptoMetadata.trend_info for the dashboard."""
+    if return_pct is None:
+        return "Insufficient data"
+    return f"Change over {days} days: {return_pct:.2f}%"
+
+
+def _to_datetime(ms: float) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def history_select(
+    symbols: list[str] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+):
+    """SELECT stored observations in primary-key order (symbol, then time), optionally filtered."""
+    stmt = select(CryptoPriceHistory.crypto_symbol, CryptoPriceHistory.observed_at, CryptoPriceHistory.price_usd)
+    if symbols:
+        stmt = stmt.where(CryptoPriceHistory.crypto_symbol.in_(symbols))
+    if since is not None:
+        stmt = stmt.where(CryptoPriceHistory.observed_at >= since)
+    if until is not None:
+        stmt = stmt.where(CryptoPriceHistory.observed_at < until)
+    return stmt.order_by(CryptoPriceHistory.crypto_symbol, CryptoPriceHistory.observed_at)
+
+
+class PriceHistoryService:
+    """
+    Stores per-coin price series and derives the numeric trend columns on CryptoMetadata.
+    """
+
+    @staticmethod
+    def get_last_timestamps(db: Session, symbols: list[str] | None = None) -> dict[str, datetime]:
+        """
+        Latest stored observation per coin, used to fetch and append only newer points.
+
+        Args:
+            db (Session): SQLAlchemy session.
+            symbols (list[str] | None): Restrict to these symbols; all coins if None.
+
+        Returns:
+            Mapping of crypto_symbol to its most recent observed_at.
+        """
+        query = db.query(CryptoPriceHistory.crypto_symbol, func.max(CryptoPriceHistory.observed_at))
+        if symbols is not None:
+            query = query.filter(CryptoPriceHistory.crypto_symbol.in_(symbols))
+        return dict(query.group_by(CryptoPriceHistory.crypto_symbol).all())
+
+    @staticmethod
+    def append_prices(db: Session, series: dict[str, list[list[float]]]) -> dict[str, int]:
+        """
+        Append price points, skipping anything at or before the last stored timestamp.
+
+        Args:
+            db (Session): SQLAlchemy session.
+            series (dict): crypto_symbol -> [[epoch_ms, price], ...] as returned by
+                CoinGecko's market_chart endpoint.
+
+        Returns:
+            Number of points appended per symbol.
+        """
+        last_seen = PriceHistoryService.get_last_timestamps(db, list(series))
+        rows = []
+        appended = {}
+        for symbol, points in series.items():
+            cutoff = last_seen.get(symbol)
+            new_rows = [
+                {"crypto_symbol": symbol, "observed_at": _to_datetime(ms), "price_usd": float(price)}
+                for ms, price in points
+                if price is not None and (cutoff is None or _to_datetime(ms) > cutoff)
+            ]
+            appended[symbol] = len(new_rows)
+            rows.extend(new_rows)
+
+        try:
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                stmt = dialect_insert(db, CryptoPriceHistory).on_conflict_do_nothing()
+                db.execute(stmt, rows[start:start + INSERT_CHUNK_SIZE])
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error("[ERROR][HISTORY] Failed to append %s price points: %s", len(rows), e)
+            raise
+
+        logger.info("[HISTORY] Appended %s price points across %s coins.", len(rows), len(series))
+        return appended
+
+    @staticmethod
+    def get_price_series(db: Session, symbol: str, days: int = WINDOW_DAYS) -> list[CryptoPriceHistory]:
+        """
+        Stored observations for one coin over the last `days` days, oldest first.
+        """
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        return db.query(CryptoPriceHistory).filter(
+            CryptoPriceHistory.crypto_symbol == symbol,
+            CryptoPriceHistory.observed_at >= since,
+        ).order_by(CryptoPriceHistory.observed_at).all()
+
+    @staticmethod
+    def compute_trend_metrics(db: Session, now: datetime | None = None) -> dict[str, dict]:
+        """
+        Compute 1d/7d/30d returns, volatility and max drawdown for every coin at once.
+
+        All series are resampled onto one hourly (coins x buckets) matrix and
+        forward-filled, so each metric is a single NumPy expression across all coins.
+        Points older than the window seed the first bucket so a 30-day return can
+        still be computed when the oldest stored point is slightly more than 30 days old.
+
+        Returns:
+            crypto_symbol -> {metric name: value or None}.
+        """
+        now = now or datetime.now(timezone.utc)
+        start = now - timedelta(days=WINDOW_DAYS)
+        rows = db.query(
+            CryptoPriceHistory.crypto_symbol,
+            CryptoPriceHistory.observed_at,
+            CryptoPriceHistory.price_usd,
+        ).filter(
+            CryptoPriceHistory.observed_at >= start - timedelta(days=1),
+            CryptoPriceHistory.observed_at <= now,
+        ).order_by(CryptoPriceHistory.crypto_symbol, CryptoPriceHistory.observed_at).all()
+        if not rows:
+            return {}
+
+        symbols_col, times_col, prices_col = zip(*rows)
+        symbols, coin_idx = np.unique(np.array(symbols_col, dtype=object), return_inverse=True)
+        seconds = np.array([t.timestamp() for t in times_col]) - start.timestamp()
+        prices = np.array(prices_col, dtype=float)
+
+        n_buckets = WINDOW_DAYS * 24 + 1
+        bucket = np.clip(np.floor(seconds / BUCKET_SECONDS).astype(int), 0, n_buckets - 1)
+
+        # Rows are sorted by (symbol, time): keep the last observation per (coin, bucket)
+        flat = coin_idx * n_buckets + bucket
+        keep = np.r_[flat[1:] != flat[:-1], True]
+        grid = np.full((len(symbols), n_buckets), np.nan)
+        grid[coin_idx[keep], bucket[keep]] = prices[keep]
+
+        # Forward-fill gaps along the time axis
+        filled_idx = np.where(np.isnan(grid), 0, np.arange(n_buckets))
+        np.maximum.accumulate(filled_idx, axis=1, out=filled_idx)
+        grid = grid[np.arange(len(symbols))[:, None], filled_idx]
+
+        latest = grid[:, -1]
+        metrics: dict[str, np.ndarray] = {}
+        with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            for name, days in RETURN_WINDOWS.items():
+                metrics[name] = (latest / grid[:, n_buckets - 1 - days * 24] - 1) * 100
+
+            daily = grid[:, ::24]
+            log_returns = np.diff(np.log(daily), axis=1)
+            enough = np.count_nonzero(~np.isnan(log_returns), axis=1) >= 2
+            metrics["volatility_30d_pct"] = np.where(
+                enough, np.nanstd(log_returns, axis=1, ddof=1) * np.sqrt(365) * 100, np.nan
+            )
+
+            running_peak = np.fmax.accumulate(grid, axis=1)
+            metrics["max_drawdown_30d_pct"] = np.nanmin(grid / running_peak - 1, axis=1) * 100
+
+        return {
+            symbol: {
+                name: (None if np.isnan(values[i]) or np.isinf(values[i]) else float(values[i]))
+                for name, values in metrics.items()
+            }
+            for i, symbol in enumerate(symbols)
+        }
+
+    @staticmethod
+    def refresh_trend_columns(db: Session) -> int:
+        """
+        Recompute trend metrics and write them onto the matching CryptoMetadata rows.
+
+        Also regenerates the legacy trend_info string from return_7d_pct. The new values
+        are compared with the stored ones first: coins whose metrics didn't move are not
+        written (their trend_updated_at stays put), and the rest only get the columns
+        that changed.
+
+        Returns:
+            Number of CryptoMetadata rows updated.
+        """
+        metrics = PriceHistoryService.compute_trend_metrics(db)
+        if not metrics:
+            return 0
+
+        computed_at = datetime.now(timezone.utc)
+        table = CryptoMetadata.__table__
+        columns = [*RETURN_WINDOWS, "volatility_30d_pct", "max_drawdown_30d_pct", "trend_info"]
+        stored = {
+            row["crypto_symbol"]: row
+            for row in db.execute(
+                select(table.c.crypto_symbol, *(table.c[column] for column in columns))
+                .where(table.c.crypto_symbol.in_(list(metrics)))
+            ).mappings()
+        }
+
+        changes = []
+        for symbol, values in metrics.items():
+            current = stored.get(symbol)
+            if current is None:
+                continue
+            new_values = {**values, "trend_info": format_trend_info(values["return_7d_pct"])}
+            changed = {column: value for column, value in new_values.items() if current[column] != value}
+            if changed:
+                changes.append({"crypto_symbol": symbol, **changed, "trend_updated_at": computed_at})
+        symbols = [row["crypto_symbol"] for row in changes]
+
+        try:
+            for stmt, params in changed_column_updates(table, "crypto_symbol", changes):
+                db.execute(stmt, params)
+            SnapshotService.archive(db, symbols, "trend_metrics")
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error("[ERROR][HISTORY] Failed to update trend columns: %s", e)
+            raise
+
+        unchanged = len(stored) - len(symbols)
+        TREND_METRIC_ROWS.labels("updated").inc(len(symbols))
+        TREND_METRIC_ROWS.labels("unchanged").inc(unchanged)
+        logger.info("[HISTORY] Trend metrics refreshed: %s coins updated, %s unchanged.", len(symbols), unchanged)
+        if symbols:
+            notify_data_changed("trend_metrics", symbols)
+        return len(symbols)
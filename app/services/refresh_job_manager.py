@@ -0,0 +1,197 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+from app.core.logging_config import logger
+from app.core.metrics import REFRESH_JOB_DURATION
+from app.db.session import SessionLocal
+from app.services.analytics_service import AnalyticsService
+from app.services.crypto_metadata_service import CryptoMetadataService, count_bulk_statuses
+from app.services.data_events import notify_data_changed
+from app.services.price_history_service import PriceHistoryService
+from app.services.refresh_queue import RefreshQueue
+
+
+class DatabaseSink:
+    """
+    Ingestion sink that writes straight through the service layer,
+    skipping the HTTP round trip to our own API.
+    """
+
+    def upsert_metadata(self, payloads: list[dict]) -> dict:
+        db = SessionLocal()
+        try:
+            items = CryptoMetadataService.bulk_upsert_crypto_metadata(db, payloads)
+        finally:
+            db.close()
+        return {**count_bulk_statuses(items), "items": items}
+
+    def last_price_timestamps(self) -> dict[str, int]:
+        db = SessionLocal()
+        try:
+            last_seen = PriceHistoryService.get_last_timestamps(db)
+        finally:
+            db.close()
+        return {symbol: int(observed_at.timestamp() * 1000) for symbol, observed_at in last_seen.items()}
+
+    def append_prices(self, series: dict[str, list[list[float]]]) -> dict:
+        db = SessionLocal()
+        try:
+            appended = PriceHistoryService.append_prices(db, series)
+            metrics_updated = PriceHistoryService.refresh_trend_columns(db)
+        finally:
+            db.close()
+        return {"appended": appended, "metrics_updated": metrics_updated}
+
+    def refresh_analytics(self) -> dict:
+        db = SessionLocal()
+        try:
+            return AnalyticsService.refresh(db)
+        finally:
+            db.close()
+
+
+@dataclass
+class RefreshJob:
+    job_id: str
+    trigger: str                              # "manual" or "schedule"
+    created_at: datetime
+    status: str = "pending"                   # pending / running / succeeded / failed
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    completed: int = 0
+    total: int = 0
+    report: dict | None = None
+    error: str | None = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("pending", "running")
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        end = self.finished_at or datetime.now(timezone.utc)
+        data["duration_seconds"] = (end - self.started_at).total_seconds() if self.started_at else None
+        data["progress"] = self.completed / self.total if self.total else 0.0
+        return data
+
+
+class RefreshJobManager:
+    """
+    Runs metadata refreshes as background tasks inside the application's event loop.
+
+    Only one refresh is ever in flight: triggering while a job is pending or running
+    returns that job instead of starting another. Optionally re-triggers itself on a
+    fixed interval. Finished jobs are kept (up to `history_size`) so clients can poll them.
+
+    In queue mode the same holds across replicas: a job joins the run another node
+    already started (see RefreshQueue.coordinate), and succeeds once the whole run is done.
+    """
+
+    def __init__(
+        self,
+        top_n: int,
+        concurrency: int,
+        interval_seconds: int = 0,
+        mode: str = "snapshot",
+        history_size: int = 50,
+        queue: RefreshQueue | None = None,
+    ):
+        self.top_n = top_n
+        self.concurrency = concurrency
+        self.mode = mode
+        self.queue = queue
+        self.interval_seconds = interval_seconds
+        self.history_size = history_size
+
+        self._jobs: OrderedDict[str, RefreshJob] = OrderedDict()
+        self._current: RefreshJob | None = None
+        self._current_task: asyncio.Task | None = None
+        self._scheduler: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self.interval_seconds > 0:
+            self._scheduler = asyncio.create_task(self._run_schedule())
+            logger.info("[REFRESH] Periodic refresh every %ss enabled.", self.interval_seconds)
+
+    async def stop(self) -> None:
+        for task in (self._scheduler, self._current_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    def trigger(self, trigger: str = "manual") -> RefreshJob:
+        """
+        Start a refresh, or return the one already in flight.
+
+        Must be called from the event loop thread.
+        """
+        if self._current and self._current.is_active:
+            return self._current
+
+        job = RefreshJob(job_id=uuid.uuid4().hex, trigger=trigger, created_at=datetime.now(timezone.utc))
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.history_size:
+            self._jobs.popitem(last=False)
+
+        self._current = job
+        self._current_task = asyncio.create_task(self._run(job))
+        return job
+
+    def get(self, job_id: str) -> RefreshJob | None:
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: RefreshJob) -> None:
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        logger.info("[REFRESH] Job %s (%s) started.", job.job_id, job.trigger)
+
+        def on_progress(completed: int, total: int) -> None:
+            job.completed, job.total = completed, total
+
+        try:
+            # The ingestion stack (requests, BeautifulSoup, the fetch steps) loads with the first refresh
+            from app.scripts.ingestion import run_ingestion
+
+            report = await run_ingestion(
+                top_n=self.top_n,
+                concurrency=self.concurrency,
+                on_progress=on_progress,
+                sink=DatabaseSink(),
+                mode=self.mode,
+                queue=self.queue,
+            )
+            job.report = asdict(report)
+            job.status = "succeeded"
+            if report.created or report.updated or report.price_points or report.metrics_updated:
+                notify_data_changed("refresh")
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error("[ERROR][REFRESH] Job %s failed: %s", job.job_id, e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            REFRESH_JOB_DURATION.labels(job.trigger, job.status).observe(
+                (job.finished_at - job.started_at).total_seconds()
+            )
+
+        report = job.report or {}
+        logger.info(
+            "[REFRESH] Job %s %s in %.1fs (%s created, %s updated, %s unchanged).",
+            job.job_id, job.status, (job.finished_at - job.started_at).total_seconds(),
+            report.get("created", 0), report.get("updated", 0), report.get("unchanged", 0),
+        )
+
+    async def _run_schedule(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            self.trigger("schedule")
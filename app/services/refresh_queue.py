@@ -0,0 +1,234 @@
+"""
+Postgres-backed work queue for sharded refreshes (REFRESH_MODE=queue).
+
+A refresh run is one row per coin in reporting_schema.refresh_queue, so any
+number of app replicas or `ingestion --mode queue` processes can share the
+upstream calls without doing any coin twice:
+
+• coordinate:  either join the run already in progress or turn get_top_coin_ids
+               into a new one. The coins are fetched outside any transaction;
+               the enqueue re-checks for an active run under a global advisory
+               lock. Only one node ever enqueues, so concurrent /refresh calls
+               on different replicas start a single run.
+• claim:       UPDATE ... WHERE job_id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+               hands each worker rows no other worker is holding, and leases
+               them for REFRESH_QUEUE_LEASE_SECONDS.
+• finish:      done, back to queued for another attempt, or failed after
+               REFRESH_QUEUE_MAX_ATTEMPTS.
+
+A worker that dies keeps its rows only until the lease expires; the next claim
+takes them over. Writes are idempotent upserts keyed on crypto_symbol, so a coin
+fetched twice because a slow worker outlived its lease costs an upstream call but
+never corrupts data. Leases use each node's clock, which is assumed to be in step
+with the others to well within the lease.
+
+On SQLite (single process) the same code runs without the locks.
+"""
+
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy import Engine, and_, delete, func, insert, or_, select, text, update
+
+from app.core.logging_config import logger
+from app.core.metrics import REFRESH_QUEUE_JOBS
+from app.models.refresh_queue_models import RefreshQueueJob
+
+# Held by whichever node is deciding whether to start a run
+COORDINATOR_LOCK_KEY = 0x5A4E_0002
+ACTIVE_STATUSES = ("queued", "running")
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    job_id: int
+    coin_id: str
+    attempts: int
+
+
+@dataclass(frozen=True)
+class RunProgress:
+    run_id: UUID
+    total: int
+    done: int
+    failed: int
+    queued: int
+    running: int
+
+    @property
+    def finished(self) -> bool:
+        return self.queued == 0 and self.running == 0
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class RefreshQueue:
+    """
+    Coordinator and worker operations on the refresh_queue table.
+
+    Args:
+        engine (Engine): Sync engine; every operation is one short transaction.
+        lease_seconds (int): How long a claim is held before other workers may retry it.
+        max_attempts (int): Claims per coin before it is marked failed.
+        worker_id (str | None): Recorded on claimed rows; host:pid by default.
+    """
+
+    def __init__(self, engine: Engine, lease_seconds: int = 300, max_attempts: int = 3, worker_id: str | None = None):
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or default_worker_id()
+
+    @property
+    def _postgres(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    # ------------------------------------------------------------ coordinator
+    def active_run(self) -> UUID | None:
+        """The run with coins still queued or running, if any."""
+        with self.engine.connect() as conn:
+            return self._active_run(conn)
+
+    @staticmethod
+    def _active_run(conn) -> UUID | None:
+        return conn.execute(
+            select(RefreshQueueJob.run_id).where(RefreshQueueJob.status.in_(ACTIVE_STATUSES)).limit(1)
+        ).scalar()
+
+    def coordinate(self, fetch_coin_ids: Callable[[], list[str]]) -> tuple[UUID | None, bool]:
+        """
+        Join the active run, or start one from `fetch_coin_ids()` if there is none.
+
+        The coin list is fetched before any transaction is open, so no
+        connection sits idle in a transaction during the upstream call. The
+        insert then runs under COORDINATOR_LOCK_KEY and re-checks for an active
+        run first: a node that started one in the meantime wins, and this one
+        joins it. Starting a run clears the rows of the previous (finished) one.
+        Returns (run_id, started); run_id is None if no coins came back.
+        """
+        run_id = self.active_run()
+        if run_id is not None:
+            logger.info("[QUEUE] Joining refresh run %s.", run_id)
+            return run_id, False
+
+        coin_ids = list(dict.fromkeys(fetch_coin_ids()))
+        if not coin_ids:
+            logger.warning("[QUEUE] No coins to enqueue.")
+            return None, False
+
+        with self.engine.begin() as conn:
+            if self._postgres:
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": COORDINATOR_LOCK_KEY})
+            run_id = self._active_run(conn)
+            if run_id is not None:
+                logger.info("[QUEUE] Joining refresh run %s.", run_id)
+                return run_id, False
+            run_id = uuid.uuid4()
+            conn.execute(delete(RefreshQueueJob))
+            conn.execute(insert(RefreshQueueJob), [
+                {"run_id": run_id, "coin_id": coin_id, "position": position, "status": "queued", "attempts": 0}
+                for position, coin_id in enumerate(coin_ids)
+            ])
+        logger.info("[QUEUE] Started refresh run %s with %s coins.", run_id, len(coin_ids))
+        return run_id, True
+
+    # ----------------------------------------------------------------- worker
+    def claim(self, run_id: UUID, limit: int) -> list[ClaimedJob]:
+        """
+        Lease up to `limit` coins of the run: queued ones first, then ones whose
+        lease expired. Rows another worker is claiming at the same moment are
+        skipped rather than waited on. Expired rows that have used up their
+        attempts are marked failed instead.
+        """
+        now = datetime.now(timezone.utc)
+        job = RefreshQueueJob
+        expired = and_(job.status == "running", job.lease_expires_at < now)
+        with self.engine.begin() as conn:
+            gave_up = conn.execute(
+                update(job)
+                .where(job.run_id == run_id, expired, job.attempts >= self.max_attempts)
+                .values(status="failed", finished_at=now, error="lease expired on the last attempt")
+            ).rowcount
+            claimable = (
+                select(job.job_id)
+                .where(job.run_id == run_id, or_(job.status == "queued", expired))
+                .order_by(job.position)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            rows = conn.execute(
+                update(job)
+                .where(job.job_id.in_(claimable.scalar_subquery()))
+                .values(
+                    status="running",
+                    attempts=job.attempts + 1,
+                    claimed_by=self.worker_id,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                )
+                .returning(job.job_id, job.coin_id, job.attempts)
+            ).all()
+        if gave_up:
+            REFRESH_QUEUE_JOBS.labels("failed").inc(gave_up)
+            logger.warning("[QUEUE] %s coins abandoned by their workers on the last attempt.", gave_up)
+        retried = sum(1 for row in rows if row.attempts > 1)
+        if retried:
+            REFRESH_QUEUE_JOBS.labels("reclaimed").inc(retried)
+        return [ClaimedJob(row.job_id, row.coin_id, row.attempts) for row in rows]
+
+    def finish(self, jobs: list[ClaimedJob], errors: dict[int, str] | None = None) -> None:
+        """
+        Record the outcome of a claimed batch: jobs listed in `errors` (job_id to
+        message) failed, the rest are done. Failed jobs with attempts left go back
+        to the queue. Only rows this worker still holds are touched, so a worker
+        whose lease was taken over can't overwrite the new holder's outcome.
+        """
+        errors = errors or {}
+        now = datetime.now(timezone.utc)
+        job = RefreshQueueJob
+        held = and_(job.status == "running", job.claimed_by == self.worker_id)
+        done_ids = [claimed.job_id for claimed in jobs if claimed.job_id not in errors]
+        outcomes = {"done": 0, "failed": 0, "retried": 0}
+        with self.engine.begin() as conn:
+            if done_ids:
+                outcomes["done"] = conn.execute(
+                    update(job).where(job.job_id.in_(done_ids), held)
+                    .values(status="done", finished_at=now, lease_expires_at=None, error=None)
+                ).rowcount
+            for claimed in jobs:
+                if claimed.job_id not in errors:
+                    continue
+                final = claimed.attempts >= self.max_attempts
+                outcomes["failed" if final else "retried"] += conn.execute(
+                    update(job).where(job.job_id == claimed.job_id, held).values(
+                        status="failed" if final else "queued",
+                        finished_at=now if final else None,
+                        lease_expires_at=None,
+                        error=errors[claimed.job_id][:1000],
+                    )
+                ).rowcount
+        # Rows whose lease was taken over matched nothing and are counted by their new holder
+        for outcome, count in outcomes.items():
+            REFRESH_QUEUE_JOBS.labels(outcome).inc(count)
+
+    def progress(self, run_id: UUID) -> RunProgress:
+        with self.engine.connect() as conn:
+            counts = dict(conn.execute(
+                select(RefreshQueueJob.status, func.count())
+                .where(RefreshQueueJob.run_id == run_id)
+                .group_by(RefreshQueueJob.status)
+            ).all())
+        return RunProgress(
+            run_id=run_id,
+            total=sum(counts.values()),
+            done=counts.get("done", 0),
+            failed=counts.get("failed", 0),
+            queued=counts.get("queued", 0),
+            running=counts.get("running", 0),
+        )
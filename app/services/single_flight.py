@@ -0,0 +1,80 @@
+"""
+Single-flight request coalescing.
+
+When a burst of clients asks for the same thing at once (typically right after
+a refresh, when the coin index and the dashboard are catching up), each of them
+would otherwise run the same query. SingleFlight runs one of them per key; every
+identical call that arrives while it is in flight awaits that execution and gets
+the same result, or the same exception.
+
+Nothing is cached: a key is forgotten as soon as its execution finishes. Callers
+put the data version (data_events.current_version()) in the key, so a call only
+joins an execution that started at the version the caller sees. A caller whose
+own write bumped the version starts a new execution instead of getting data
+from before that write.
+
+Shared results are handed to every caller as the same object, so callers must
+not mutate them.
+
+Metrics: single_flight_calls_total{group, role} counts leaders (ran the work)
+and followers (joined one). The coalescing ratio is
+followers / (leaders + followers). single_flight_callers shows how many calls
+each execution served.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.core.metrics import SINGLE_FLIGHT_CALLERS, SINGLE_FLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+def freeze(value):
+    """Hashable form of a call argument: lists and dicts become tuples."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    return value
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls that share a key.
+
+    The work runs in its own task, so a caller that goes away (client disconnect,
+    timeout) doesn't cancel it for the others.
+
+    Args:
+        group (str): Metrics label, e.g. "metadata_read".
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._flights: dict[Hashable, tuple[asyncio.Task, list[int]]] = {}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[T]]) -> T:
+        """Await `work()`, or the execution of it already in flight for `key`."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            task, callers = flight
+            callers[0] += 1
+            SINGLE_FLIGHT_CALLS.labels(self.group, "follower").inc()
+        else:
+            task, callers = asyncio.ensure_future(work()), [1]
+            self._flights[key] = (task, callers)
+            task.add_done_callback(lambda _: self._finish(key, task, callers))
+            SINGLE_FLIGHT_CALLS.labels(self.group, "leader").inc()
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task, callers: list[int]) -> None:
+        if self._flights.get(key, (None,))[0] is task:
+            del self._flights[key]
+        SINGLE_FLIGHT_CALLERS.labels(self.group).observe(callers[0])
+        # Every caller may have gone away; retrieve the exception so it isn't reported as unhandled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,273 @@
+"""
+Append-only archive of crypto_metadata rows.
+
+Every write through the service layer copies the affected live rows into
+crypto_metadata_snapshot with one INSERT ... SELECT inside the same
+transaction, so the archive never disagrees with what was committed.
+
+Storage is kept bounded by maintenance (run by the app on a timer, or once
+from the command line):
+
+• partitions:  daily partitions are created SNAPSHOT_PARTITIONS_AHEAD days ahead
+• compaction:  days older than SNAPSHOT_COMPACT_AFTER_DAYS keep only each coin's
+               last snapshot of the day
+• retention:   days older than SNAPSHOT_RETENTION_DAYS are dropped (whole
+               partitions on Postgres, a DELETE elsewhere)
+
+    python -m app.services.snapshot_service
+"""
+
+import asyncio
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import DateTime, Engine, and_, delete, exists, literal, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.db.upsert import dialect_insert
+from app.models.metadata_models import CryptoMetadata
+from app.models.snapshot_models import CryptoMetadataSnapshot
+
+SNAPSHOT_TABLE = "crypto_metadata_snapshot"
+PARTITION_NAME = re.compile(rf"^{SNAPSHOT_TABLE}_p(\d{{8}})$")
+# Serialises partition DDL when several workers run maintenance at startup
+MAINTENANCE_LOCK_KEY = 0x5A4E_0001
+
+# Columns copied from the live row; the rest of the snapshot row is snapshot_at and change_source
+ARCHIVED_COLUMNS = [
+    column.name for column in CryptoMetadataSnapshot.__table__.columns
+    if column.name not in ("snapshot_at", "change_source")
+]
+
+
+def _archive_statement(db: Session | AsyncSession, symbols: Iterable[str], source: str):
+    """INSERT INTO crypto_metadata_snapshot SELECT <live row>, now, source for `symbols`."""
+    live = CryptoMetadata.__table__
+    snapshot_at = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+    rows = select(
+        *(live.c[name] for name in ARCHIVED_COLUMNS),
+        snapshot_at.label("snapshot_at"),
+        literal(source).label("change_source"),
+    ).where(live.c.crypto_symbol.in_(list(symbols)))
+    return dialect_insert(db, CryptoMetadataSnapshot).from_select(
+        [*ARCHIVED_COLUMNS, "snapshot_at", "change_source"], rows
+    ).on_conflict_do_nothing()
+
+
+class SnapshotService:
+    """
+    Writes and maintains the crypto_metadata_snapshot archive. The archive_* methods
+    only execute; the caller's transaction decides whether the snapshot is kept.
+    """
+
+    @staticmethod
+    def archive(db: Session, symbols: Iterable[str], source: str) -> None:
+        """Copy the current live rows for `symbols` into the archive (no commit)."""
+        symbols = list(symbols)
+        if symbols:
+            db.execute(_archive_statement(db, symbols, source))
+
+    @staticmethod
+    async def archive_async(db: AsyncSession, symbols: Iterable[str], source: str) -> None:
+        """AsyncSession counterpart of archive."""
+        symbols = list(symbols)
+        if symbols:
+            await db.execute(_archive_statement(db, symbols, source))
+
+    # ------------------------------------------------------------ maintenance
+    @staticmethod
+    def ensure_partitions(engine: Engine, today: date, days_ahead: int) -> list[str]:
+        """
+        Create the DEFAULT partition and one partition per day from today to
+        today + days_ahead, if missing. Postgres only; returns the names created.
+
+        If maintenance fell behind, rows for a day may already sit in DEFAULT, and
+        Postgres refuses to create a partition whose range DEFAULT still holds.
+        Those days are built as a standalone table, the rows are moved out of
+        DEFAULT into it, and it is then attached.
+        """
+        if engine.dialect.name != "postgresql":
+            return []
+        created = []
+        parent = f"reporting_schema.{SNAPSHOT_TABLE}"
+        default = f"{parent}_default"
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+            existing = SnapshotService._partitions(conn)
+            if f"{SNAPSHOT_TABLE}_default" not in existing:
+                conn.execute(text(f"CREATE TABLE IF NOT EXISTS {default} PARTITION OF {parent} DEFAULT"))
+                created.append(f"{SNAPSHOT_TABLE}_default")
+            for offset in range(days_ahead + 1):
+                day = today + timedelta(days=offset)
+                name = f"{SNAPSHOT_TABLE}_p{day:%Y%m%d}"
+                if name in existing:
+                    continue
+                start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+                bounds = {"start": start, "end": start + timedelta(days=1)}
+                values = (
+                    f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+                    f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+                )
+                in_default = conn.execute(text(
+                    f"SELECT EXISTS (SELECT 1 FROM {default} WHERE snapshot_at >= :start AND snapshot_at < :end)"
+                ), bounds).scalar()
+                if not in_default:
+                    conn.execute(text(f"CREATE TABLE IF NOT EXISTS reporting_schema.{name} PARTITION OF {parent} {values}"))
+                    created.append(name)
+                    continue
+                # Block writes to DEFAULT until commit, so no new row for this day lands there before the attach
+                conn.execute(text(f"LOCK TABLE {default} IN SHARE ROW EXCLUSIVE MODE"))
+                conn.execute(text(f"CREATE TABLE reporting_schema.{name} (LIKE {parent} INCLUDING DEFAULTS)"))
+                moved = conn.execute(text(
+                    f"WITH moved AS (DELETE FROM {default} WHERE snapshot_at >= :start AND snapshot_at < :end RETURNING *) "
+                    f"INSERT INTO reporting_schema.{name} SELECT * FROM moved"
+                ), bounds).rowcount
+                conn.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION reporting_schema.{name} {values}"))
+                logger.info("[SNAPSHOT] Moved %d rows from the default partition into %s.", moved, name)
+                created.append(name)
+        return created
+
+    @staticmethod
+    def _partitions(conn) -> set[str]:
+        return set(conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_namespace ns ON ns.oid = parent.relnamespace "
+            "WHERE ns.nspname = 'reporting_schema' AND parent.relname = :parent"
+        ), {"parent": SNAPSHOT_TABLE}).scalars())
+
+    @staticmethod
+    def apply_retention(engine: Engine, today: date, retention_days: int) -> int:
+        """
+        Remove snapshots from before today - retention_days. Whole daily partitions are
+        dropped on Postgres; stragglers in the DEFAULT partition (or on other backends)
+        are deleted. Returns the number of partitions dropped plus rows deleted.
+        """
+        cutoff_day = today - timedelta(days=retention_days)
+        cutoff = datetime.combine(cutoff_day, time.min, tzinfo=timezone.utc)
+        removed = 0
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+                for name in sorted(SnapshotService._partitions(conn)):
+                    match = PARTITION_NAME.match(name)
+                    if match and datetime.strptime(match.group(1), "%Y%m%d").date() < cutoff_day:
+                        conn.execute(text(f"DROP TABLE reporting_schema.{name}"))
+                        removed += 1
+            removed += conn.execute(
+                delete(CryptoMetadataSnapshot).where(CryptoMetadataSnapshot.snapshot_at < cutoff)
+            ).rowcount
+        return removed
+
+    @staticmethod
+    def compact(engine: Engine, today: date, compact_after_days: int, retention_days: int) -> int:
+        """
+        For each day between the retention and compaction cut-offs, keep only every
+        coin's last snapshot of that day. Idempotent; already-compacted days have
+        nothing left to delete. Each day is its own statement, so on Postgres it only
+        touches that day's partition.
+        """
+        newer = aliased(CryptoMetadataSnapshot)
+        deleted = 0
+        first_day = today - timedelta(days=retention_days)
+        last_day = today - timedelta(days=compact_after_days)
+        day = first_day
+        while day < last_day:
+            start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+            end = start + timedelta(days=1)
+            superseded = exists().where(
+                newer.crypto_symbol == CryptoMetadataSnapshot.crypto_symbol,
+                newer.snapshot_at > CryptoMetadataSnapshot.snapshot_at,
+                newer.snapshot_at < end,
+            )
+            with engine.begin() as conn:
+                deleted += conn.execute(delete(CryptoMetadataSnapshot).where(and_(
+                    CryptoMetadataSnapshot.snapshot_at >= start,
+                    CryptoMetadataSnapshot.snapshot_at < end,
+                    superseded,
+                ))).rowcount
+            day += timedelta(days=1)
+        return deleted
+
+    @staticmethod
+    def run_maintenance(engine: Engine, today: date | None = None) -> dict:
+        """
+        Create upcoming partitions, compact, then apply retention, using the SNAPSHOT_*
+        settings. Each step runs even if an earlier one failed, so a partition problem
+        can't stop retention; the first error is re-raised once all steps have run.
+        """
+        today = today or datetime.now(timezone.utc).date()
+        steps = {
+            "partitions_created": lambda: SnapshotService.ensure_partitions(
+                engine, today, settings.SNAPSHOT_PARTITIONS_AHEAD
+            ),
+            "rows_compacted": lambda: SnapshotService.compact(
+                engine, today, settings.SNAPSHOT_COMPACT_AFTER_DAYS, settings.SNAPSHOT_RETENTION_DAYS
+            ),
+            "removed": lambda: SnapshotService.apply_retention(engine, today, settings.SNAPSHOT_RETENTION_DAYS),
+        }
+        report = {"partitions_created": [], "rows_compacted": 0, "removed": 0}
+        errors = []
+        for step, run in steps.items():
+            try:
+                report[step] = run()
+            except SQLAlchemyError as e:
+                logger.error("[ERROR][SNAPSHOT] Maintenance step %s failed: %s", step, e)
+                errors.append(e)
+        logger.info(
+            "[SNAPSHOT] Maintenance: %d partitions created, %d rows compacted, "
+            "%d partitions/rows past retention removed%s.",
+            len(report["partitions_created"]), report["rows_compacted"], report["removed"],
+            f" ({len(errors)} steps failed)" if errors else "",
+        )
+        if errors:
+            raise errors[0]
+        return report
+
+
+class SnapshotMaintenanceTask:
+    """
+    Runs SnapshotService.run_maintenance once at startup and then every
+    `interval_seconds` (0 = startup only) on a worker thread.
+    """
+
+    def __init__(self, engine: Engine, interval_seconds: int):
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        await self._run_once()
+        if self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._run_schedule())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run_once(self) -> None:
+        try:
+            await asyncio.to_thread(SnapshotService.run_maintenance, self.engine)
+        except SQLAlchemyError:
+            pass  # already logged; the next run retries
+
+    async def _run_schedule(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self._run_once()
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    SnapshotService.run_maintenance(engine)